@@ -0,0 +1,213 @@
+# analytics.py -- Asphalt Rush run analytics for the dashboard
+# app.py feeds launch / score / end events in as they happen and each one updates fixed-size
+# rollups, so /api/analytics answers in constant time however long the history gets:
+#   per (lanes, mode): rounds, score histogram (fixed buckets -> percentiles), score / duration sums
+#   launches per hour (last HOURS_KEPT hours) and by hour of day
+#   how runs end: crash (a scored round), stop (dashboard Stop), exit (the game quit by itself)
+# Rollups persist to a small JSON file; without one, app.py backfills from the loaded log history.
+
+import os, json, time, threading
+
+SCORE_BUCKET = 10
+SCORE_BUCKETS = 100                  # 0..990, the last bucket is open-ended
+HOURS_KEPT = 48
+MAX_OPEN_RUNS = 32
+END_REASONS = ("crash", "stop", "exit")
+
+# ----------------------------
+# Per lanes/mode group
+# ----------------------------
+class ScoreGroup:
+    def __init__(self):
+        self.rounds = 0
+        self.hist = [0] * SCORE_BUCKETS
+        self.score_sum = 0
+        self.score_max = 0
+        self.duration_sum = 0.0
+        self.duration_n = 0
+
+    def add(self, score, duration_s=None):
+        self.rounds += 1
+        self.hist[min(SCORE_BUCKETS - 1, max(0, score) // SCORE_BUCKET)] += 1
+        self.score_sum += score
+        self.score_max = max(self.score_max, score)
+        if duration_s is not None and duration_s >= 0:
+            self.duration_sum += duration_s; self.duration_n += 1
+
+    def percentile(self, q):
+        # lower edge of the bucket holding the q-th round (resolution SCORE_BUCKET)
+        if not self.rounds: return None
+        rank = int(q * (self.rounds - 1) + 0.5)
+        seen = 0
+        for i, n in enumerate(self.hist):
+            seen += n
+            if seen > rank:
+                return min(i * SCORE_BUCKET, self.score_max)
+        return self.score_max
+
+    def to_dict(self):
+        return {"rounds": self.rounds, "hist": list(self.hist), "score_sum": self.score_sum, "score_max": self.score_max,
+                "duration_sum": self.duration_sum, "duration_n": self.duration_n}
+
+    @classmethod
+    def from_dict(cls, d):
+        g = cls()
+        g.rounds = d.get("rounds", 0); g.score_sum = d.get("score_sum", 0); g.score_max = d.get("score_max", 0)
+        g.duration_sum = d.get("duration_sum", 0.0); g.duration_n = d.get("duration_n", 0)
+        hist = d.get("hist") or []
+        g.hist[:len(hist)] = hist[:SCORE_BUCKETS]
+        return g
+
+# ----------------------------
+# Rollups
+# ----------------------------
+class RunRollups:
+    def __init__(self, path=None):
+        self.path = path
+        self.groups = {}             # "lanes:mode" -> ScoreGroup
+        self.launches = 0
+        self.per_hour = {}           # epoch hour -> launches, pruned to HOURS_KEPT
+        self.hour_of_day = [0] * 24
+        self.ends = dict.fromkeys(END_REASONS, 0)
+        self.runs = {}               # open runs: session -> {"lanes", "mode", "round_start"}
+        self.current = None
+        self.dirty = False
+        self.loaded = False
+        self._lock = threading.Lock()
+        self._save_lock = threading.Lock()   # the log writer thread and the atexit drain both save
+        if path:
+            self.load()
+
+    def launch(self, session, lanes, mode, t=None):
+        t = time.time() if t is None else t
+        with self._lock:
+            self.launches += 1
+            hour = int(t // 3600)
+            self.per_hour[hour] = self.per_hour.get(hour, 0) + 1
+            for h in [h for h in self.per_hour if h <= hour - HOURS_KEPT]:
+                del self.per_hour[h]
+            self.hour_of_day[time.localtime(t).tm_hour] += 1
+            self.runs[session] = {"lanes": lanes, "mode": mode, "round_start": t}
+            while len(self.runs) > MAX_OPEN_RUNS:
+                del self.runs[next(iter(self.runs))]
+            self.current = session
+            self.dirty = True
+
+    def score(self, score, lanes, session=None, t=None):
+        # one scored round = one crash; the game restarts in the same run afterwards
+        t = time.time() if t is None else t
+        with self._lock:
+            self._score(score, lanes, session if session is not None else self.current, t, None)
+
+    def score_many(self, runs):
+        # bulk ingestion: (score, lanes, session, t, mode) rows under one lock acquisition
+        with self._lock:
+            for score, lanes, session, t, mode in runs:
+                self._score(score, lanes, session, t, mode)
+
+    def _score(self, score, lanes, session, t, mode):
+        # mode: the run's own (launched from the dashboard) wins, then the caller's, then "normal"
+        run = self.runs.get(session)
+        mode = run["mode"] if run else (mode or "normal")
+        duration = None
+        if run:
+            duration = t - run["round_start"]; run["round_start"] = t
+        key = f"{lanes}:{mode}"
+        g = self.groups.get(key)
+        if g is None:
+            g = self.groups[key] = ScoreGroup()
+        g.add(score, duration)
+        self.ends["crash"] += 1
+        self.dirty = True
+
+    def end(self, session, reason):
+        with self._lock:
+            if session not in self.runs:
+                return
+            del self.runs[session]
+            if self.current == session:
+                self.current = None
+            self.ends[reason] = self.ends.get(reason, 0) + 1
+            self.dirty = True
+
+    def summary(self, now=None):
+        now = time.time() if now is None else now
+        hour = int(now // 3600)
+        with self._lock:
+            groups = []
+            for key, g in sorted(self.groups.items()):
+                lanes, mode = key.split(":", 1)
+                last = max((i for i, n in enumerate(g.hist) if n), default=-1)
+                groups.append({"lanes": int(lanes), "mode": mode, "rounds": g.rounds,
+                               "avg_score": round(g.score_sum / g.rounds, 1) if g.rounds else None,
+                               "p50": g.percentile(0.5), "p90": g.percentile(0.9), "p99": g.percentile(0.99),
+                               "max": g.score_max,
+                               "avg_duration_s": round(g.duration_sum / g.duration_n, 1) if g.duration_n else None,
+                               "histogram": g.hist[:last + 1]})
+            ends = dict(self.ends)
+            return {
+                "groups": groups, "score_bucket": SCORE_BUCKET,
+                "launches": {"total": self.launches,
+                             "last_24h": [self.per_hour.get(h, 0) for h in range(hour - 23, hour + 1)],
+                             "by_hour_of_day": list(self.hour_of_day)},
+                "ends": ends,
+                "crash_per_stop": round(ends["crash"] / ends["stop"], 2) if ends["stop"] else None,
+            }
+
+    # ----------------------------
+    # persistence
+    # ----------------------------
+    def load(self):
+        try:
+            with open(self.path, "r") as f:
+                d = json.load(f)
+        except (OSError, ValueError):
+            return False
+        with self._lock:
+            self.groups = {k: ScoreGroup.from_dict(v) for k, v in (d.get("groups") or {}).items()}
+            self.launches = d.get("launches", 0)
+            self.per_hour = {int(h): n for h, n in (d.get("per_hour") or {}).items()}
+            hod = d.get("hour_of_day") or []
+            self.hour_of_day[:len(hod)] = hod[:24]
+            self.ends.update(d.get("ends") or {})
+            self.loaded = True
+        return True
+
+    def save_if_dirty(self):
+        if not self.path or not self.dirty:
+            return False
+        with self._save_lock:
+            with self._lock:
+                d = {"version": 1, "groups": {k: g.to_dict() for k, g in self.groups.items()}, "launches": self.launches,
+                     "per_hour": dict(self.per_hour), "hour_of_day": list(self.hour_of_day), "ends": dict(self.ends)}
+                self.dirty = False
+            try:
+                tmp = self.path + ".tmp"
+                with open(tmp, "w") as f:
+                    json.dump(d, f)
+                os.replace(tmp, self.path)
+                return True
+            except OSError:
+                self.dirty = True
+                return False
+
+    def backfill(self, entries):
+        # one-off rebuild from app.py's log entries (only when no rollup file exists yet)
+        for e in entries:
+            msg = e.get("msg", ""); extra = e.get("extra") or {}; t = e.get("t")
+            if msg == "Game launched":
+                self.launch(extra.get("session") or extra.get("pid"), extra.get("lanes"), extra.get("mode", "normal"), t)
+            elif msg == "Score submitted by game":
+                try:
+                    self.score(int(extra.get("score", 0)), int(extra.get("lanes", 0)), None, t)
+                except (TypeError, ValueError):
+                    pass
+            elif msg == "Scores submitted (bulk)" and e.get("record"):
+                # rows as app.py /submit_scores stores them: [id, session, score, lanes, t, mode]
+                try:
+                    self.score_many([(r[2], r[3], r[1], r[4], r[5]) for r in e["record"]])
+                except (TypeError, ValueError, IndexError):
+                    pass
+            elif msg in ("Game stopped", "Game terminated (detected)") and self.current is not None:
+                self.end(self.current, "stop" if msg == "Game stopped" else "exit")
+        self.loaded = True
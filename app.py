@@ -2,63 +2,340 @@
 # Only visual change: dashboard background is diagonal split (white <> accent)
 # Functionality (endpoints, start/stop, color API, logs, submit_score) unchanged.
 
-import os, sys, json, subprocess, threading, time
-from flask import Flask, render_template_string, request, jsonify
+import os, sys, gc, json, subprocess, threading, time, base64, re, queue, atexit, gzip, hashlib
+from flask import Flask, Response, request, jsonify, send_file
+import ipc, snapshot
+from telemetry import TelemetryStore, MAX_SESSIONS, parse_sample
+from analytics import RunRollups
+from logstore import LogStore
+from gamelog import LEVELS
+from ingest import SeenIds, validate_batch, SEEN_CAPACITY
+from spectate import SpectatorHub
+from memwatch import MemoryWatch
+try:
+    import brotli                  # optional: br is offered only when the package is installed
+except ImportError:
+    brotli = None
 
 APP_PORT = 5000
 GAME_SCRIPT = "main.py"
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
 GAME_PATH = os.path.join(BASE_DIR, GAME_SCRIPT)
-LOG_FILE = os.path.join(BASE_DIR, "session_logs.json")
+LOG_FILE = os.environ.get("ASPHALT_LOG_FILE") or os.path.join(BASE_DIR, "session_logs.json")
+ROLLUP_FILE = os.path.splitext(LOG_FILE)[0] + ".rollups.json"     # analytics.py, kept next to the log
+LOG_STORE_FILE = os.path.splitext(LOG_FILE)[0] + ".jsonl"         # logstore.py: full history, time indexed
+LOG_RANGE_LIMIT = 10000              # /api/logs/range default ?limit=
+LOG_MEMORY_MAX = 2000                # entries kept in memory for /api/logs (the store keeps everything)
+PROFILE_FILE = os.path.join(BASE_DIR, "difficulty_profile.json")   # written by tuner.py, optional
+SNAPSHOT_DIR = os.path.join(BASE_DIR, "snapshots")                 # <session>.arsnap, see snapshot.py
+SNAPSHOT_TIMEOUT_S = 1.0
+SPECTATE_FPS = 5                     # frames/s asked from a game while someone watches it
+SPECTATE_MAX_VIEWERS = 4             # each viewer holds a request thread (mind --threads with --prod)
+MEM_INTERVAL_S = 60.0                # dashboard memory samples (/api/memory); games report their own
+MEM_WARN_MB = 64.0                   # one warning log when RSS grew this much since warm-up
 
-runtime = {"proc": None, "pid": None, "start_time": None, "args": None}
+runtime = {"proc": None, "pid": None, "start_time": None, "args": None, "session": None}
 last_run = {"score": None, "lanes": None, "start_time": None, "end_time": None, "duration_s": None}
 logs = []
 
 selected_color = {"hex": "#0f766e", "name": "Teal Dark"}   # darker default
 theme_key = "green"
 
-# persist logs best-effort
+# Request threads (threaded / --prod server), ipc reader threads and the log writer all touch
+# the globals above: every read-modify-write of them happens under state_lock.
+# launch_lock serializes start/stop so a slow stop never blocks the polling endpoints.
+state_lock = threading.RLock()
+launch_lock = threading.Lock()
+ingest_lock = threading.Lock()   # one /submit_scores batch commits at a time
+
+# persist logs best-effort: LOG_STORE_FILE keeps every entry; an older session_logs.json array
+# (capped at 5000 entries) is imported into a new store once and left as it was
+log_store = None
+history = []                         # as stored, including "record" details (see append_log)
 try:
-    if not os.path.exists(LOG_FILE):
-        with open(LOG_FILE, "w") as f:
-            json.dump([], f)
-    else:
-        with open(LOG_FILE, "r") as f:
-            try:
+    log_store = LogStore(LOG_STORE_FILE)
+    if not log_store.count and os.path.exists(LOG_FILE):
+        try:
+            with open(LOG_FILE, "r") as f:
                 past = json.load(f)
-                if isinstance(past, list):
-                    logs.extend(past[-300:])
-            except Exception:
-                logs.append({"t": time.time(), "level": "warn", "msg": "failed to load logs"})
-except Exception:
-    pass
+            if isinstance(past, list):
+                log_store.append(sorted((e for e in past if isinstance(e, dict)), key=lambda e: e.get("t") or 0))
+        except Exception:
+            logs.append({"t": time.time(), "level": "warn", "msg": "failed to import old logs", "extra": {"path": LOG_FILE}})
+    history = log_store.tail(300)
+    logs.extend({k: v for k, v in e.items() if k != "record"} for e in history)
+except Exception as e:
+    logs.append({"t": time.time(), "level": "warn", "msg": "failed to load logs", "extra": {"error": str(e)}})
 
-def append_log(level, msg, extra=None):
-    e = {"t": time.time(), "level": level, "msg": msg}
-    if extra is not None:
-        e["extra"] = extra
-    logs.append(e)
-    if len(logs) > 2000:
-        logs.pop(0)
-    def writer(entry):
+# run analytics: incremental rollups, rebuilt from the log history only if there is no rollup file yet
+rollups = RunRollups(ROLLUP_FILE)
+if not rollups.loaded:
+    rollups.backfill(history or logs); rollups.save_if_dirty()
+history = []                         # only needed for the backfill: don't keep 300 entries for the process lifetime
+
+# one writer thread owns LOG_FILE; entries queued while it writes go out in the next batch
+_log_queue = queue.Queue()
+_log_file_lock = threading.Lock()
+
+def _write_log_batch(batch):
+    # append only: no read-modify-write of the history per batch
+    if log_store is None:
+        return
+    with _log_file_lock:
         try:
-            try:
-                with open(LOG_FILE, "r") as f:
-                    data = json.load(f)
-            except Exception:
-                data = []
-            data.append(entry)
-            if len(data) > 5000:
-                data = data[-5000:]
-            with open(LOG_FILE, "w") as f:
-                json.dump(data, f)
+            log_store.append(batch)
         except Exception:
             pass
-    threading.Thread(target=writer, args=(e,), daemon=True).start()
+
+def _drain_log_queue(block):
+    batch = []
+    try:
+        batch.extend(_log_queue.get() if block else _log_queue.get_nowait())
+        while True:
+            batch.extend(_log_queue.get_nowait())
+    except queue.Empty:
+        pass
+    if batch:
+        _write_log_batch(batch)
+    rollups.save_if_dirty()
+
+def _log_writer():
+    while True:
+        _drain_log_queue(block=True)
+
+def _persist_logs(entries):
+    _log_queue.put(entries)
+
+threading.Thread(target=_log_writer, daemon=True).start()
+atexit.register(_drain_log_queue, False)
+
+def append_log(level, msg, extra=None, record=None):
+    # record: bulky detail for the log store only, kept out of the in-memory list /api/logs serves
+    e = {"t": time.time(), "level": level, "msg": msg}
+    if extra is not None:
+        e["extra"] = extra
+    with state_lock:
+        logs.append(e)
+        if len(logs) > LOG_MEMORY_MAX:
+            del logs[:len(logs) - LOG_MEMORY_MAX]
+    _persist_logs([e] if record is None else [dict(e, record=record)])
+
+def append_logs(entries, session=None):
+    # batch from the game's logger: one list update and one file write for the whole batch
+    batch = []
+    for item in entries[:1000]:
+        if not isinstance(item, dict) or not item.get("msg"):
+            continue
+        e = {"t": float(item.get("t") or time.time()), "level": str(item.get("level", "info")), "msg": str(item["msg"])}
+        extra = dict(item.get("extra") or {})
+        extra["src"] = "game"
+        if session: extra["session"] = session
+        e["extra"] = extra
+        batch.append(e)
+    if not batch:
+        return 0
+    with state_lock:
+        logs.extend(batch)
+        if len(logs) > LOG_MEMORY_MAX:
+            del logs[:len(logs) - LOG_MEMORY_MAX]
+    _persist_logs(batch)
+    return len(batch)
 
 append_log("info", "Dashboard starting (Asphalt Rush — JV)")
 
+# /submit_scores: (session, id) pairs already ingested; refilled from the log store's last hour on start
+seen_scores = SeenIds()
+SEEN_REBUILD_S = 3600
+
+def _rebuild_seen_scores():
+    if log_store is None:
+        return
+    try:
+        for line in log_store.range(time.time() - SEEN_REBUILD_S, None, None, 0, raw=True):
+            if b'"Scores submitted (bulk)"' in line:
+                for row in json.loads(line).get("record") or []:
+                    seen_scores.add((row[1], row[0]))
+    except Exception as e:
+        append_log("warn", "could not rebuild the score id index", {"error": str(e)})
+
+_rebuild_seen_scores()
+
+def record_score(score, lanes, via="http", session=None):
+    append_log("info", "Score submitted by game", {"score": score, "lanes": lanes, "via": via})
+    rollups.score(score, lanes, session)
+    with state_lock:
+        last_run["score"] = score; last_run["lanes"] = lanes; last_run["end_time"] = time.time()
+        if last_run.get("start_time"):
+            last_run["duration_s"] = int(last_run["end_time"] - last_run["start_time"])
+
+# ----------------------------
+# Game channel (ipc.py): color/theme pushed to the game, scores/status pushed back.
+# HTTP endpoints below stay as the fallback for standalone games.
+# ----------------------------
+telemetry = TelemetryStore()
+game_memory = {}                     # session -> last "memory" status of a connected game
+
+def on_ipc_connect(ch):
+    with state_lock:
+        color_hex, key = selected_color.get("hex"), theme_key
+    ch.send({"type": "color", "hex": color_hex})
+    ch.send({"type": "theme", "key": key})
+
+def on_ipc_message(ch, msg):
+    kind = msg.get("type")
+    if kind == "hello":
+        ch.peer = msg
+        append_log("info", "Game connected (ipc)", {"pid": msg.get("pid"), "lanes": msg.get("lanes")})
+    elif kind == "logs":
+        append_logs(msg.get("entries") or [], ch.peer.get("session"))
+    elif kind == "tm":
+        telemetry.add(ch.peer.get("session"), msg.get("v") or [])
+    elif kind == "score":
+        try:
+            record_score(int(msg.get("score", 0)), int(msg.get("lanes", 0)), via="ipc", session=ch.peer.get("session"))
+        except (TypeError, ValueError):
+            append_log("warn", "ipc score message invalid", {"msg": msg})
+    elif kind == "status":
+        extra = {k: v for k, v in msg.items() if k != "type"}
+        extra["pid"] = ch.peer.get("pid")
+        append_log("info", "Game status", extra)
+        if extra.get("state") == "memory":
+            with state_lock:
+                game_memory[ch.peer.get("session")] = dict(extra, t=time.time())
+    elif kind == "frame":
+        hub = spectator_hub(ch.peer.get("session"))
+        if hub:
+            hub.publish(msg)
+    elif kind == "snapshot":
+        waiter = _snapshot_waiters.get(msg.get("id"))
+        if waiter:
+            waiter[1] = msg; waiter[0].set()
+
+def on_ipc_disconnect(ch):
+    with state_lock:
+        hub = spectators.pop(ch.peer.get("session"), None)
+        game_memory.pop(ch.peer.get("session"), None)
+    if hub:
+        hub.close()
+
+try:
+    ipc_server = ipc.ChannelServer(on_ipc_message, on_ipc_connect, on_disconnect=on_ipc_disconnect)
+except Exception as e:
+    ipc_server = None
+    append_log("warn", "ipc channel unavailable, games will use HTTP", {"error": str(e)})
+
+def push_to_games(msg):
+    if ipc_server:
+        ipc_server.broadcast(msg)
+
+def channel_for(session):
+    if not ipc_server or not session:
+        return None
+    for ch in list(ipc_server.channels):
+        if ch.peer.get("session") == session:
+            return ch
+    return None
+
+# ----------------------------
+# Spectators: browsers watch a game through one SpectatorHub per session (spectate.py); the game
+# only publishes frames while its hub has viewers
+# ----------------------------
+spectators = {}          # session -> SpectatorHub
+
+def _spectate_viewers(hub, n):
+    ch = channel_for(hub.session)
+    if ch is not None and n <= 1:
+        # first viewer: start with a keyframe; last one gone: stop
+        ch.send({"type": "spectate", "fps": SPECTATE_FPS if n else 0, "key": True})
+
+def spectator_hub(session, create=False):
+    if not session:
+        return None
+    with state_lock:
+        hub = spectators.get(session)
+        if hub is None and create:
+            hub = spectators[session] = SpectatorHub(session, _spectate_viewers)
+        return hub
+
+# ----------------------------
+# Snapshots: a running game serializes its state on request (between frames) and sends it
+# over the channel; we keep the latest one per session for download / resume.
+# ----------------------------
+_snapshot_waiters = {}   # request id -> [Event, reply]
+
+# ----------------------------
+# Dashboard memory (memwatch.py): every list / dict above that lives as long as the process
+# ----------------------------
+mem_watch = MemoryWatch(MEM_INTERVAL_S, gauges={
+    "logs": lambda _: len(logs),
+    "seen_scores": lambda _: len(seen_scores),
+    "telemetry_sessions": lambda _: len(telemetry.sessions),
+    "open_runs": lambda _: len(rollups.runs),
+    "spectators": lambda _: len(spectators),
+    "snapshot_waiters": lambda _: len(_snapshot_waiters),
+    "game_memory": lambda _: len(game_memory),
+    "ipc_channels": lambda _: len(ipc_server.channels) if ipc_server else 0,
+    "threads": lambda _: threading.active_count(),
+    "gc_objects": lambda _: len(gc.get_objects()),
+}, caps={"logs": LOG_MEMORY_MAX, "seen_scores": SEEN_CAPACITY, "telemetry_sessions": MAX_SESSIONS})
+
+def _mem_sampler():
+    warned = False
+    while True:
+        mem_watch.sample()
+        if not warned:
+            r = mem_watch.report(top=0)
+            if (r.get("rss_growth_mb") or 0) > MEM_WARN_MB:
+                warned = True
+                append_log("warn", "Dashboard memory keeps growing", {"rss_mb": r["rss_mb"], "growth_mb": r["rss_growth_mb"],
+                                                                      "growing": r["growing_gauges"]})
+        time.sleep(MEM_INTERVAL_S)
+
+threading.Thread(target=_mem_sampler, name="memwatch", daemon=True).start()
+
+def snapshot_path(session):
+    return os.path.join(SNAPSHOT_DIR, re.sub(r"[^A-Za-z0-9_.-]", "_", session) + ".arsnap")
+
+def list_snapshots():
+    out = []
+    try:
+        for name in os.listdir(SNAPSHOT_DIR):
+            if name.endswith(".arsnap"):
+                st = os.stat(os.path.join(SNAPSHOT_DIR, name))
+                out.append({"session": name[:-len(".arsnap")], "bytes": st.st_size, "t": st.st_mtime})
+    except OSError:
+        pass
+    return sorted(out, key=lambda x: x["t"], reverse=True)
+
+def request_snapshot(session, reason="api", timeout=SNAPSHOT_TIMEOUT_S):
+    ch = channel_for(session)
+    if ch is None:
+        return None
+    rid = os.urandom(4).hex()
+    waiter = _snapshot_waiters[rid] = [threading.Event(), None]
+    try:
+        if not ch.send({"type": "snapshot_request", "id": rid, "reason": reason}) or not waiter[0].wait(timeout):
+            append_log("warn", "Snapshot request got no reply", {"session": session, "reason": reason})
+            return None
+    finally:
+        _snapshot_waiters.pop(rid, None)
+    msg = waiter[1]
+    if msg.get("error"):
+        append_log("warn", "Game could not take a snapshot", {"session": session, "error": msg["error"]})
+        return None
+    try:
+        data = base64.b64decode(msg.get("data") or "")
+        snapshot.loads(data)
+    except ValueError as e:
+        append_log("warn", "Snapshot from game is invalid", {"session": session, "error": str(e)})
+        return None
+    os.makedirs(SNAPSHOT_DIR, exist_ok=True)
+    snapshot.write(snapshot_path(session), data)
+    info = {"session": session, "bytes": len(data), "score": msg.get("score"), "lanes": msg.get("lanes"),
+            "seed": msg.get("seed"), "reason": reason}
+    append_log("info", "Snapshot saved", info)
+    return info
+
 app = Flask(__name__)
 
 INDEX_HTML = """
@@ -68,7 +345,121 @@ INDEX_HTML = """
 <meta charset="utf-8">
 <title>Asphalt Rush — Dashboard (JV)</title>
 <meta name="viewport" content="width=device-width,initial-scale=1">
-<style>
+<link rel="stylesheet" href="{{ css_url }}">
+</head>
+<body class="theme-green">
+<div class="wrap">
+  <div class="card">
+    <div class="header">
+      <div class="logo">JV</div>
+      <div style="flex:1">
+        <h1>Asphalt Rush — Dashboard</h1>
+        <div class="desc">Pick lanes, mode and a bold car color. Click a theme to switch the whole dashboard style.</div>
+      </div>
+      <div style="text-align:right">
+        <div style="font-weight:700;color:var(--accent2)">Server</div>
+        <div class="small">Local</div>
+      </div>
+    </div>
+
+    <div class="two-column" style="margin-top:18px">
+      <div class="left">
+        <div class="card" style="padding:12px">
+          <div style="display:flex;justify-content:space-between;align-items:center">
+            <div>
+              <div class="small">Number of lanes</div>
+              <select id="lanes">{% for n in range(2,7) %}<option value="{{n}}">{{n}} lanes</option>{% endfor %}</select>
+            </div>
+            <div style="width:12px"></div>
+            <div>
+              <div class="small">Mode</div>
+              <select id="mode"><option value="normal">Normal</option><option value="hard">Hard</option></select>
+            </div>
+          </div>
+
+          <div class="controls" style="margin-top:14px">
+            <button id="startBtn" class="btn">Start Game</button>
+            <button id="stopBtn" class="btn ghost" disabled>Stop Game</button>
+            <button id="refreshBtn" class="btn ghost">Refresh</button>
+          </div>
+          <div class="controls" style="margin-top:8px">
+            <button id="snapBtn" class="btn ghost" disabled>Snapshot</button>
+            <button id="resumeBtn" class="btn ghost" disabled>Resume last</button>
+          </div>
+
+          <label>Car color</label>
+          <div id="swatches" class="swatches"></div>
+          <div class="preview"><div id="fakeCar" class="fakecar" style="background:#0f766e">JV</div></div>
+          <div class="small" style="margin-top:8px">Click a color to preview. Starting passes this color to the game; running game updates color live.</div>
+        </div>
+
+        <div style="margin-top:12px" class="card">
+          <strong>Last run</strong>
+          <div style="margin-top:8px" class="small">Score: <span id="lr_score">—</span></div>
+          <div class="small">Lanes: <span id="lr_lanes">—</span></div>
+          <div class="small">Duration: <span id="lr_duration">—</span></div>
+          <div class="small" id="lr_time">No runs yet</div>
+        </div>
+
+        <div style="margin-top:12px" class="card">
+          <strong>Run analytics</strong>
+          <div style="margin-top:8px" class="small" id="an_summary">No runs yet</div>
+          <table id="an_table" class="an-table"></table>
+          <div class="small" id="an_hist_label" style="margin-top:8px"></div>
+          <canvas id="anHist" width="380" height="80" style="width:100%"></canvas>
+          <div class="small">Launches per hour, last 24 h</div>
+          <canvas id="anLaunches" width="380" height="40" style="width:100%"></canvas>
+        </div>
+
+        <div style="margin-top:12px" class="card">
+          <div style="display:flex;justify-content:space-between;align-items:center">
+            <strong>Live view</strong>
+            <button id="watchBtn" class="btn ghost" disabled>Watch</button>
+          </div>
+          <canvas id="specCanvas" width="160" height="213" style="width:100%;margin-top:8px;image-rendering:pixelated;background:#111;display:none"></canvas>
+          <div class="small" id="specInfo">Start a game to watch it here</div>
+        </div>
+
+        <div style="margin-top:12px" class="card">
+          <div style="display:flex;justify-content:space-between;align-items:center">
+            <strong>Live telemetry</strong>
+            <select id="tmRes" style="width:auto;padding:4px 8px"><option value="raw">raw</option><option value="1s" selected>1s</option><option value="10s">10s</option><option value="1m">1 min</option></select>
+          </div>
+          <canvas id="tmChart" width="380" height="150" style="width:100%;margin-top:8px"></canvas>
+          <div class="small" id="tmLegend">No samples yet</div>
+        </div>
+      </div>
+
+      <div style="flex:1">
+        <div class="card">
+          <div style="display:flex;justify-content:space-between;align-items:center">
+            <div>
+              <strong>Session Logs</strong>
+              <div class="small">Launches, color changes, score posts.</div>
+            </div>
+
+            <div class="theme-toggle">
+              <div id="themeGreen" class="theme-pill green active">White<br>&bull; Green</div>
+              <div id="themeBlue"  class="theme-pill blue">White<br>&bull; Blue</div>
+            </div>
+          </div>
+
+          <div id="logsBox" class="logs" style="margin-top:12px"></div>
+
+          <footer style="margin-top:12px">Run from the project folder where <code>{{ game_script }}</code> exists. Game shows white lane dividers on black road.</footer>
+        </div>
+      </div>
+    </div>
+
+  </div>
+</div>
+
+<script src="{{ js_url }}"></script>
+</body>
+</html>
+"""
+
+DASHBOARD_CSS = """
   /* base tokens */
   :root{
     --white:#ffffff;
@@ -158,86 +549,15 @@ INDEX_HTML = """
   }
   .theme-pill.active{ box-shadow:0 10px 30px rgba(3,7,18,0.08); transform: translateY(-3px); }
 
+  .an-table{width:100%;border-collapse:collapse;font-size:12px;margin-top:8px}
+  .an-table th,.an-table td{text-align:left;padding:3px 4px;border-bottom:1px solid rgba(2,6,23,0.06)}
+  .an-table th{color:var(--muted);font-weight:600}
+
   footer{margin-top:16px;color:var(--muted);font-size:13px}
   @media (max-width:980px){ .two-column{flex-direction:column} .left{width:100%} }
-</style>
-</head>
-<body class="theme-green">
-<div class="wrap">
-  <div class="card">
-    <div class="header">
-      <div class="logo">JV</div>
-      <div style="flex:1">
-        <h1>Asphalt Rush — Dashboard</h1>
-        <div class="desc">Pick lanes, mode and a bold car color. Click a theme to switch the whole dashboard style.</div>
-      </div>
-      <div style="text-align:right">
-        <div style="font-weight:700;color:var(--accent2)">Server</div>
-        <div class="small">Local</div>
-      </div>
-    </div>
-
-    <div class="two-column" style="margin-top:18px">
-      <div class="left">
-        <div class="card" style="padding:12px">
-          <div style="display:flex;justify-content:space-between;align-items:center">
-            <div>
-              <div class="small">Number of lanes</div>
-              <select id="lanes">{% for n in range(2,7) %}<option value="{{n}}">{{n}} lanes</option>{% endfor %}</select>
-            </div>
-            <div style="width:12px"></div>
-            <div>
-              <div class="small">Mode</div>
-              <select id="mode"><option value="normal">Normal</option><option value="hard">Hard</option></select>
-            </div>
-          </div>
-
-          <div class="controls" style="margin-top:14px">
-            <button id="startBtn" class="btn">Start Game</button>
-            <button id="stopBtn" class="btn ghost" disabled>Stop Game</button>
-            <button id="refreshBtn" class="btn ghost">Refresh</button>
-          </div>
-
-          <label>Car color</label>
-          <div id="swatches" class="swatches"></div>
-          <div class="preview"><div id="fakeCar" class="fakecar" style="background:#0f766e">JV</div></div>
-          <div class="small" style="margin-top:8px">Click a color to preview. Starting passes this color to the game; running game updates color live.</div>
-        </div>
-
-        <div style="margin-top:12px" class="card">
-          <strong>Last run</strong>
-          <div style="margin-top:8px" class="small">Score: <span id="lr_score">—</span></div>
-          <div class="small">Lanes: <span id="lr_lanes">—</span></div>
-          <div class="small">Duration: <span id="lr_duration">—</span></div>
-          <div class="small" id="lr_time">No runs yet</div>
-        </div>
-      </div>
-
-      <div style="flex:1">
-        <div class="card">
-          <div style="display:flex;justify-content:space-between;align-items:center">
-            <div>
-              <strong>Session Logs</strong>
-              <div class="small">Launches, color changes, score posts.</div>
-            </div>
-
-            <div class="theme-toggle">
-              <div id="themeGreen" class="theme-pill green active">White<br>&bull; Green</div>
-              <div id="themeBlue"  class="theme-pill blue">White<br>&bull; Blue</div>
-            </div>
-          </div>
-
-          <div id="logsBox" class="logs" style="margin-top:12px"></div>
-
-          <footer style="margin-top:12px">Run from the project folder where <code>{{ game_script }}</code> exists. Game shows white lane dividers on black road.</footer>
-        </div>
-      </div>
-    </div>
-
-  </div>
-</div>
+"""
 
-<script>
+DASHBOARD_JS = """
 document.addEventListener('DOMContentLoaded', function(){
   const PRESET_COLORS = [
     {hex:"#0f766e", name:"Teal Dark"},
@@ -259,6 +579,9 @@ document.addEventListener('DOMContentLoaded', function(){
   const startBtn = document.getElementById('startBtn');
   const stopBtn = document.getElementById('stopBtn');
   const refreshBtn = document.getElementById('refreshBtn');
+  const snapBtn = document.getElementById('snapBtn');
+  const resumeBtn = document.getElementById('resumeBtn');
+  const watchBtn = document.getElementById('watchBtn');
   const themeGreen = document.getElementById('themeGreen');
   const themeBlue = document.getElementById('themeBlue');
   const logsBox = document.getElementById('logsBox');
@@ -326,12 +649,110 @@ document.addEventListener('DOMContentLoaded', function(){
     }
   }
 
+  function drawBars(id, vals, color){
+    const c = document.getElementById(id); const ctx = c.getContext('2d');
+    ctx.clearRect(0,0,c.width,c.height);
+    if(!vals.length) return;
+    const hi = Math.max(...vals, 1), w = c.width / vals.length;
+    ctx.fillStyle = color;
+    vals.forEach((v,i)=>{ const h = v/hi*(c.height-2); ctx.fillRect(i*w+1, c.height-h, Math.max(1,w-2), h); });
+  }
+
+  async function refreshAnalytics(){
+    const r = await api('/api/analytics');
+    if(!r || r._error) return;
+    const e = r.ends;
+    document.getElementById('an_summary').textContent = r.launches.total?
+      `${r.launches.total} launches · ${e.crash} crashes · ${e.stop} stopped · ${e.exit} quit` + (r.crash_per_stop!==null? ` · ${r.crash_per_stop} crashes per stop` : '') : 'No runs yet';
+    const rows = r.groups.map(g=>`<tr><td>${g.lanes} · ${g.mode}</td><td>${g.rounds}</td><td>${g.avg_score}</td><td>${g.p50}</td><td>${g.p90}</td><td>${g.max}</td><td>${g.avg_duration_s===null? '—' : g.avg_duration_s+'s'}</td></tr>`);
+    document.getElementById('an_table').innerHTML = rows.length?
+      '<tr><th>lanes · mode</th><th>rounds</th><th>avg</th><th>p50</th><th>p90</th><th>max</th><th>time</th></tr>' + rows.join('') : '';
+    const top = r.groups.slice().sort((a,b)=>b.rounds-a.rounds)[0];
+    document.getElementById('an_hist_label').textContent = top? `Scores, ${top.lanes} lanes ${top.mode} (per ${r.score_bucket} points)` : '';
+    drawBars('anHist', top? top.histogram : [], '#0572c9');
+    drawBars('anLaunches', r.launches.last_24h, '#16a34a');
+  }
+
+  const TM_SERIES = [{key:'score', color:'#16a34a'}, {key:'speed', color:'#0572c9'}, {key:'fps', color:'#b91c1c'}, {key:'frame_ms', color:'#92400e'}];
+  async function refreshTelemetry(){
+    const res = document.getElementById('tmRes').value;
+    const r = await api('/api/telemetry?res=' + encodeURIComponent(res));
+    if(!r || r._error || !r.points || !r.points.length) return;
+    const canvas = document.getElementById('tmChart'); const ctx = canvas.getContext('2d');
+    const pts = r.points.slice(-240); const idx = {}; r.fields.forEach((f,i)=>idx[f]=i);
+    ctx.clearRect(0,0,canvas.width,canvas.height);
+    const t0 = pts[0][0], t1 = Math.max(pts[pts.length-1][0], t0 + 1);
+    const legend = [];
+    for(const s of TM_SERIES){
+      const vals = pts.map(p=>p[idx[s.key]]); const lo = Math.min(...vals), hi = Math.max(...vals, lo + 1e-6);
+      ctx.strokeStyle = s.color; ctx.lineWidth = 1.5; ctx.beginPath();
+      pts.forEach((p,i)=>{
+        const x = (p[0]-t0)/(t1-t0)*(canvas.width-4)+2, y = canvas.height-4-((p[idx[s.key]]-lo)/(hi-lo))*(canvas.height-8);
+        if(i===0) ctx.moveTo(x,y); else ctx.lineTo(x,y);
+      });
+      ctx.stroke();
+      legend.push(`<span style="color:${s.color}">${s.key} ${vals[vals.length-1]}</span>`);
+    }
+    const last = pts[pts.length-1];
+    document.getElementById('tmLegend').innerHTML = legend.join(' &middot; ') + ` &middot; acc ${last[idx['knn_acc']]}% &middot; gfx level ${Math.round(last[idx['quality']])}`;
+  }
+
   async function refreshRuntime(){
     const r = await api('/api/runtime');
     if(r && r._error){ addLog('warn','Failed to get runtime', r._error); return; }
     if(r.running){ startBtn.disabled = true; stopBtn.disabled = false; } else { startBtn.disabled = false; stopBtn.disabled = true; }
+    snapBtn.disabled = !(r.running && r.ipc > 0);
+    resumeBtn.disabled = r.running || !r.resumable;
+    resumeBtn.title = r.resumable ? ('Resume session ' + r.resumable) : 'No snapshot yet';
+    watchBtn.disabled = !spec && !(r.running && r.ipc > 0);
+  }
+
+  // Live view: SSE frames from /api/spectate, zlib(rgb) keyframes and zlib(rgb XOR previous) deltas
+  let spec = null;
+  async function inflate(b64){
+    const bin = Uint8Array.from(atob(b64), c=>c.charCodeAt(0));
+    const out = new Response(new Blob([bin]).stream().pipeThrough(new DecompressionStream('deflate')));
+    return new Uint8Array(await out.arrayBuffer());
+  }
+  function stopWatching(msg){
+    if(spec){ spec.source.close(); spec = null; }
+    watchBtn.textContent = 'Watch'; document.getElementById('specInfo').textContent = msg || 'Not watching';
+  }
+  function watchGame(){
+    const canvas = document.getElementById('specCanvas'); const ctx = canvas.getContext('2d');
+    const st = spec = {source: new EventSource('/api/spectate/current'), rgb: null, chain: Promise.resolve(), frames: 0, bytes: 0, t0: performance.now()};
+    canvas.style.display = ''; watchBtn.textContent = 'Stop watching';
+    st.source.addEventListener('frame', ev=>{
+      const m = JSON.parse(ev.data);
+      st.chain = st.chain.then(async ()=>{
+        if(spec !== st) return;
+        const px = await inflate(m.data);
+        if(m.key || !st.rgb || st.rgb.length !== px.length) st.rgb = px; else for(let i=0;i<px.length;i++) st.rgb[i] ^= px[i];
+        if(canvas.width !== m.w || canvas.height !== m.h){ canvas.width = m.w; canvas.height = m.h; }
+        const img = ctx.createImageData(m.w, m.h); const d = img.data, rgb = st.rgb;
+        for(let i=0, j=0; i<rgb.length; i+=3, j+=4){ d[j]=rgb[i]; d[j+1]=rgb[i+1]; d[j+2]=rgb[i+2]; d[j+3]=255; }
+        ctx.putImageData(img, 0, 0);
+        st.frames++; st.bytes += m.data.length;
+        const secs = Math.max(1, (performance.now() - st.t0) / 1000);
+        document.getElementById('specInfo').textContent = `frame ${m.seq}${m.key? ' (key)' : ''} · ${(st.bytes/1024/secs).toFixed(1)} KiB/s`;
+      });
+    });
+    st.source.addEventListener('end', ()=>stopWatching('Game ended'));
+    st.source.onerror = ()=>{ if(st.source.readyState === EventSource.CLOSED) stopWatching('Live view unavailable'); };
   }
 
+  snapBtn.addEventListener('click', async ()=>{
+    const r = await api('/api/snapshot', {method:'POST', headers:{'Content-Type':'application/json'}, body: '{}'});
+    if(r && r._error) addLog('warn','Snapshot failed', r._error); else addLog('info','Snapshot saved', r.snapshot||null);
+  });
+
+  resumeBtn.addEventListener('click', async ()=>{
+    resumeBtn.disabled = true;
+    const resp = await api('/api/start', {method:'POST', headers:{'Content-Type':'application/json'}, body: JSON.stringify({resume:true})});
+    if(resp && resp._error){ addLog('error','Resume failed', resp._error); } else { addLog('info','Game resumed', resp.meta||null); }
+    refreshRuntime();
+  });
+
   startBtn.addEventListener('click', async ()=>{
     startBtn.disabled = true;
     const lanes = parseInt(document.getElementById('lanes').value||3);
@@ -347,7 +768,9 @@ document.addEventListener('DOMContentLoaded', function(){
     if(r && r._error){ addLog('error','Stop failed', r._error); alert('Stop failed: '+r._error); stopBtn.disabled = false; } else { addLog('info','Stop requested', r.meta||null); refreshRuntime(); }
   });
 
-  refreshBtn.addEventListener('click', async ()=>{ await refreshLogs(); await refreshLastRun(); await refreshRuntime(); });
+  watchBtn.addEventListener('click', ()=>{ if(spec) stopWatching(); else watchGame(); });
+
+  refreshBtn.addEventListener('click', async ()=>{ await refreshLogs(); await refreshLastRun(); await refreshRuntime(); await refreshAnalytics(); });
 
   // Theme handlers: apply body class (diagonal split will reflect chosen theme)
   themeGreen.addEventListener('click', async ()=>{
@@ -365,14 +788,85 @@ document.addEventListener('DOMContentLoaded', function(){
   });
 
   // init
-  loadColor(); refreshLogs(); refreshLastRun(); refreshRuntime();
-  setInterval(refreshLogs, 3000); setInterval(refreshLastRun, 3000); setInterval(refreshRuntime, 1500);
+  loadColor(); refreshLogs(); refreshLastRun(); refreshRuntime(); refreshAnalytics();
+  setInterval(refreshLogs, 3000); setInterval(refreshLastRun, 3000); setInterval(refreshAnalytics, 5000); setInterval(refreshRuntime, 1500); setInterval(refreshTelemetry, 1000);
 });
-</script>
-</body>
-</html>
 """
 
+# ----------------------------
+# HTTP caching / compression
+# ----------------------------
+# The page, CSS and JS are rendered and compressed once at import. Assets are served under a
+# content-hashed URL (cache forever), the page and the small read-only JSON endpoints carry an
+# ETag and answer If-None-Match with 304. Other large responses are compressed on the way out.
+COMPRESS_MIN_BYTES = 1024
+COMPRESS_TYPES = ("application/json", "text/html", "text/css", "application/javascript", "text/plain")
+
+def _etag(body):
+    return hashlib.sha1(body).hexdigest()[:20]
+
+def _accepts(encoding):
+    return encoding in (request.headers.get("Accept-Encoding") or "").lower()
+
+def compress_body(body):
+    # -> (encoding, bytes) for the best encoding the client takes, or (None, body)
+    if brotli is not None and _accepts("br"):
+        return "br", brotli.compress(body, quality=5)
+    if _accepts("gzip"):
+        return "gzip", gzip.compress(body, compresslevel=6)
+    return None, body
+
+class Asset:
+    # pre-encoded variants of a fixed response body
+    def __init__(self, body, mimetype):
+        self.body = body.encode("utf-8") if isinstance(body, str) else body
+        self.mimetype = mimetype
+        self.etag = _etag(self.body)
+        self.variants = {None: self.body, "gzip": gzip.compress(self.body, compresslevel=9)}
+        if brotli is not None:
+            self.variants["br"] = brotli.compress(self.body, quality=11)
+
+    def response(self, cache_control):
+        enc = "br" if "br" in self.variants and _accepts("br") else "gzip" if _accepts("gzip") else None
+        resp = app.response_class(self.variants[enc], mimetype=self.mimetype)
+        if enc:
+            resp.headers["Content-Encoding"] = enc
+        resp.headers["Vary"] = "Accept-Encoding"
+        resp.headers["Cache-Control"] = cache_control
+        resp.set_etag(self.etag + ("-" + enc if enc else ""))
+        return resp.make_conditional(request)
+
+def cached_json(payload):
+    # conditional GET for polled read-only endpoints: the browser revalidates, unchanged -> 304
+    resp = jsonify(payload)
+    resp.headers["Cache-Control"] = "no-cache"
+    resp.set_etag(_etag(resp.get_data()))
+    return resp.make_conditional(request)
+
+@app.after_request
+def compress_response(resp):
+    # responses with an ETag (Asset / cached_json) have already picked their encoding
+    if (resp.status_code != 200 or resp.direct_passthrough or resp.is_streamed or "Content-Encoding" in resp.headers
+            or resp.mimetype not in COMPRESS_TYPES or resp.get_etag()[0]):
+        return resp
+    body = resp.get_data()
+    if len(body) < COMPRESS_MIN_BYTES:
+        return resp
+    enc, data = compress_body(body)
+    resp.headers.add("Vary", "Accept-Encoding")
+    if enc:
+        resp.set_data(data)
+        resp.headers["Content-Encoding"] = enc
+    return resp
+
+CSS_ASSET = Asset(DASHBOARD_CSS, "text/css")
+JS_ASSET = Asset(DASHBOARD_JS, "application/javascript")
+ASSETS = {f"dashboard.{CSS_ASSET.etag[:10]}.css": CSS_ASSET, f"dashboard.{JS_ASSET.etag[:10]}.js": JS_ASSET}
+INDEX_PAGE = Asset(app.jinja_env.from_string(INDEX_HTML).render(
+    game_script=GAME_SCRIPT,
+    css_url=f"/assets/dashboard.{CSS_ASSET.etag[:10]}.css",
+    js_url=f"/assets/dashboard.{JS_ASSET.etag[:10]}.js"), "text/html")
+
 def check_game_script():
     if not os.path.exists(GAME_PATH):
         append_log("error", f"Game script not found: {GAME_PATH}")
@@ -381,46 +875,81 @@ def check_game_script():
 
 @app.route("/", methods=["GET"])
 def index():
-    return render_template_string(INDEX_HTML, game_script=GAME_SCRIPT)
+    return INDEX_PAGE.response("no-cache")
+
+@app.route("/assets/<name>", methods=["GET"])
+def assets(name):
+    asset = ASSETS.get(name)
+    if asset is None:
+        return jsonify({"ok": False, "error": "not found"}), 404
+    return asset.response("public, max-age=31536000, immutable")
 
 @app.route("/api/runtime", methods=["GET"])
 def api_runtime():
     running = False; pid = None
-    proc = runtime.get("proc")
-    if proc:
-        try:
-            if proc.poll() is None:
-                running = True; pid = runtime.get("pid")
-            else:
-                append_log("info", "Game terminated (detected)", {"pid": runtime.get("pid"), "retcode": proc.poll()})
-                runtime["proc"] = None; runtime["pid"] = None
-                if last_run.get("start_time") and not last_run.get("end_time"):
-                    last_run["end_time"] = time.time(); last_run["duration_s"] = int(last_run["end_time"] - last_run["start_time"])
-        except Exception:
-            running = False
-    return jsonify({"running": running, "pid": pid})
+    with state_lock:
+        proc = runtime.get("proc")
+        if proc:
+            try:
+                if proc.poll() is None:
+                    running = True; pid = runtime.get("pid")
+                else:
+                    append_log("info", "Game terminated (detected)", {"pid": runtime.get("pid"), "retcode": proc.poll()})
+                    rollups.end(runtime.get("session"), "exit")
+                    runtime["proc"] = None; runtime["pid"] = None
+                    if last_run.get("start_time") and not last_run.get("end_time"):
+                        last_run["end_time"] = time.time(); last_run["duration_s"] = int(last_run["end_time"] - last_run["start_time"])
+            except Exception:
+                running = False
+        session = runtime.get("session")
+    snaps = list_snapshots()
+    return jsonify({"running": running, "pid": pid, "session": session, "ipc": len(ipc_server.channels) if ipc_server else 0,
+                    "resumable": snaps[0]["session"] if snaps else None})
 
 @app.route("/api/start", methods=["POST"])
 def api_start():
+    with launch_lock:
+        return _start_game()
+
+def _start_game():
     if not check_game_script():
         return jsonify({"ok": False, "error": "game script not found"}), 400
-    proc = runtime.get("proc")
-    if proc:
-        try:
-            if proc.poll() is None:
-                return jsonify({"ok": False, "error": "game already running", "meta": {"pid": runtime.get("pid")}}), 400
-            else:
+    with state_lock:
+        proc = runtime.get("proc")
+        if proc:
+            try:
+                if proc.poll() is None:
+                    return jsonify({"ok": False, "error": "game already running", "meta": {"pid": runtime.get("pid")}}), 400
+                else:
+                    runtime["proc"] = None; runtime["pid"] = None
+            except Exception:
                 runtime["proc"] = None; runtime["pid"] = None
-        except Exception:
-            runtime["proc"] = None; runtime["pid"] = None
+        color_hex = selected_color.get("hex")
 
     data = request.get_json(force=True) if request.data else {}
     lanes = int(data.get("lanes", 3)); lanes = max(2, min(6, lanes))
     mode = data.get("mode", "normal")
-    color_hex = selected_color.get("hex")
+    resume_path = None
+    if data.get("resume"):
+        # resume: a session id, or true for the most recent snapshot; lanes / mode come from the snapshot
+        snaps = list_snapshots()
+        resume_session = data["resume"] if isinstance(data["resume"], str) else (snaps[0]["session"] if snaps else None)
+        resume_path = snapshot_path(resume_session) if resume_session else None
+        if not resume_path or not os.path.exists(resume_path):
+            return jsonify({"ok": False, "error": "no snapshot to resume"}), 404
+        try:
+            meta, _ = snapshot.load(resume_path)
+            lanes = int(meta["lanes"]); mode = "hard" if meta.get("hard") else "normal"
+        except (OSError, ValueError, KeyError) as e:
+            return jsonify({"ok": False, "error": f"snapshot unreadable: {e}"}), 400
     args = [sys.executable, GAME_PATH, "--lanes", str(lanes), "--caller", "dashboard"]
     if mode == "hard": args.append("--hard")
     if color_hex: args += ["--car-color", color_hex]
+    if ipc_server: args += ["--ipc", ipc_server.address]
+    session = time.strftime("%Y%m%d-%H%M%S") + "-" + os.urandom(2).hex()
+    args += ["--session", session]
+    if os.path.exists(PROFILE_FILE): args += ["--profile", PROFILE_FILE]
+    if resume_path: args += ["--resume", resume_path]
 
     append_log("info", "Launching game", {"args": args})
     try:
@@ -428,21 +957,35 @@ def api_start():
             proc = subprocess.Popen(args, creationflags=subprocess.CREATE_NEW_CONSOLE)
         else:
             proc = subprocess.Popen(args, start_new_session=True)
-        runtime["proc"] = proc; runtime["pid"] = proc.pid; runtime["start_time"] = time.time(); runtime["args"] = args
-        last_run["start_time"] = runtime["start_time"]; last_run["end_time"] = None; last_run["duration_s"] = None; last_run["score"] = None; last_run["lanes"] = lanes
-        append_log("info", "Game launched", {"pid": proc.pid, "lanes": lanes, "mode": mode, "color": color_hex})
-        return jsonify({"ok": True, "meta": {"pid": proc.pid, "lanes": lanes}})
+        with state_lock:
+            runtime["proc"] = proc; runtime["pid"] = proc.pid; runtime["start_time"] = time.time(); runtime["args"] = args; runtime["session"] = session
+            last_run["start_time"] = runtime["start_time"]; last_run["end_time"] = None; last_run["duration_s"] = None; last_run["score"] = None; last_run["lanes"] = lanes
+        rollups.launch(session, lanes, mode)
+        append_log("info", "Game launched", {"pid": proc.pid, "lanes": lanes, "mode": mode, "color": color_hex, "session": session,
+                                             "resume": os.path.basename(resume_path) if resume_path else None})
+        return jsonify({"ok": True, "meta": {"pid": proc.pid, "lanes": lanes, "session": session}})
     except Exception as e:
         append_log("error", "Failed to launch game", {"error": str(e)})
         return jsonify({"ok": False, "error": str(e)}), 500
 
 @app.route("/api/stop", methods=["POST"])
 def api_stop():
-    proc = runtime.get("proc")
+    with launch_lock:
+        return _stop_game()
+
+def _stop_game():
+    with state_lock:
+        proc, pid, session = runtime.get("proc"), runtime.get("pid"), runtime.get("session")
     if not proc:
         return jsonify({"ok": False, "error": "no running process started via dashboard"}), 400
     try:
-        append_log("info", "Stopping game", {"pid": runtime.get("pid")})
+        append_log("info", "Stopping game", {"pid": pid})
+        # keep the run resumable: the game snapshots itself before we terminate it (stopping comes first)
+        snap = None
+        try:
+            snap = request_snapshot(session, reason="stop") if proc.poll() is None else None
+        except Exception as e:
+            append_log("warn", "Snapshot before stop failed", {"session": session, "error": str(e)})
         try:
             proc.terminate()
             for _ in range(10):
@@ -454,11 +997,13 @@ def api_stop():
             try: proc.kill()
             except Exception: pass
         ret = proc.poll()
-        append_log("info", "Game stopped", {"pid": runtime.get("pid"), "retcode": ret})
-        if last_run.get("start_time") and not last_run.get("end_time"):
-            last_run["end_time"] = time.time(); last_run["duration_s"] = int(last_run["end_time"] - last_run["start_time"])
-        runtime["proc"] = None; runtime["pid"] = None; runtime["start_time"] = None; runtime["args"] = None
-        return jsonify({"ok": True, "meta": {"retcode": ret}})
+        append_log("info", "Game stopped", {"pid": pid, "retcode": ret})
+        rollups.end(session, "stop")
+        with state_lock:
+            if last_run.get("start_time") and not last_run.get("end_time"):
+                last_run["end_time"] = time.time(); last_run["duration_s"] = int(last_run["end_time"] - last_run["start_time"])
+            runtime["proc"] = None; runtime["pid"] = None; runtime["start_time"] = None; runtime["args"] = None
+        return jsonify({"ok": True, "meta": {"retcode": ret, "snapshot": snap}})
     except Exception as e:
         append_log("error", "Failed to stop game", {"error": str(e)})
         return jsonify({"ok": False, "error": str(e)}), 500
@@ -471,35 +1016,190 @@ def submit_score():
     except Exception:
         append_log("warn", "submit_score invalid JSON")
         return jsonify({"ok": False, "error": "invalid JSON"}), 400
-    append_log("info", "Score submitted by game", {"score": score, "lanes": lanes})
-    last_run["score"] = score; last_run["lanes"] = lanes; last_run["end_time"] = time.time()
-    if last_run.get("start_time"):
-        last_run["duration_s"] = int(last_run["end_time"] - last_run["start_time"])
+    record_score(score, lanes)
     return jsonify({"ok": True})
 
+@app.route("/submit_scores", methods=["POST"])
+def submit_scores():
+    # bulk + idempotent: {"runs": [{"id", "session", "score", "lanes", "t"?, "mode"?}, ...]}; the batch is
+    # validated whole, (session, id) pairs seen before are skipped, the rest commit as one log write
+    data = request.get_json(force=True, silent=True)
+    runs, errors = validate_batch(data, time.time())
+    if errors:
+        return jsonify({"ok": False, "error": "invalid batch", "errors": [{"index": i, "error": m} for i, m in errors[:50]],
+                        "invalid": len(errors)}), 400
+    with ingest_lock:
+        # ids are marked seen only once last_run and the rollups took the batch, so a batch that
+        # failed half way is not skipped as duplicates when the client retries it
+        with state_lock:
+            keys = set(); fresh = []
+            for r in runs:
+                if r[0] not in seen_scores and r[0] not in keys:
+                    keys.add(r[0]); fresh.append(r)
+            if fresh:
+                last = max(fresh, key=lambda r: r[5])
+                last_run["score"] = last[3]; last_run["lanes"] = last[4]; last_run["end_time"] = last[5]
+                if last_run.get("start_time"):
+                    last_run["duration_s"] = int(last_run["end_time"] - last_run["start_time"])
+        if fresh:
+            rollups.score_many([(score, lanes, session, t, mode) for _, _, session, score, lanes, t, mode in fresh])
+            with state_lock:
+                for r in fresh:
+                    seen_scores.add(r[0])
+            append_log("info", "Scores submitted (bulk)",
+                       {"count": len(fresh), "duplicates": len(runs) - len(fresh), "sessions": len({r[2] for r in fresh})},
+                       record=[[rid, session, score, lanes, t, mode] for _, rid, session, score, lanes, t, mode in fresh])
+    return jsonify({"ok": True, "accepted": len(fresh), "duplicates": len(runs) - len(fresh)})
+
+@app.route("/api/telemetry", methods=["GET"])
+def api_telemetry():
+    with state_lock:
+        current = runtime.get("session")
+    session = request.args.get("session") or current or telemetry.latest_session()
+    res = request.args.get("res", "1s")
+    try:
+        since = float(request.args["since"]) if request.args.get("since") else None
+        data = telemetry.query(session, res, since) if session else None
+    except ValueError as e:
+        return jsonify({"ok": False, "error": str(e)}), 400
+    if data is None:
+        return jsonify({"session": session, "res": res, "fields": [], "total": 0, "points": []})
+    return jsonify(data)
+
+@app.route("/api/telemetry", methods=["POST"])
+def api_telemetry_post():
+    # HTTP fallback for games without the ipc channel: {"session": ..., "samples": [[...], ...]}
+    try:
+        data = request.get_json(force=True)
+        session = str(data.get("session") or ""); samples = list(data.get("samples") or [])[:1000]
+    except Exception:
+        return jsonify({"ok": False, "error": "invalid JSON"}), 400
+    bad = [i for i, v in enumerate(samples) if parse_sample(v) is None]
+    if bad:
+        return jsonify({"ok": False, "error": "samples must be lists of finite numbers in telemetry field order",
+                        "invalid": bad[:50]}), 400
+    accepted = sum(1 for v in samples if telemetry.add(session, v))
+    return jsonify({"ok": True, "accepted": accepted})
+
+@app.route("/api/game_logs", methods=["POST"])
+def api_game_logs():
+    # HTTP fallback for the game's log shipper: {"session": ..., "entries": [...]}
+    try:
+        data = request.get_json(force=True)
+        entries = data.get("entries") or []; session = data.get("session")
+    except Exception:
+        return jsonify({"ok": False, "error": "invalid JSON"}), 400
+    return jsonify({"ok": True, "accepted": append_logs(entries, session)})
+
+@app.route("/api/snapshot", methods=["POST"])
+def api_snapshot():
+    data = request.get_json(force=True, silent=True) or {}
+    with state_lock:
+        current = runtime.get("session")
+    session = data.get("session") or current
+    if not channel_for(session):
+        return jsonify({"ok": False, "error": "no connected game for that session"}), 404
+    info = request_snapshot(session)
+    if info is None:
+        return jsonify({"ok": False, "error": "game did not answer the snapshot request"}), 504
+    return jsonify({"ok": True, "snapshot": info})
+
+@app.route("/api/snapshots", methods=["GET"])
+def api_snapshots():
+    return jsonify({"snapshots": list_snapshots()})
+
+@app.route("/api/snapshot/<session>", methods=["GET"])
+def api_snapshot_download(session):
+    path = snapshot_path(session)
+    if not os.path.exists(path):
+        return jsonify({"ok": False, "error": "no snapshot for that session"}), 404
+    return send_file(path, mimetype="application/octet-stream", as_attachment=True, download_name=os.path.basename(path))
+
+@app.route("/api/telemetry/sessions", methods=["GET"])
+def api_telemetry_sessions():
+    return jsonify({"sessions": telemetry.list_sessions()})
+
 @app.route("/api/last_run", methods=["GET"])
 def api_last_run():
-    return jsonify({
-        "score": last_run.get("score"),
-        "lanes": last_run.get("lanes"),
-        "start_time": last_run.get("start_time"),
-        "end_time": last_run.get("end_time"),
-        "duration_s": last_run.get("duration_s")
-    })
+    with state_lock:
+        return cached_json({
+            "score": last_run.get("score"),
+            "lanes": last_run.get("lanes"),
+            "start_time": last_run.get("start_time"),
+            "end_time": last_run.get("end_time"),
+            "duration_s": last_run.get("duration_s")
+        })
+
+@app.route("/api/memory", methods=["GET"])
+def api_memory():
+    # ?sites=1 adds the growing allocation sites (only when started with -X tracemalloc; costs a snapshot)
+    r = mem_watch.report(top=10 if request.args.get("sites") else 0)
+    with state_lock:
+        games = dict(game_memory)
+    return jsonify({"dashboard": r, "games": games})
+
+@app.route("/api/analytics", methods=["GET"])
+def api_analytics():
+    return cached_json(rollups.summary())
 
 @app.route("/api/logs", methods=["GET"])
 def api_logs():
-    launch_count = sum(1 for e in logs if 'launch' in e.get("msg","").lower())
-    scored_runs = sum(1 for e in logs if e.get("msg","").lower().startswith("score submitted"))
-    return jsonify({"logs": logs[-400:], "stats": {"launch_count": launch_count, "scored_runs": scored_runs}})
+    with state_lock:
+        current = list(logs)
+    launch_count = sum(1 for e in current if 'launch' in e.get("msg","").lower())
+    scored_runs = sum(1 for e in current if e.get("msg","").lower().startswith("score submitted"))
+    return jsonify({"logs": current[-400:], "stats": {"launch_count": launch_count, "scored_runs": scored_runs}})
+
+@app.route("/api/logs/range", methods=["GET"])
+def api_logs_range():
+    # ?from=&to= epoch seconds, ?level= minimum level, ?limit= (0: no limit); NDJSON streamed from
+    # logstore.py, which seeks to the window through its index instead of reading the whole history
+    try:
+        t_from = float(request.args["from"]) if request.args.get("from") else None
+        t_to = float(request.args["to"]) if request.args.get("to") else None
+        limit = int(request.args.get("limit", LOG_RANGE_LIMIT))
+    except ValueError:
+        return jsonify({"ok": False, "error": "from / to must be epoch seconds and limit an integer"}), 400
+    level = request.args.get("level") or None
+    if level is not None and level not in LEVELS:
+        return jsonify({"ok": False, "error": f"level must be one of {', '.join(LEVELS)}"}), 400
+    if log_store is None:
+        return jsonify({"ok": False, "error": "log store unavailable"}), 503
+    def stream():
+        chunk = []
+        for line in log_store.range(t_from, t_to, level, limit, raw=True):
+            chunk.append(line)
+            if len(chunk) >= 256:
+                yield b"\n".join(chunk) + b"\n"; chunk = []
+        if chunk:
+            yield b"\n".join(chunk) + b"\n"
+    return Response(stream(), mimetype="application/x-ndjson")
+
+@app.route("/api/spectate/<session>", methods=["GET"])
+def api_spectate(session):
+    # Server-Sent Events; "current" is the game started from this dashboard
+    if session == "current":
+        with state_lock:
+            session = runtime.get("session")
+    if channel_for(session) is None:
+        return jsonify({"ok": False, "error": "no connected game for this session"}), 404
+    with state_lock:
+        watching = sum(h.viewers for h in spectators.values())
+    if watching >= SPECTATE_MAX_VIEWERS:
+        return jsonify({"ok": False, "error": f"at most {SPECTATE_MAX_VIEWERS} viewers"}), 503
+    hub = spectator_hub(session, create=True)
+    return Response(hub.stream(), mimetype="text/event-stream", headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"})
 
 @app.route("/api/clear_logs", methods=["POST"])
 def api_clear_logs():
-    logs.clear(); append_log("info", "In-memory logs cleared by user"); return jsonify({"ok": True})
+    with state_lock:
+        logs.clear()
+    append_log("info", "In-memory logs cleared by user"); return jsonify({"ok": True})
 
 @app.route("/api/color", methods=["GET"])
 def api_color():
-    return jsonify(selected_color)
+    with state_lock:
+        return cached_json(selected_color)
 
 @app.route("/api/set_color", methods=["POST"])
 def api_set_color():
@@ -510,14 +1210,19 @@ def api_set_color():
         if not hexv: return jsonify({"ok": False, "error": "missing hex"}), 400
         if not (isinstance(hexv, str) and hexv.startswith("#") and len(hexv) in (4,7)):
             return jsonify({"ok": False, "error": "invalid hex"}), 400
-        selected_color = {"hex": hexv, "name": name}
+        with state_lock:
+            selected_color = {"hex": hexv, "name": name}
+        push_to_games({"type": "color", "hex": hexv})
         append_log("info", "Color selected on dashboard", {"hex": hexv, "name": name})
         return jsonify({"ok": True, "color": selected_color})
     except Exception as e:
         append_log("error", "Failed to set color", {"error": str(e)}); return jsonify({"ok": False, "error": str(e)}), 500
 
 @app.route("/api/theme", methods=["GET"])
-def api_theme(): return jsonify({"key": theme_key})
+def api_theme():
+    with state_lock:
+        return cached_json({"key": theme_key})
+
 @app.route("/api/set_theme", methods=["POST"])
 def api_set_theme():
     global theme_key
@@ -525,13 +1230,79 @@ def api_set_theme():
         data = request.get_json(force=True)
         key = data.get("key","green")
         if key not in ("green","blue"): key = "green"
-        theme_key = key
+        with state_lock:
+            theme_key = key
+        push_to_games({"type": "theme", "key": key})
         append_log("info", "Theme changed", {"theme": key})
-        return jsonify({"ok": True, "key": theme_key})
+        return jsonify({"ok": True, "key": key})
     except Exception as e:
         append_log("error", "Failed to set theme", {"error": str(e)}); return jsonify({"ok": False, "error": str(e)}), 500
 
+# ----------------------------
+# serving
+# ----------------------------
+# --prod: waitress if installed, else werkzeug's server with a fixed pool of request threads.
+# Requests are spread over threads, not processes: the dashboard owns the game subprocess,
+# the ipc socket and the in-memory state, which a forking server would split per worker.
+def make_pooled_server(host, port, threads):
+    from concurrent.futures import ThreadPoolExecutor
+    from werkzeug.serving import BaseWSGIServer
+
+    class PooledWSGIServer(BaseWSGIServer):
+        multithread = True             # also turns on HTTP/1.1 keep-alive in werkzeug's handler
+        request_queue_size = 128
+        def __init__(self, *a, **kw):
+            super().__init__(*a, **kw)
+            self.pool = ThreadPoolExecutor(max_workers=threads, thread_name_prefix="http")
+        def process_request(self, req, client_address):
+            self.pool.submit(self._handle, req, client_address)
+        def _handle(self, req, client_address):
+            try:
+                self.finish_request(req, client_address)
+            except Exception:
+                self.handle_error(req, client_address)
+            finally:
+                self.shutdown_request(req)
+        def server_close(self):
+            self.pool.shutdown(wait=False)
+            super().server_close()
+
+    return PooledWSGIServer(host, port, app)
+
+def serve_prod(host, port, threads):
+    import logging
+    logging.getLogger("werkzeug").setLevel(logging.WARNING)   # no per-request access log line
+    try:
+        from waitress import serve
+    except ImportError:
+        serve = None
+    if serve is not None:
+        print(f"[dashboard] waitress, {threads} threads")
+        serve(app, host=host, port=port, threads=threads)
+        return
+    server = make_pooled_server(host, port, threads)
+    print(f"[dashboard] pooled werkzeug server, {threads} threads")
+    try:
+        server.serve_forever()
+    finally:
+        server.server_close()
+
 if __name__ == "__main__":
-    append_log("info", f"Dashboard listening on http://127.0.0.1:{APP_PORT} (Asphalt Rush JV)")
-    print(f"Starting dashboard on http://127.0.0.1:{APP_PORT}")
-    app.run(host="127.0.0.1", port=APP_PORT, debug=False)
\ No newline at end of file
+    import argparse
+    parser = argparse.ArgumentParser(description="Asphalt Rush dashboard")
+    parser.add_argument("--host", type=str, default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=APP_PORT)
+    parser.add_argument("--prod", action="store_true", help="production server (waitress if installed, else a thread pool)")
+    parser.add_argument("--threads", type=int, default=8, help="request threads in --prod mode")
+    opts = parser.parse_args()
+    append_log("info", f"Dashboard listening on http://{opts.host}:{opts.port} (Asphalt Rush JV)")
+    print(f"Starting dashboard on http://{opts.host}:{opts.port}")
+    try:
+        if opts.prod:
+            serve_prod(opts.host, opts.port, max(1, opts.threads))
+        else:
+            app.run(host=opts.host, port=opts.port, debug=False, threaded=True)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        if ipc_server: ipc_server.close()
\ No newline at end of file
@@ -0,0 +1,212 @@
+# capture.py -- Asphalt Rush frame capture (QA recordings)
+# RenderTarget.present() hands the rendered canvas to FrameRecorder.offer(): the surface's pixel
+# buffer (Surface.get_buffer) is copied with one memcpy into a preallocated slot -- no per-pixel
+# Python, no per-frame allocation -- and the slot index goes on a queue for the encoder thread.
+# The slot pool is the queue bound: when every slot is waiting on the encoder the frame is dropped
+# and counted, so a slow disk or encoder never stalls the frame loop.
+# Sinks: png (numbered PNG sequence, stdlib zlib), raw (one rgb24 stream + JSON sidecar for
+# ffmpeg), ffmpeg (rgb24 piped to an ffmpeg process, if one is on PATH).
+# Works with SDL's dummy video driver: only the canvas surface is read, never the screen.
+
+import os, sys, json, zlib, struct, shutil, threading, subprocess, atexit
+import queue
+
+FORMATS = ("png", "raw", "ffmpeg")
+
+# ----------------------------
+# Pixel layout: surface buffer -> rgb24
+# ----------------------------
+def channel_offsets(surface):
+    # byte offset of R, G, B inside one pixel, or None for formats we don't convert (8/16 bit)
+    size = surface.get_bytesize()
+    if size not in (3, 4):
+        return None
+    offs = []
+    for shift in surface.get_shifts()[:3]:
+        b = shift // 8
+        offs.append(b if sys.byteorder == "little" else size - 1 - b)
+    return tuple(offs)
+
+def to_rgb(raw, out, width, height, pitch, bytesize, offsets):
+    # extended-slice assignment: the channel shuffle runs in C, a row at a time only if pitch is padded
+    row = width * bytesize
+    if pitch == row:
+        for c, off in enumerate(offsets):
+            out[c::3] = raw[off:pitch * height:bytesize]
+        return out
+    for y in range(height):
+        src = raw[y * pitch:y * pitch + row]
+        dst = y * width * 3
+        for c, off in enumerate(offsets):
+            out[dst + c:dst + width * 3:3] = src[off::bytesize]
+    return out
+
+# ----------------------------
+# Sinks
+# ----------------------------
+def _png_chunk(kind, data):
+    return struct.pack(">I", len(data)) + kind + data + struct.pack(">I", zlib.crc32(kind + data) & 0xffffffff)
+
+class PngSequence:
+    def __init__(self, directory, width, height, fps, segment):
+        self.directory = directory
+        self.width, self.height = width, height
+        self.prefix = "frame_" if segment == 0 else f"seg{segment}_frame_"
+        self.rows = bytearray((width * 3 + 1) * height)     # filter byte 0 + rgb per scanline
+
+    def write(self, n, rgb):
+        stride = self.width * 3
+        rows = self.rows
+        for y in range(self.height):
+            rows[y * (stride + 1) + 1:(y + 1) * (stride + 1)] = rgb[y * stride:(y + 1) * stride]
+        ihdr = struct.pack(">IIBBBBB", self.width, self.height, 8, 2, 0, 0, 0)
+        data = (b"\x89PNG\r\n\x1a\n" + _png_chunk(b"IHDR", ihdr) + _png_chunk(b"IDAT", zlib.compress(rows, 1))
+                + _png_chunk(b"IEND", b""))
+        with open(os.path.join(self.directory, f"{self.prefix}{n:06d}.png"), "wb") as f:
+            f.write(data)
+
+    def close(self):
+        pass
+
+class RawStream:
+    def __init__(self, directory, width, height, fps, segment):
+        name = "capture" if segment == 0 else f"capture_{segment}"
+        self.path = os.path.join(directory, name + ".rgb")
+        self.meta_path = os.path.join(directory, name + ".json")
+        self.meta = {"width": width, "height": height, "fps": fps, "pix_fmt": "rgb24", "frames": 0}
+        self.f = open(self.path, "wb")
+
+    def write(self, n, rgb):
+        self.f.write(rgb); self.meta["frames"] += 1
+
+    def close(self):
+        self.f.close()
+        m = self.meta
+        m["ffmpeg"] = (f"ffmpeg -f rawvideo -pix_fmt rgb24 -s {m['width']}x{m['height']} -r {m['fps']} "
+                       f"-i {os.path.basename(self.path)} -pix_fmt yuv420p {os.path.splitext(os.path.basename(self.path))[0]}.mp4")
+        with open(self.meta_path, "w") as f:
+            json.dump(m, f, indent=2)
+
+class FfmpegPipe:
+    def __init__(self, directory, width, height, fps, segment):
+        name = "capture" if segment == 0 else f"capture_{segment}"
+        self.proc = subprocess.Popen(
+            [shutil.which("ffmpeg"), "-loglevel", "error", "-y", "-f", "rawvideo", "-pix_fmt", "rgb24",
+             "-s", f"{width}x{height}", "-r", str(fps), "-i", "-", "-pix_fmt", "yuv420p",
+             os.path.join(directory, name + ".mp4")],
+            stdin=subprocess.PIPE)
+
+    def write(self, n, rgb):
+        self.proc.stdin.write(rgb)
+
+    def close(self):
+        try:
+            self.proc.stdin.close()
+            self.proc.wait(timeout=30)
+        except Exception:
+            self.proc.kill()
+
+SINKS = {"png": PngSequence, "raw": RawStream, "ffmpeg": FfmpegPipe}
+
+# ----------------------------
+# Recorder
+# ----------------------------
+class FrameRecorder:
+    def __init__(self, directory, fmt="png", fps=60, slots=8, log=None):
+        if fmt not in SINKS:
+            raise ValueError(f"unknown capture format: {fmt} (choose from {', '.join(FORMATS)})")
+        if fmt == "ffmpeg" and shutil.which("ffmpeg") is None:
+            if log: log.warn("ffmpeg not found on PATH, capturing raw rgb24 instead")
+            fmt = "raw"
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.fmt = fmt
+        self.fps = fps
+        self.log = log
+        self.n_slots = max(1, slots)
+        self.pool = None             # slot buffers, allocated on the first frame / after a size change
+        self.geometry = None         # (width, height, pitch, bytesize, offsets) of the pool
+        self.free = queue.Queue()
+        self.filled = queue.Queue()
+        self.offered = 0
+        self.captured = 0
+        self.dropped = 0
+        self.disabled = False
+        self._closed = False
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def offer(self, surface):
+        # frame loop side: one buffer copy or a drop, never a wait
+        if self._closed or self.disabled:
+            return False
+        self.offered += 1
+        geom = (surface.get_width(), surface.get_height(), surface.get_pitch(), surface.get_bytesize(), None)
+        if self.geometry is None or geom[:4] != self.geometry[:4]:
+            if self.pool is not None and self.free.qsize() < len(self.pool):
+                self.dropped += 1        # old-size frames still encoding; switch once they're done
+                return False
+            offsets = channel_offsets(surface)
+            if offsets is None:
+                self.disabled = True
+                if self.log: self.log.warn("capture disabled: unsupported surface format", bits=surface.get_bitsize())
+                return False
+            self.geometry = geom[:4] + (offsets,)
+            self.pool = [bytearray(geom[2] * geom[1]) for _ in range(self.n_slots)]
+            self.free = queue.Queue()
+            for i in range(self.n_slots):
+                self.free.put((self.pool, i))
+        try:
+            pool, i = self.free.get_nowait()
+        except queue.Empty:
+            self.dropped += 1
+            return False
+        with memoryview(surface.get_buffer()) as view:
+            pool[i][:] = view
+        self.filled.put((pool, i, self.geometry, self.offered))
+        return True
+
+    def _run(self):
+        sink = None; sink_geom = None; segment = 0
+        rgb = None
+        while True:
+            item = self.filled.get()
+            if item is None:
+                break
+            pool, i, geom, n = item
+            width, height, pitch, bytesize, offsets = geom
+            try:
+                if geom != sink_geom:
+                    if sink is not None:
+                        sink.close(); segment += 1
+                    sink = SINKS[self.fmt](self.directory, width, height, self.fps, segment)
+                    sink_geom = geom
+                    rgb = bytearray(width * height * 3)
+                to_rgb(pool[i], rgb, width, height, pitch, bytesize, offsets)
+                sink.write(n, rgb)
+                self.captured += 1
+            except Exception as e:
+                self.disabled = True
+                if self.log: self.log.error("capture encoder failed", error=str(e))
+            finally:
+                if pool is self.pool:
+                    self.free.put((pool, i))
+        if sink is not None:
+            try:
+                sink.close()
+            except Exception:
+                pass
+
+    def stats(self):
+        return {"format": self.fmt, "offered": self.offered, "captured": self.captured, "dropped": self.dropped,
+                "pending": self.filled.qsize()}
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self.filled.put(None)
+        self._thread.join(timeout=30)
+        if self.log:
+            self.log.info("capture finished", directory=self.directory, **self.stats())
@@ -0,0 +1,97 @@
+# gamelog.py -- Asphalt Rush buffered structured logging for the game process
+# log.info("msg", key=value) only appends a dict to an in-memory ring buffer; a background
+# thread echoes batches to stdout and ships them to the dashboard (ipc "logs" frames or HTTP),
+# so the frame loop and input path never block on I/O.
+# Debug output is off by default; guard hot call sites with `if log.debug_enabled:` so a
+# disabled debug line costs one attribute check.
+# The flush thread starts with the first entry, so importing / constructing a logger has no side effects.
+
+import sys, time, threading, atexit
+from collections import deque
+
+LEVELS = {"debug": 10, "info": 20, "warn": 30, "error": 40}
+
+class GameLogger:
+    def __init__(self, tag="main", level="info", capacity=2000, flush_interval=0.5, echo=True):
+        self.tag = tag
+        self.echo = echo
+        self.flush_interval = flush_interval
+        self.buffer = deque(maxlen=capacity)      # ring buffer: oldest entries drop under overload
+        self.unshipped = deque(maxlen=capacity)   # held until a shipper is attached
+        self.shipper = None                       # callable(list_of_entries) -> bool
+        self.dropped = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._closed = False
+        self.set_level(level)
+        self._thread = None
+
+    def set_level(self, level):
+        self.min_level = LEVELS.get(level, 20)
+        self.debug_enabled = self.min_level <= LEVELS["debug"]
+
+    def log(self, level, msg, **extra):
+        if LEVELS.get(level, 20) < self.min_level:
+            return
+        entry = {"t": time.time(), "level": level, "msg": msg}
+        if extra:
+            entry["extra"] = extra
+        with self._lock:
+            if len(self.buffer) == self.buffer.maxlen:
+                self.dropped += 1
+            self.buffer.append(entry)
+            if self._thread is None and not self._closed:
+                self._thread = threading.Thread(target=self._run, daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+        if level == "error":
+            self._wake.set()
+
+    def debug(self, msg, **extra): self.log("debug", msg, **extra)
+    def info(self, msg, **extra): self.log("info", msg, **extra)
+    def warn(self, msg, **extra): self.log("warn", msg, **extra)
+    def error(self, msg, **extra): self.log("error", msg, **extra)
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            self.flush()
+
+    def flush(self):
+        with self._flush_lock:
+            self._flush()
+
+    def _flush(self):
+        with self._lock:
+            if not self.buffer:
+                batch = []
+            else:
+                batch = list(self.buffer); self.buffer.clear()
+        if batch and self.echo:
+            try:
+                lines = []
+                for e in batch:
+                    extra = " ".join(f"{k}={v}" for k, v in e.get("extra", {}).items())
+                    lines.append(f"[{self.tag}] {e['level'].upper()} {e['msg']}" + (" " + extra if extra else ""))
+                sys.stdout.write("\n".join(lines) + "\n"); sys.stdout.flush()
+            except Exception:
+                pass
+        self.unshipped.extend(batch)
+        if self.shipper is not None and self.unshipped:
+            pending = list(self.unshipped)
+            try:
+                ok = self.shipper(pending)
+            except Exception:
+                ok = False
+            if ok:
+                for _ in range(len(pending)):
+                    self.unshipped.popleft()
+
+    def close(self):
+        if self._closed:
+            return
+        self._closed = True
+        self._wake.set()
+        self.flush()
@@ -0,0 +1,98 @@
+# import_budget.py -- Asphalt Rush import-time budget
+# Imports each module in a fresh interpreter (one warm-up run so bytecode is cached, then the
+# median of --runs) and compares the wall time with its budget, so the dashboard and tooling
+# start paths don't quietly pick up heavy imports again.
+# Library modules are also checked for import side effects: no pygame, no argv parsing (a bogus
+# flag is passed), no threads started.
+# Usage:
+#   python import_budget.py                       # table, exit 1 on an overrun or side effect
+#   python import_budget.py --runs 9 --json import_times.json
+#   python import_budget.py --modules main,app --scale 1.5   (slow CI box: budgets x 1.5)
+
+import os, sys, json, argparse, tempfile, subprocess
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# module -> (budget ms, library module: must import without side effects)
+BUDGETS = {
+    "main":       (150, True),       # game as a library: pygame is imported on first use
+    "predictors": (30, True),
+    "trackgen":   (60, True),
+    "snapshot":   (40, True),
+    "gamelog":    (30, True),
+    "capture":    (60, True),
+    "telemetry":  (60, True),
+    "analytics":  (40, True),
+    "logstore":   (40, True),
+    "ingest":     (20, True),
+    "spectate":   (20, True),
+    "memwatch":   (20, True),
+    "app":        (500, False),      # dashboard: Flask dominates
+}
+
+PROBE = """
+import sys, time, threading
+before = threading.active_count()
+t0 = time.perf_counter()
+import {mod}
+ms = (time.perf_counter() - t0) * 1000.0
+import json
+print(json.dumps({{"ms": ms, "pygame": "pygame" in sys.modules, "threads": threading.active_count() - before}}))
+"""
+
+def probe(mod, env):
+    # the bogus flag makes a module that parses sys.argv at import exit with an argparse error
+    r = subprocess.run([sys.executable, "-c", PROBE.format(mod=mod), "--not-a-game-flag"], cwd=BASE_DIR, env=env,
+                       capture_output=True, text=True, timeout=60)
+    if r.returncode != 0:
+        return {"error": (r.stderr.strip().splitlines() or ["exit %d" % r.returncode])[-1]}
+    return json.loads(r.stdout.strip().splitlines()[-1])
+
+def main():
+    parser = argparse.ArgumentParser(description="Asphalt Rush import-time budget")
+    parser.add_argument("--modules", type=str, default=",".join(BUDGETS), help="comma separated modules to check")
+    parser.add_argument("--runs", type=int, default=5, help="timed imports per module (median is reported)")
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget (slow machines)")
+    parser.add_argument("--json", type=str, default="", help="write the results as JSON")
+    opts = parser.parse_args()
+
+    env = dict(os.environ, SDL_VIDEODRIVER="dummy", SDL_AUDIODRIVER="dummy")
+    env.pop("PYTHONDONTWRITEBYTECODE", None)
+    tmp = tempfile.mkdtemp(prefix="asphalt_import_")
+    env["ASPHALT_LOG_FILE"] = os.path.join(tmp, "session_logs.json")     # importing app.py logs its start
+
+    results = []; failed = False
+    for mod in [m.strip() for m in opts.modules.split(",") if m.strip()]:
+        budget, library = BUDGETS.get(mod, (100, True))
+        budget *= opts.scale
+        first = probe(mod, env)                                           # warm-up: writes the .pyc
+        runs = [first] if "error" in first else [probe(mod, env) for _ in range(max(1, opts.runs))]
+        errors = [r["error"] for r in runs if "error" in r]
+        times = sorted(r["ms"] for r in runs if "error" not in r)
+        res = {"module": mod, "budget_ms": round(budget, 1), "library": library}
+        problems = []
+        if errors:
+            problems.append(errors[0])
+        else:
+            res["median_ms"] = round(times[len(times) // 2], 1); res["min_ms"] = round(times[0], 1)
+            res["pygame"] = any(r["pygame"] for r in runs); res["threads"] = max(r["threads"] for r in runs)
+            if res["median_ms"] > budget:
+                problems.append(f"over budget ({res['median_ms']} > {round(budget, 1)} ms)")
+            if library and res["pygame"]:
+                problems.append("imports pygame")
+            if library and res["threads"]:
+                problems.append(f"starts {res['threads']} thread(s)")
+        res["problems"] = problems
+        failed = failed or bool(problems)
+        results.append(res)
+        shown = f"{res['median_ms']:>7} ms (min {res['min_ms']})" if "median_ms" in res else "      -"
+        print(f"  {mod:<12} {shown}  budget {round(budget, 1):>6} ms  {'OK' if not problems else 'FAIL: ' + '; '.join(problems)}")
+
+    if opts.json:
+        with open(opts.json, "w") as f:
+            json.dump({"version": 1, "python": sys.version.split()[0], "runs": opts.runs, "results": results}, f, indent=2)
+        print(f"[import] results written to {opts.json}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+# ingest.py -- Asphalt Rush bulk score ingestion (/submit_scores)
+# Simulated and real games post batches of scored runs, each tagged with a client-generated id
+# and its session id. A batch is validated in one pass and either rejected whole or accepted
+# whole; (session, id) pairs already seen are skipped, so a retried batch changes nothing.
+# The seen index is a bounded insertion-ordered set: the oldest ids fall out past SEEN_CAPACITY.
+# No Flask here; app.py owns the locking and the single log write per batch.
+
+import math
+from collections import OrderedDict
+
+MAX_BATCH = 5000
+SEEN_CAPACITY = 200000
+ID_MAX_LEN = 64
+MODES = ("normal", "hard")
+T_MAX_AGE_S = 30 * 86400             # run end times accepted: up to 30 days old ...
+T_MAX_AHEAD_S = 3600                 # ... and an hour ahead (client clock skew)
+
+# ----------------------------
+# Seen-id index
+# ----------------------------
+class SeenIds:
+    def __init__(self, capacity=SEEN_CAPACITY):
+        self.capacity = capacity
+        self._ids = OrderedDict()
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, key):
+        return key in self._ids
+
+    def add(self, key):
+        # False if the key was already there
+        if key in self._ids:
+            return False
+        self._ids[key] = None
+        if len(self._ids) > self.capacity:
+            self._ids.popitem(last=False)
+        return True
+
+# ----------------------------
+# Batch validation
+# ----------------------------
+def _text(v):
+    return isinstance(v, str) and 0 < len(v) <= ID_MAX_LEN
+
+def _int(v):
+    return isinstance(v, int) and not isinstance(v, bool)
+
+def validate_batch(data, now, min_lanes=2, max_lanes=20):
+    # -> (runs, errors); runs are (key, id, session, score, lanes, t, mode) with key (session, id),
+    # errors (index, reason)
+    runs = data.get("runs") if isinstance(data, dict) else None
+    if not isinstance(runs, list) or not runs:
+        return [], [(None, "body must be {\"runs\": [...]} with at least one run")]
+    if len(runs) > MAX_BATCH:
+        return [], [(None, f"at most {MAX_BATCH} runs per batch")]
+    out = []; errors = []
+    for i, r in enumerate(runs):
+        if not isinstance(r, dict):
+            errors.append((i, "run must be an object")); continue
+        rid, session, score, lanes = r.get("id"), r.get("session"), r.get("score"), r.get("lanes")
+        t = r.get("t", now); mode = r.get("mode", "normal")
+        if not _text(rid):
+            errors.append((i, f"id must be a string of 1-{ID_MAX_LEN} chars")); continue
+        if not _text(session):
+            errors.append((i, f"session must be a string of 1-{ID_MAX_LEN} chars")); continue
+        if not _int(score) or score < 0:
+            errors.append((i, "score must be a non-negative integer")); continue
+        if not _int(lanes) or not (min_lanes <= lanes <= max_lanes):
+            errors.append((i, f"lanes must be an integer {min_lanes}-{max_lanes}")); continue
+        if not isinstance(t, (int, float)) or isinstance(t, bool) or not math.isfinite(t) \
+                or not (now - T_MAX_AGE_S <= t <= now + T_MAX_AHEAD_S):
+            errors.append((i, "t must be epoch seconds within the last 30 days")); continue
+        if mode not in MODES:
+            errors.append((i, f"mode must be one of {', '.join(MODES)}")); continue
+        out.append(((session, rid), rid, session, score, lanes, float(t), mode))
+    return (out, errors) if not errors else ([], errors)
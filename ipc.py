@@ -0,0 +1,188 @@
+# ipc.py -- Asphalt Rush local channel between dashboard (app.py) and game (main.py)
+# One persistent socket per game: a Unix domain socket where available, loopback TCP otherwise.
+# Messages are length-prefixed frames: 4-byte big-endian size + UTF-8 JSON object with a "type" key.
+#   dashboard -> game : {"type": "color", "hex": "#0f766e"}, {"type": "theme", "key": "blue"}
+#                       {"type": "spectate", "fps": 5, "key": true}  start / stop (fps 0) spectator frames
+#   game -> dashboard : {"type": "hello", "pid": ..., "session": ...}, {"type": "score", ...}, {"type": "status", ...}
+#                       {"type": "tm", "v": [...]}  telemetry sample, values in TELEMETRY_FIELDS order
+#                       {"type": "frame", ...}  spectator frame, see spectate.py
+# No pygame / flask imports here so both processes can share it.
+
+import os, socket, struct, json, threading, tempfile
+
+HEADER = struct.Struct(">I")
+MAX_FRAME = 4 * 1024 * 1024
+
+# compact telemetry sample layout shared by main.py (producer) and telemetry.py (storage)
+TELEMETRY_FIELDS = ("t", "score", "speed", "spawn_ms", "fps", "frame_ms", "knn_acc", "quality")
+
+# ----------------------------
+# Framing
+# ----------------------------
+def encode_frame(msg):
+    payload = json.dumps(msg, separators=(",", ":")).encode("utf-8")
+    return HEADER.pack(len(payload)) + payload
+
+def _recv_exact(sock, n):
+    buf = bytearray()
+    while len(buf) < n:
+        chunk = sock.recv(n - len(buf))
+        if not chunk:
+            return None
+        buf += chunk
+    return bytes(buf)
+
+def recv_frame(sock):
+    head = _recv_exact(sock, HEADER.size)
+    if head is None:
+        return None
+    (n,) = HEADER.unpack(head)
+    if n > MAX_FRAME:
+        raise ValueError(f"frame too large: {n}")
+    payload = _recv_exact(sock, n)
+    if payload is None:
+        return None
+    return json.loads(payload.decode("utf-8"))
+
+# ----------------------------
+# Addresses: "unix:/path" or "tcp:127.0.0.1:port"
+# ----------------------------
+def listen(tag="asphalt_rush"):
+    if hasattr(socket, "AF_UNIX"):
+        path = os.path.join(tempfile.gettempdir(), f"{tag}_{os.getpid()}.sock")
+        try:
+            os.unlink(path)
+        except OSError:
+            pass
+        try:
+            srv = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            srv.bind(path); srv.listen(8)
+            return srv, "unix:" + path
+        except OSError:
+            pass
+    srv = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    srv.bind(("127.0.0.1", 0)); srv.listen(8)
+    return srv, "tcp:127.0.0.1:%d" % srv.getsockname()[1]
+
+def connect(address, timeout=1.0):
+    kind, _, rest = address.partition(":")
+    if kind == "unix":
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(timeout); sock.connect(rest)
+    elif kind == "tcp":
+        host, _, port = rest.rpartition(":")
+        sock = socket.create_connection((host, int(port)), timeout=timeout)
+        sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+    else:
+        raise ValueError(f"unknown ipc address: {address}")
+    sock.settimeout(None)
+    return sock
+
+# ----------------------------
+# Channel: one connected socket, reader thread + locked writer
+# ----------------------------
+class Channel:
+    def __init__(self, sock, on_message, on_close=None):
+        self.sock = sock
+        self.on_message = on_message
+        self.on_close = on_close
+        self.closed = False
+        self.peer = {}
+        self._send_lock = threading.Lock()
+        self._reader = threading.Thread(target=self._read_loop, daemon=True)
+        self._reader.start()
+
+    def send(self, msg):
+        if self.closed:
+            return False
+        data = encode_frame(msg)
+        try:
+            with self._send_lock:
+                self.sock.sendall(data)
+            return True
+        except OSError:
+            self.close()
+            return False
+
+    def _read_loop(self):
+        try:
+            while not self.closed:
+                msg = recv_frame(self.sock)
+                if msg is None:
+                    break
+                try:
+                    self.on_message(self, msg)
+                except Exception:
+                    pass
+        except (OSError, ValueError):
+            pass
+        self.close()
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+        if self.on_close:
+            try:
+                self.on_close(self)
+            except Exception:
+                pass
+
+# ----------------------------
+# Server side (dashboard): accepts game connections, pushes to all of them
+# ----------------------------
+class ChannelServer:
+    def __init__(self, on_message, on_connect=None, tag="asphalt_rush", on_disconnect=None):
+        self.on_message = on_message
+        self.on_connect = on_connect
+        self.on_disconnect = on_disconnect
+        self.channels = []
+        self._lock = threading.Lock()
+        self.sock, self.address = listen(tag)
+        threading.Thread(target=self._accept_loop, daemon=True).start()
+
+    def _accept_loop(self):
+        while True:
+            try:
+                conn, _ = self.sock.accept()
+            except OSError:
+                return
+            ch = Channel(conn, self.on_message, self._forget)
+            with self._lock:
+                self.channels.append(ch)
+            if self.on_connect:
+                try:
+                    self.on_connect(ch)
+                except Exception:
+                    pass
+
+    def _forget(self, ch):
+        with self._lock:
+            if ch in self.channels:
+                self.channels.remove(ch)
+        if self.on_disconnect:
+            self.on_disconnect(ch)
+
+    def broadcast(self, msg):
+        with self._lock:
+            chans = list(self.channels)
+        sent = 0
+        for ch in chans:
+            if ch.send(msg):
+                sent += 1
+        return sent
+
+    def close(self):
+        try:
+            self.sock.close()
+        except OSError:
+            pass
+        if self.address.startswith("unix:"):
+            try:
+                os.unlink(self.address[5:])
+            except OSError:
+                pass
@@ -0,0 +1,349 @@
+# kiosk.py -- Asphalt Rush multi-cabinet host: several independent games in one process
+# main.py keeps a game's settings (lanes, mode, playfield, quality) in module globals set by
+# configure(), so each cabinet is its own execution of main.py. main.share_from() then points the
+# process-wide objects of the others (fonts, text / digit caches, tinted sprites, the asset loader,
+# the logger) at the first cabinet's, so pygame init, sound synthesis, sprite loading and text
+# rendering happen once however many cabinets run.
+# Each cabinet has its own World, keys, lane count / mode, pause and game-over timer.
+# Output: one window split into viewports (default), or one SDL2 texture window per cabinet (--windows).
+# Audio: one shared music loop and per-cabinet crash sounds; no engine loops (N of them would drone).
+# Finished runs go to the dashboard's /submit_scores with per-run ids, so runs a failed post left
+# queued are simply sent again (every RETRY_S, and once more at exit) without being counted twice.
+# Usage:
+#   python kiosk.py --games 4                                  # default keys: A/D W, arrows Up, J/L I, keypad 4/6 8
+#   python kiosk.py --game 3 --game 4:j:l:i --game 5:left:right:up:hard
+#   python kiosk.py --games 4 --windows                        # one window per cabinet
+#   SDL_VIDEODRIVER=dummy python kiosk.py --games 4 --frames 600   (headless: startup / memory figures)
+
+import os, math, json, time, uuid, argparse, threading, importlib.util
+from collections import deque
+import urllib.request
+from ingest import MAX_BATCH
+from memwatch import rss_bytes
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_KEYS = (("a", "d", "w"), ("left", "right", "up"), ("j", "l", "i"), ("[4]", "[6]", "[8]"))
+CABINET_COLORS = ((15,119,110), (190,70,60), (60,100,190), (200,150,40))
+CELL = (360, 480)                    # default viewport per cabinet in the shared window
+GAME_OVER_MS = 4000                  # then a new run starts by itself (or on the cabinet's action key)
+MAX_PENDING_RUNS = 1000
+POST_TIMEOUT_S = 2.0
+RETRY_S = 5.0                        # a failed score post is tried again this much later
+DASHBOARD_URL = "http://127.0.0.1:5000"
+
+# ----------------------------
+# Cabinet specs: LANES[:LEFT:RIGHT[:ACTION]][:hard]
+# ----------------------------
+def parse_game(text, index):
+    parts = [p for p in text.split(":") if p]
+    hard = bool(parts) and parts[-1].lower() == "hard"
+    if hard:
+        parts = parts[:-1]
+    if not parts or not parts[0].isdigit() or len(parts) not in (1, 3, 4):
+        raise ValueError(f"bad game spec {text!r}: LANES[:LEFT:RIGHT[:ACTION]][:hard]")
+    keys = list(DEFAULT_KEYS[index % len(DEFAULT_KEYS)])
+    keys[:len(parts) - 1] = parts[1:]
+    return {"lanes": int(parts[0]), "keys": keys, "hard": hard}
+
+def load_games(specs, render_scale):
+    # cabinet 1 is the regular main module, the others fresh executions of main.py sharing its caches
+    import main as first
+    games = []
+    for i, spec in enumerate(specs):
+        if i == 0:
+            game = first
+        else:
+            mod_spec = importlib.util.spec_from_file_location(f"main_cabinet{i + 1}", os.path.join(BASE_DIR, "main.py"))
+            game = importlib.util.module_from_spec(mod_spec)
+            mod_spec.loader.exec_module(game)
+            game.share_from(first)
+        game.configure(game.make_config(lanes=spec["lanes"], hard=spec["hard"], render_scale=render_scale,
+                                        mem_interval=0, spectate_fps=0))
+        games.append(game)
+    return games
+
+def viewports(n, window_size, render_size):
+    # grid cells (one row up to 4 cabinets), each frame fitted inside its cell keeping the aspect ratio
+    import pygame
+    cols = n if n <= 4 else math.ceil(math.sqrt(n)); rows = math.ceil(n / cols)
+    cw, ch = window_size[0] // cols, window_size[1] // rows
+    k = min(cw / render_size[0], ch / render_size[1])
+    w, h = max(1, int(render_size[0] * k)), max(1, int(render_size[1] * k))
+    return [pygame.Rect((i % cols) * cw + (cw - w) // 2, (i // cols) * ch + (ch - h) // 2, w, h) for i in range(n)]
+
+def grid_size(n):
+    cols = n if n <= 4 else math.ceil(math.sqrt(n))
+    return cols * CELL[0], math.ceil(n / cols) * CELL[1]
+
+# ----------------------------
+# Dashboard scores: idempotent bulk posts, one in flight
+# ----------------------------
+class ScoreOutbox:
+    def __init__(self, url):
+        self.url = url
+        self.pending = deque(maxlen=MAX_PENDING_RUNS)
+        self.sent = 0; self.failed_posts = 0
+        self.next_try = 0.0
+        self._busy = False
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def add(self, run):
+        with self._lock:
+            self.pending.append(run)
+            self.next_try = 0.0
+        self.flush()
+
+    def flush(self, wait=False):
+        # frame loop: at most one post in flight, failed ones retried every RETRY_S.
+        # wait=True (exit): let the post in flight finish, then send what is left in batches.
+        if wait:
+            if self._thread is not None:
+                self._thread.join(POST_TIMEOUT_S + 1.0)
+            while True:
+                with self._lock:
+                    if not self.url or self._busy or not self.pending:
+                        return
+                    self._busy = True
+                    batch = list(self.pending)[:MAX_BATCH]
+                if not self._post(batch):
+                    return
+        with self._lock:
+            if not self.url or self._busy or not self.pending or time.monotonic() < self.next_try:
+                return
+            self._busy = True
+            batch = list(self.pending)[:MAX_BATCH]
+        self._thread = threading.Thread(target=self._post, args=(batch,), daemon=True)
+        self._thread.start()
+
+    def _post(self, batch):
+        ok = False
+        try:
+            req = urllib.request.Request(self.url, data=json.dumps({"runs": batch}).encode("utf-8"),
+                                         headers={"Content-Type": "application/json"})
+            with urllib.request.urlopen(req, timeout=POST_TIMEOUT_S) as r:
+                ok = r.status == 200
+        except Exception:
+            pass
+        with self._lock:
+            if ok:
+                done = {r["id"] for r in batch}
+                keep = [r for r in self.pending if r["id"] not in done]
+                self.pending.clear(); self.pending.extend(keep)
+                self.sent += len(batch)
+            else:
+                self.failed_posts += 1
+                self.next_try = time.monotonic() + RETRY_S
+            self._busy = False
+        return ok
+
+# ----------------------------
+# One cabinet: a game module, its render target, its World
+# ----------------------------
+class Cabinet:
+    def __init__(self, index, game, keys, target, pygame):
+        self.index = index
+        self.game = game
+        self.target = target
+        self.left, self.right, self.action = (pygame.key.key_code(k) for k in keys)
+        self.labels = [k.strip("[]").upper() for k in keys]
+        self.session = f"kiosk-{os.getpid()}-{index + 1}"
+        self.color = CABINET_COLORS[index % len(CABINET_COLORS)]
+        self.font = game.get_font(max(8, game.S(26))); self.big_font = game.get_font(max(10, game.S(48)))
+        self.scene = game.Scene()
+        self.world = None
+        self.paused = False
+        self.over_at = None
+        self.runs = 0
+
+    def new_run(self, now):
+        if self.world is not None:
+            self.world.close()
+        self.world = self.game.World(now, self.game.assets.get("sprite"), self.color)
+        self.paused = False; self.over_at = None
+
+    def key(self, key, now):
+        if key == self.action:
+            if self.over_at is not None:
+                self.new_run(now)
+            elif self.paused:
+                self.world.resume(now); self.paused = False
+            else:
+                self.world.pause(now); self.paused = True
+        elif self.over_at is None and not self.paused:
+            self.world.player.request_lane_change(-1 if key == self.left else 1, time.perf_counter())
+
+    def update(self, now, dt):
+        # the finished run (for the dashboard) when the car crashed this frame
+        if self.over_at is not None:
+            if now - self.over_at >= GAME_OVER_MS:
+                self.new_run(now)
+            return None
+        if self.paused or self.world.step(now, dt) is None:
+            return None
+        self.over_at = now; self.runs += 1
+        g = self.game
+        return {"id": uuid.uuid4().hex, "session": self.session, "score": self.world.score, "lanes": g.LANES,
+                "mode": "hard" if g.args.hard else "normal", "t": time.time()}
+
+    def draw(self, dt):
+        g = self.game; S = g.S; world = self.world
+        if self.over_at is not None:
+            go = g.text_cache.render_static(self.big_font, "GAME OVER", (220,80,80))
+            info = g.text_cache.render(self.font, f"Score {world.score} — {self.labels[2]} to play again", (220,220,220))
+            self.target.draw_overlay((12,12,14), 220, [(go, ((g.RENDER_W - go.get_width())//2, S(g.HEIGHT//3))),
+                                                       (info, ((g.RENDER_W - info.get_width())//2, S(g.HEIGHT//2 + 40)))])
+            self.target.present()
+            return
+        scene = self.scene.begin(world.obstacle_speed, 0 if self.paused else dt)
+        scene.cars.extend(world.obstacles)
+        scene.cars.append(world.player)
+        scene.numbers.append((self.font, world.score, (220,220,220), (S(g.WIDTH - 140), S(12)), "Score: "))
+        scene.texts.append((g.text_cache.render_static(self.font, f"P{self.index + 1}", self.color), (S(12), S(12))))
+        hint = f"{self.labels[0]}/{self.labels[1]} move — {self.labels[2]} pause"
+        scene.texts.append((g.text_cache.render_static(self.font, hint, (200,200,200)), (S(12), S(g.HEIGHT - 28))))
+        if self.paused:
+            p_surf = g.text_cache.render_static(self.big_font, "PAUSED", (245,245,245))
+            scene.texts.append((p_surf, ((g.RENDER_W - p_surf.get_width())//2, S(g.HEIGHT//2 - 40))))
+        self.target.draw(scene)
+        self.target.present()
+
+# ----------------------------
+# Host loop
+# ----------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Asphalt Rush kiosk host: several games in one process")
+    parser.add_argument("--game", action="append", default=[], help="cabinet LANES[:LEFT:RIGHT[:ACTION]][:hard] (pygame key names), repeatable")
+    parser.add_argument("--games", type=int, default=0, help="this many 3-lane cabinets with the default keys (when no --game)")
+    parser.add_argument("--windows", action="store_true", help="one SDL2 texture window per cabinet instead of viewports of one window")
+    parser.add_argument("--window", type=str, default="", help="shared window size WxH (default: 360x480 per cabinet)")
+    parser.add_argument("--render-scale", type=float, default=0.0, help="internal frame scale per cabinet (default: fit the viewport)")
+    parser.add_argument("--dashboard", type=str, default=DASHBOARD_URL, help="dashboard base URL for scores ('' to keep them local)")
+    parser.add_argument("--frames", type=int, default=0, help="exit after this many frames (benchmarks, headless checks)")
+    opts = parser.parse_args()
+
+    specs = opts.game or [str(3)] * max(1, opts.games)
+    try:
+        specs = [parse_game(s, i) for i, s in enumerate(specs)]
+    except ValueError as e:
+        parser.error(str(e))
+    t0 = time.perf_counter()
+
+    import pygame
+    import main as first
+    n = len(specs)
+    window_size = first.parse_window_size(opts.window) if opts.window else grid_size(n)
+    cells = viewports(n, window_size, (first.DEFAULT_WIDTH, first.HEIGHT))
+    render_scale = opts.render_scale or (1.0 if opts.windows else min(1.0, cells[0].height / first.HEIGHT))
+    games = load_games(specs, render_scale)
+    log = first.log
+    try:
+        pygame.mixer.pre_init(first.SAMPLE_RATE, -16, 1, first.MIXER_BUFFER)
+    except Exception:
+        pass
+    pygame.init()
+    # every key belongs to one cabinet: an overlap would leave a player with a dead key
+    owners = {}
+    for i, spec in enumerate(specs):
+        for name in spec["keys"]:
+            try:
+                code = pygame.key.key_code(name)
+            except ValueError:
+                parser.error(f"cabinet {i + 1}: unknown key {name!r}")
+            if code in owners:
+                parser.error(f"cabinet {i + 1} uses key {name!r} twice" if owners[code] == i else
+                             f"key {name!r} of cabinet {i + 1} is already used by cabinet {owners[code] + 1}")
+            owners[code] = i
+    first.assets.start()
+
+    window = None
+    if not opts.windows:
+        window = pygame.display.set_mode(window_size, pygame.RESIZABLE)
+        pygame.display.set_caption(f"Asphalt Rush — kiosk ({n} games)")
+    cabinets = []
+    for i, (game, spec) in enumerate(zip(games, specs)):
+        target = game.TextureBackend(game.WINDOW_SIZE) if opts.windows else game.OffscreenBackend(game.WINDOW_SIZE)
+        target.set_caption(f"Asphalt Rush — P{i + 1} ({game.LANES} lanes)")
+        cabinets.append(Cabinet(i, game, spec["keys"], target, pygame))
+    keymap = {k: cab for cab in cabinets for k in (cab.left, cab.right, cab.action)}
+
+    def layout():
+        # viewport subsurfaces of the shared window (again after a resize)
+        window.fill((0,0,0))
+        return [window.subsurface(r) for r in viewports(n, window.get_size(), cabinets[0].target.canvas.get_size())]
+
+    views = layout() if window is not None else None
+    outbox = ScoreOutbox(opts.dashboard.rstrip("/") + "/submit_scores" if opts.dashboard else "")
+    clock = pygame.time.Clock()
+    now = pygame.time.get_ticks()
+    for cab in cabinets:
+        cab.new_run(now)
+    crash_sound = bgm_channel = None
+    frames = 0
+    running = True
+    log.info("kiosk starting", games=n, lanes=[g.LANES for g in games], windows=opts.windows, render_scale=render_scale)
+
+    while running:
+        dt = clock.tick(first.FPS)
+        frame_start = time.perf_counter()
+        now = pygame.time.get_ticks()
+        for event in pygame.event.get():
+            if event.type == pygame.QUIT or (event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE):
+                running = False
+            elif event.type == pygame.VIDEORESIZE and window is not None:
+                window = pygame.display.set_mode((event.w, event.h), pygame.RESIZABLE)
+                views = layout()
+            elif event.type == pygame.KEYDOWN and event.key in keymap:
+                keymap[event.key].key(event.key, now)
+
+        for name in first.assets.take():
+            if name == "sprite":
+                for cab in cabinets:
+                    cab.world.set_sprite(first.assets.get("sprite"))
+            elif name == "crash":
+                crash_sound = first.assets.get("crash")
+            elif name == "bgm" and first.assets.get("bgm"):
+                bgm_channel = first.play_loop(first.assets.get("bgm"), 0.6)
+
+        for cab in cabinets:
+            run = cab.update(now, dt)
+            if run is not None:
+                if crash_sound:
+                    crash_sound.play()
+                log.info("run over", cabinet=cab.index + 1, score=run["score"], lanes=run["lanes"])
+                outbox.add(run)
+        outbox.flush()                   # a failed post is retried after RETRY_S
+        for cab in cabinets:
+            cab.draw(dt)
+        if window is not None:
+            for cab, view in zip(cabinets, views):
+                pygame.transform.scale(cab.target.canvas, view.get_size(), view)
+            pygame.display.flip()
+
+        # every cabinet's governor sees the whole host frame, so they step quality down together
+        work_ms = (time.perf_counter() - frame_start) * 1000.0
+        for game in games:
+            if game.governor.observe(work_ms) is not None:
+                log.info("quality changed", level=game.governor.level, work_ms=round(work_ms, 1))
+        frames += 1
+        if frames == 1:
+            rss = rss_bytes()
+            log.info("first frame", games=n, ms=round((time.perf_counter() - t0) * 1000.0, 1),
+                     rss_mb=round(rss / 1048576.0, 1) if rss else None)
+        if opts.frames and frames >= opts.frames:
+            running = False
+
+    outbox.flush(wait=True)
+    rss = rss_bytes()
+    log.info("kiosk exit", frames=frames, runs=[c.runs for c in cabinets], scores_sent=outbox.sent,
+             scores_pending=len(outbox.pending), rss_mb=round(rss / 1048576.0, 1) if rss else None,
+             assets_ms=first.assets.finished_ms)
+    if bgm_channel:
+        bgm_channel.stop()
+    for cab in cabinets:
+        cab.world.close()
+    log.close()
+    pygame.quit()
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,147 @@
+# loadtest.py -- Asphalt Rush dashboard load test
+# Starts app.py --prod once per request-thread count (or targets a running dashboard with --url)
+# and drives it with client processes replaying the dashboard's own polling mix plus score
+# submissions, reporting requests/s and p50/p99 latency per configuration.
+# The spawned dashboards log to a temp file (ASPHALT_LOG_FILE) so session_logs.json is untouched.
+# Usage:
+#   python loadtest.py                                   # threads 1,2,4,8, 10 s each
+#   python loadtest.py --threads 1,8 --seconds 5 --clients 16 --out load.json
+#   python loadtest.py --url http://127.0.0.1:5000 --seconds 5
+#   python loadtest.py --bulk 500 --threads 4             # simulated games posting /submit_scores batches
+
+import os, sys, time, json, uuid, random, argparse, tempfile, subprocess
+import urllib.request, urllib.error
+from multiprocessing import Process, Queue
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# (weight, method, path) -- roughly what an open dashboard tab polls
+MIX = [
+    (30, "GET", "/api/runtime"),
+    (15, "GET", "/api/last_run"),
+    (10, "GET", "/api/color"),
+    (10, "GET", "/api/theme"),
+    (15, "GET", "/api/logs"),
+    (10, "GET", "/api/telemetry"),
+    (10, "POST", "/submit_score"),
+]
+
+def percentile(sorted_vals, q):
+    if not sorted_vals: return 0.0
+    return sorted_vals[min(len(sorted_vals) - 1, int(q * (len(sorted_vals) - 1) + 0.5))]
+
+def bulk_batch(rng, session, size):
+    return {"runs": [{"id": uuid.uuid4().hex, "session": session, "score": rng.randrange(500), "lanes": rng.randrange(2, 7),
+                      "mode": rng.choice(("normal", "hard"))} for _ in range(size)]}
+
+def client(url, seconds, seed, out, bulk=0):
+    # bulk > 0: post /submit_scores batches of that many runs instead of the polling mix
+    rng = random.Random(seed)
+    weights = [w for w, _, _ in MIX]
+    session = f"load-{seed}"
+    lat, errors = [], 0
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        _, method, path = ("", "POST", "/submit_scores") if bulk else rng.choices(MIX, weights)[0]
+        data = None
+        if bulk:
+            data = json.dumps(bulk_batch(rng, session, bulk)).encode("utf-8")
+        elif method == "POST":
+            data = json.dumps({"score": rng.randrange(500), "lanes": 3}).encode("utf-8")
+        req = urllib.request.Request(url + path, data=data, method=method, headers={"Content-Type": "application/json"})
+        t0 = time.perf_counter()
+        try:
+            with urllib.request.urlopen(req, timeout=10) as r:
+                r.read()
+        except (urllib.error.URLError, OSError):
+            errors += 1
+            continue
+        lat.append((time.perf_counter() - t0) * 1000.0)
+    out.put((lat, errors))
+
+def wait_ready(url, timeout=15.0):
+    end = time.time() + timeout
+    while time.time() < end:
+        try:
+            with urllib.request.urlopen(url + "/api/runtime", timeout=1) as r:
+                r.read(); return True
+        except (urllib.error.URLError, OSError):
+            time.sleep(0.1)
+    return False
+
+def run_load(url, clients, seconds, bulk=0):
+    q = Queue()
+    procs = [Process(target=client, args=(url, seconds, i, q, bulk)) for i in range(clients)]
+    for p in procs: p.start()
+    lat, errors = [], 0
+    for _ in procs:
+        l, e = q.get(); lat.extend(l); errors += e
+    for p in procs: p.join()
+    lat.sort()
+    r = lambda v: round(v, 3)
+    return {"requests": len(lat), "errors": errors, "rps": r(len(lat) / seconds), "runs_per_s": r(len(lat) * bulk / seconds),
+            "p50_ms": r(percentile(lat, 0.5)), "p99_ms": r(percentile(lat, 0.99)), "max_ms": r(lat[-1] if lat else 0.0)}
+
+def start_dashboard(threads, port, log_file):
+    env = dict(os.environ, ASPHALT_LOG_FILE=log_file)
+    return subprocess.Popen([sys.executable, os.path.join(BASE_DIR, "app.py"), "--prod", "--threads", str(threads),
+                             "--port", str(port)], cwd=BASE_DIR, env=env,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+def bulk_note(res):
+    return f" ({res['runs_per_s']} runs/s)" if res.get("runs_per_s") else ""
+
+def main():
+    parser = argparse.ArgumentParser(description="Asphalt Rush dashboard load test")
+    parser.add_argument("--threads", type=str, default="1,2,4,8", help="request thread counts to compare, comma separated")
+    parser.add_argument("--clients", type=int, default=8, help="concurrent client processes")
+    parser.add_argument("--seconds", type=float, default=10.0, help="load duration per configuration")
+    parser.add_argument("--port", type=int, default=5055, help="port for the spawned dashboards")
+    parser.add_argument("--url", type=str, default="", help="load an already running dashboard instead")
+    parser.add_argument("--bulk", type=int, default=0, help="runs per /submit_scores batch; clients post only those")
+    parser.add_argument("--out", type=str, default="", help="write the results as JSON")
+    opts = parser.parse_args()
+
+    results = []
+    if opts.url:
+        url = opts.url.rstrip("/")
+        if not wait_ready(url, 3.0):
+            print(f"[load] {url} is not answering"); sys.exit(1)
+        res = run_load(url, opts.clients, opts.seconds, opts.bulk)
+        res["threads"] = None
+        results.append(res)
+        print(f"[load] {url}: {res['rps']} req/s{bulk_note(res)}  p50={res['p50_ms']} ms  p99={res['p99_ms']} ms  errors={res['errors']}")
+    else:
+        try:
+            counts = [int(t) for t in opts.threads.split(",") if t.strip()]
+        except ValueError:
+            parser.error("--threads must be comma separated integers")
+        url = f"http://127.0.0.1:{opts.port}"
+        for threads in counts:
+            fd, log_file = tempfile.mkstemp(prefix="asphalt_load_", suffix=".json"); os.close(fd)
+            os.unlink(log_file)
+            proc = start_dashboard(threads, opts.port, log_file)
+            try:
+                if not wait_ready(url):
+                    print(f"[load] dashboard with {threads} threads did not come up"); continue
+                res = run_load(url, opts.clients, opts.seconds, opts.bulk)
+            finally:
+                proc.terminate()
+                try: proc.wait(timeout=5)
+                except subprocess.TimeoutExpired: proc.kill()
+                base = os.path.splitext(log_file)[0]
+                for path in (log_file, base + ".rollups.json", base + ".jsonl", base + ".jsonl.idx"):
+                    if os.path.exists(path): os.unlink(path)
+            res["threads"] = threads
+            results.append(res)
+            print(f"[load] {threads:>2} threads: {res['rps']} req/s{bulk_note(res)}  p50={res['p50_ms']} ms  p99={res['p99_ms']} ms  "
+                  f"errors={res['errors']}")
+
+    if opts.out:
+        with open(opts.out, "w") as f:
+            json.dump({"version": 1, "created": time.time(), "clients": opts.clients, "seconds": opts.seconds, "bulk": opts.bulk,
+                       "mix": [list(m) for m in MIX], "results": results}, f, indent=2)
+        print(f"[load] results written to {opts.out}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+# logstore.py -- Asphalt Rush dashboard log history on disk
+# Entries are appended as JSON lines to <name>.jsonl and never rewritten. Every INDEX_EVERY entries
+# one (byte offset, time key) record goes to <name>.jsonl.idx; the index is small enough to keep in
+# memory (10M entries -> ~40k records), so a time-range read is a binary search plus a scan of the
+# requested window of the memory-mapped data file, whatever the total history size.
+# Time keys never go backwards (max of the entry time and the previous key): game batches can
+# arrive a little after their own timestamps, and MAX_SKEW_S bounds how late one may be and still
+# be found by range().
+# Crash safety: a torn last line is cut off on open and index records past the data are dropped /
+# rebuilt from the last good one.
+
+import os, json, mmap, struct, threading
+from array import array
+from bisect import bisect_right
+from gamelog import LEVELS
+
+INDEX_EVERY = 256
+INDEX_MAGIC = b"ARLIDX1\n"
+INDEX_RECORD = struct.Struct("<Qd")  # byte offset of the block, time key of its first entry
+MAX_SKEW_S = 120.0
+
+class LogStore:
+    def __init__(self, path):
+        self.path = path
+        self.index_path = path + ".idx"
+        self.offsets = array("Q")
+        self.keys = array("d")
+        self.count = 0               # entries in the data file
+        self.size = 0                # bytes readers may look at (everything flushed)
+        self.last_key = 0.0
+        self._map = None             # (size, mmap) shared by readers, replaced when the file grew
+        self._lock = threading.Lock()
+        self._open()
+
+    # ----------------------------
+    # open / recovery
+    # ----------------------------
+    def _open(self):
+        if not os.path.exists(self.path):
+            open(self.path, "wb").close()
+        size = os.path.getsize(self.path)
+        if size:
+            with open(self.path, "rb+") as f:
+                f.seek(size - 1)
+                if f.read(1) != b"\n":       # torn write: drop the partial line
+                    size = self._last_newline(f, size)
+                    f.truncate(size)
+        try:
+            with open(self.index_path, "rb") as f:
+                data = f.read()
+            if not data.startswith(INDEX_MAGIC):
+                raise ValueError("bad index header")
+            body = data[len(INDEX_MAGIC):]
+            for off in range(0, len(body) - len(body) % INDEX_RECORD.size, INDEX_RECORD.size):
+                o, k = INDEX_RECORD.unpack_from(body, off)
+                if o >= size:
+                    break
+                self.offsets.append(o); self.keys.append(k)
+        except (OSError, ValueError):
+            self.offsets = array("Q"); self.keys = array("d")
+        # entries after the last index record (or the whole file without an index) are scanned once
+        start = self.offsets[-1] if self.offsets else 0
+        self.count = max(0, len(self.offsets) - 1) * INDEX_EVERY
+        self.last_key = self.keys[-1] if self.keys else 0.0
+        if self.offsets:
+            del self.offsets[-1]; del self.keys[-1]          # re-added by the scan below
+        self.size = start
+        with open(self.path, "rb") as f:
+            f.seek(start)
+            for line in f:
+                try:
+                    t = float(json.loads(line).get("t") or 0.0)
+                except (ValueError, TypeError, AttributeError):
+                    t = 0.0
+                if self._next_key(t):
+                    self.offsets.append(self.size); self.keys.append(self.last_key)
+                self.size += len(line)
+        self._rewrite_index()
+        self._data = open(self.path, "ab")
+        self._index = open(self.index_path, "ab")
+
+    @staticmethod
+    def _last_newline(f, size):
+        pos = size
+        while pos > 0:
+            step = min(65536, pos)
+            f.seek(pos - step)
+            chunk = f.read(step)
+            i = chunk.rfind(b"\n")
+            if i >= 0:
+                return pos - step + i + 1
+            pos -= step
+        return 0
+
+    def _rewrite_index(self):
+        tmp = self.index_path + ".tmp"
+        with open(tmp, "wb") as f:
+            f.write(INDEX_MAGIC)
+            for o, k in zip(self.offsets, self.keys):
+                f.write(INDEX_RECORD.pack(o, k))
+        os.replace(tmp, self.index_path)
+
+    def _next_key(self, t):
+        # advances last_key / count; True when this entry starts a new index block
+        if t > self.last_key:
+            self.last_key = t
+        starts = self.count % INDEX_EVERY == 0
+        self.count += 1
+        return starts
+
+    # ----------------------------
+    # writing (one writer: app.py's log thread)
+    # ----------------------------
+    def append(self, entries):
+        if not entries:
+            return 0
+        lines = []; records = []
+        offset = self.size
+        for e in entries:
+            line = (json.dumps(e, separators=(",", ":"), default=str) + "\n").encode("utf-8")
+            try:
+                t = float(e.get("t") or 0.0)
+            except (TypeError, ValueError):
+                t = 0.0
+            if self._next_key(t):
+                records.append((offset, self.last_key))
+            lines.append(line); offset += len(line)
+        self._data.write(b"".join(lines)); self._data.flush()
+        if records:
+            self._index.write(b"".join(INDEX_RECORD.pack(o, k) for o, k in records)); self._index.flush()
+        with self._lock:
+            # published only after the flush, so readers never see an offset past the data
+            for o, k in records:
+                self.offsets.append(o); self.keys.append(k)
+            self.size = offset
+        return len(entries)
+
+    def close(self):
+        for f in (self._data, self._index):
+            try: f.close()
+            except Exception: pass
+
+    # ----------------------------
+    # reading (any request thread)
+    # ----------------------------
+    def _view(self, size):
+        m = self._map
+        if m is None or m[0] < size:
+            if not size:
+                return None
+            with open(self.path, "rb") as f:
+                m = self._map = (size, mmap.mmap(f.fileno(), size, access=mmap.ACCESS_READ))
+        return m[1]
+
+    def _window(self, start_block, end_off, size):
+        with self._lock:
+            view = self._view(size)
+            start = self.offsets[start_block] if start_block < len(self.offsets) else size
+        if view is None:
+            return
+        pos = start
+        while pos < end_off:
+            nl = view.find(b"\n", pos, end_off)
+            if nl < 0:
+                break
+            yield view[pos:nl]
+            pos = nl + 1
+
+    @staticmethod
+    def _peek(line):
+        # (t, level) without a full parse for lines append() wrote: {"t":<num>,"level":"<name>",...
+        if line.startswith(b'{"t":'):
+            comma = line.find(b",", 5)
+            if comma > 0 and line.startswith(b'"level":"', comma + 1):
+                end = line.find(b'"', comma + 10)
+                try:
+                    return float(line[5:comma]), line[comma + 10:end].decode("ascii")
+                except (ValueError, UnicodeDecodeError):
+                    pass
+        e = json.loads(line)
+        return float(e.get("t") or 0.0), e.get("level")
+
+    def range(self, t_from=None, t_to=None, level=None, limit=None, raw=False):
+        # entries with t_from <= t <= t_to (and level >= `level`), oldest first, read lazily;
+        # raw=True yields the stored JSON line (bytes, no newline) instead of the parsed dict
+        with self._lock:
+            n = len(self.keys); size = self.size
+            lo = 0 if t_from is None else max(0, bisect_right(self.keys, t_from, 0, n) - 1)
+            if t_to is None:
+                end_off = size
+            else:
+                hi = bisect_right(self.keys, t_to + MAX_SKEW_S, 0, n)
+                end_off = self.offsets[hi] if hi < n else size
+        min_level = LEVELS.get(level, 0) if level else 0
+        sent = 0
+        for line in self._window(lo, end_off, size):
+            try:
+                t, lvl = self._peek(line)
+            except (ValueError, TypeError, AttributeError):
+                continue
+            if (t_from is not None and t < t_from) or (t_to is not None and t > t_to):
+                continue
+            if min_level and LEVELS.get(lvl, 0) < min_level:
+                continue
+            yield line if raw else json.loads(line)
+            sent += 1
+            if limit and sent >= limit:
+                return
+
+    def tail(self, n):
+        # the last n entries (dashboard start): only the last few blocks are read
+        with self._lock:
+            size = self.size
+            blocks = len(self.offsets)
+            first = max(0, blocks - (n + INDEX_EVERY - 1) // INDEX_EVERY - 1)
+        out = []
+        for line in self._window(first, size, size):
+            try:
+                out.append(json.loads(line))
+            except ValueError:
+                continue
+        return out[-n:] if n else []
+
+    def stats(self):
+        with self._lock:
+            return {"entries": self.count, "bytes": self.size, "index_records": len(self.offsets),
+                    "first_t": self.keys[0] if len(self.keys) else None, "last_t": self.last_key or None}
@@ -4,21 +4,89 @@
 # Usage:
 #   python main.py --lanes 3
 #   python main.py --lanes 3 --car-color "#0f766e"
+#   python main.py --window 1080x1440 --render-scale 0.5   (kiosk / low-end: small internal frame, upscaled)
+#   python main.py --lanes 3 --profile difficulty_profile.json   (tuned by tuner.py)
+#   python main.py --resume suspend.arsnap   (P pauses, S saves a snapshot of the run)
+#   python main.py --lanes 3 --seed 42   (same seed -> same obstacle schedule every run)
+#   python main.py --stress --lanes 20   (content limits lifted; see stress_bench.py)
+#   python main.py --capture runs/qa1 --capture-format raw   (record frames; works with SDL_VIDEODRIVER=dummy)
+#   python main.py --spectate-fps 10 --spectate-width 240   (live view sent to dashboard viewers; 0 disables)
+#   python -X tracemalloc main.py --mem-interval 30   (memory samples with allocation sites; see soak.py)
 #   Dashboard launches with --caller dashboard
+# Library use: importing main reads no argv and doesn't import pygame (first pygame.* use does);
+#   main.configure(main.make_config(lanes=4, hard=True)) sets it up, main.run() plays it.
+#   Several games in one process (arcade cabinets): see kiosk.py and share_from() below.
 
-import pygame, random, math, time, sys, os, argparse, json, urllib.request, traceback
+import random, math, time, sys, os, gc, argparse, json, traceback, threading, importlib, base64
 from array import array
-from collections import defaultdict
+IMPORTED_AT = time.time()            # first-frame latency is also reported from here
+from collections import defaultdict, OrderedDict, deque
+from predictors import TinyKNN, make_predictor, PREDICTORS
+from trackgen import TrackGenerator
+from gamelog import GameLogger, LEVELS
+from capture import FrameRecorder, FORMATS as CAPTURE_FORMATS
+from spectate import FrameFeed
+from memwatch import MemoryWatch, stack_depth
+import ipc
+import snapshot
+
+RENDERERS = ("surface", "texture", "auto")
+
+class _LazyModule:
+    # stands in for a heavy module until first attribute access, then replaces itself in globals()
+    def __init__(self, name):
+        self._name = name
+    def __getattr__(self, attr):
+        importlib.import_module(self._name)
+        top = sys.modules[self._name.split(".")[0]]
+        globals()[top.__name__] = top
+        return getattr(top, attr)
+
+pygame = _LazyModule("pygame")
+urllib = _LazyModule("urllib.request")
 
 # ----------------------------
-# CLI args
+# Configuration: CLI args -> config object -> module settings (configure())
 # ----------------------------
-parser = argparse.ArgumentParser(description="Asphalt Rush")
-parser.add_argument("--lanes", type=int, default=3, help="number of lanes (2-6)")
-parser.add_argument("--hard", action="store_true", help="hard mode (faster)")
-parser.add_argument("--caller", type=str, default="", help="caller (optional)")
-parser.add_argument("--car-color", type=str, default="", help="hex color for car from dashboard (e.g. #0f766e)")
-args = parser.parse_args()
+def build_parser():
+    parser = argparse.ArgumentParser(description="Asphalt Rush")
+    parser.add_argument("--lanes", type=int, default=3, help="number of lanes (2-6, up to 20 with --stress)")
+    parser.add_argument("--hard", action="store_true", help="hard mode (faster)")
+    parser.add_argument("--caller", type=str, default="", help="caller (optional)")
+    parser.add_argument("--car-color", type=str, default="", help="hex color for car from dashboard (e.g. #0f766e)")
+    parser.add_argument("--ipc", type=str, default="", help="dashboard channel address (passed by app.py)")
+    parser.add_argument("--session", type=str, default="", help="dashboard session id (passed by app.py)")
+    parser.add_argument("--quality", type=str, default="auto", choices=("auto", "0", "1", "2", "3", "4"), help="graphics quality: auto (governor) or fixed level 0-4")
+    parser.add_argument("--render-scale", type=float, default=1.0, help="internal render resolution as a fraction of 480x640 (0.25-1.0)")
+    parser.add_argument("--window", type=str, default="", help="window size WxH; the internal frame is upscaled to fit (e.g. 1080x1440)")
+    parser.add_argument("--predictor", type=str, default="knn", choices=sorted(PREDICTORS), help="spawn lane predictor")
+    parser.add_argument("--record-spawns", type=str, default="", help="append spawn sequence (JSON lines) to this file")
+    parser.add_argument("--log-level", type=str, default="info", choices=sorted(LEVELS), help="game log level (debug adds per-key output)")
+    parser.add_argument("--profile", type=str, default="", help="difficulty profile JSON written by tuner.py")
+    parser.add_argument("--seed", type=int, default=None, help="track seed: every run replays the same obstacle schedule (default: random per run)")
+    parser.add_argument("--resume", type=str, default="", help="continue a run from a snapshot file (lanes / mode come from the snapshot)")
+    parser.add_argument("--snapshot-file", type=str, default="", help="where S saves a snapshot (default: suspend.arsnap next to main.py)")
+    parser.add_argument("--stress", action="store_true", help="lift content limits: up to 20 lanes, hundreds of obstacles, wider playfield")
+    parser.add_argument("--capture", type=str, default="", help="record every presented frame into this directory (see capture.py)")
+    parser.add_argument("--capture-format", type=str, default="png", choices=CAPTURE_FORMATS, help="png sequence, raw rgb24 stream, or ffmpeg video")
+    parser.add_argument("--capture-slots", type=int, default=8, help="frames buffered for the capture encoder before frames are dropped")
+    parser.add_argument("--input-buffer-ms", type=int, default=150, help="lane presses made mid-slide are queued and applied in order if still this fresh (0: drop them)")
+    parser.add_argument("--spectate-fps", type=float, default=5.0, help="live view frames/s sent while dashboard viewers are watching (0: never)")
+    parser.add_argument("--spectate-width", type=int, default=160, help="live view frame width in pixels (height keeps the aspect ratio)")
+    parser.add_argument("--mem-interval", type=float, default=60.0, help="seconds between memory samples (RSS, cache sizes; allocation sites under -X tracemalloc), 0: off")
+    parser.add_argument("--renderer", type=str, default="surface", choices=RENDERERS, help="surface blits, or SDL2 textures (GPU when available); auto falls back to surfaces when no SDL renderer can be created")
+    return parser
+
+def make_config(argv=None, **overrides):
+    # argv=None: defaults only, nothing read from sys.argv (library / tools); the entry point passes sys.argv[1:]
+    cfg = build_parser().parse_args([] if argv is None else list(argv))
+    for k, v in overrides.items():
+        if not hasattr(cfg, k):
+            raise TypeError(f"unknown game setting: {k}")
+        setattr(cfg, k, v)
+    return cfg
+
+log = GameLogger("main")
 
 def hex_to_rgb(h):
     if not h: return None
@@ -32,39 +100,62 @@ def hex_to_rgb(h):
     except Exception:
         return None
 
-CAR_COLOR_FROM_DASH = hex_to_rgb(args.car_color) if args.car_color else None
-
 # ----------------------------
-# Settings
+# Settings (fixed); the config-dependent ones are set by configure() below
 # ----------------------------
-WIDTH, HEIGHT = 480, 640
+DEFAULT_WIDTH, HEIGHT = 480, 640
 FPS = 60
-LANES = max(2, min(6, args.lanes))
-LANE_WIDTH = WIDTH // LANES
+MAX_STEP_FRAMES = 8.0        # one simulation step covers at most ~133 ms; longer stalls are clamped
+STRESS_LANE_WIDTH = 80
 PLAYER_Y = HEIGHT - 140
 
+# Render scale: gameplay runs in WIDTH x HEIGHT logical pixels, drawing happens on an
+# internal surface of RENDER_W x RENDER_H which is upscaled to the window in one step.
+def parse_window_size(text):
+    try:
+        w, h = text.lower().split("x")
+        return max(160, int(w)), max(160, int(h))
+    except Exception:
+        return WIDTH, HEIGHT
+
+def S(v):
+    # logical pixels -> internal render pixels
+    return int(round(v * RENDER_SCALE))
+
+def S_rect(r):
+    return pygame.Rect(S(r.x), S(r.y), max(1, S(r.width)), max(1, S(r.height)))
+
 # Slightly larger player and obstacles
 PLAYER_HEIGHT = 56           # increased from 48
 PLAYER_WIDTH_OFFSET = 24     # was 30 previously (so player is wider)
 OBSTACLE_HEIGHT = 52         # increased from 44
 OBSTACLE_WIDTH_OFFSET = 30   # was 40 previously (so obstacles are wider)
 
-# --- Increased starting spawn interval for a more comfortable pace ---
-SPAWN_INTERVAL_START_MS = 1700 if args.hard else 1700
-MIN_SPAWN_INTERVAL_MS = 450 if args.hard else 600
-SPAWN_DECREASE_MS = 6 if args.hard else 5
-OBSTACLE_SPEED_START = 1.9 if args.hard else 1.6
-OBSTACLE_SPEED_INCREMENT = 0.008 if args.hard else 0.007
-
 # --- Changed for more room to switch lanes (increased substantially) ---
-MIN_VERTICAL_GAP = 600          # was 300 -> big vertical gap (pixels)
-MIN_SPAWN_TIME_GAP_MS = 2000    # was 1000 -> per-lane time gap (ms)
+DEFAULT_VERTICAL_GAP = 600          # was 300 -> big vertical gap (pixels)
+DEFAULT_SPAWN_TIME_GAP_MS = 2000    # was 1000 -> per-lane time gap (ms)
 # ------------------------------------------------
 
+# --- Optional tuned profile (tuner.py) overrides the hand-tuned values above ---
+PROFILE_KEYS = ("SPAWN_INTERVAL_START_MS", "MIN_SPAWN_INTERVAL_MS", "SPAWN_DECREASE_MS",
+                "OBSTACLE_SPEED_START", "OBSTACLE_SPEED_INCREMENT", "MIN_VERTICAL_GAP", "MIN_SPAWN_TIME_GAP_MS")
+
+def load_difficulty_profile(path, mode):
+    try:
+        with open(path, "r") as f:
+            data = json.load(f)
+        vals = data.get("modes", {}).get(mode, {})
+        return {k: vals[k] for k in PROFILE_KEYS if k in vals}
+    except Exception as e:
+        log.warn("failed loading profile", path=path, error=str(e))
+        return {}
+
 PAIR_DURATION_SPAWNS = 4
-MAX_SIMULTANEOUS_OBSTACLES = 6
+SPAWN_Y = -160                 # spawn higher so player has more time: start y negative larger
+EXIT_Y = HEIGHT + 80           # obstacles below this are scored and removed
 
 K_NEIGHBORS = 3
+KNN_MEMORY_LIMIT = 900
 
 SAMPLE_RATE = 44100
 DEFAULT_ENGINE_FILE = "engine.wav"
@@ -73,37 +164,178 @@ DEFAULT_BGM_FILE = "bgm.mp3"
 
 DASHBOARD_SUBMIT_URL = "http://127.0.0.1:5000/submit_score"
 DASHBOARD_COLOR_URL = "http://127.0.0.1:5000/api/color"
+DASHBOARD_TELEMETRY_URL = "http://127.0.0.1:5000/api/telemetry"
+DASHBOARD_LOGS_URL = "http://127.0.0.1:5000/api/game_logs"
+
+TELEMETRY_INTERVAL_MS = 200          # 5 samples per second
+TELEMETRY_HTTP_BATCH_S = 1.0         # HTTP fallback posts batches instead of single samples
+
+# HUD text tint per dashboard theme (pushed over the ipc channel)
+THEME_HUD_COLORS = {"green": (170,235,190), "blue": (170,205,240)}
+DEFAULT_HUD_COLOR = (220,220,220)
 
 CAR_SPRITE_FILE = "car_top.png"
 
 # ----------------------------
-# TinyKNN
-# ----------------------------
-class TinyKNN:
-    def __init__(self, k=3):
-        self.k = k
-        self.X = []
-        self.y = []
-    def add_example(self, features, label):
-        self.X.append(features); self.y.append(label)
-    def predict(self, features):
-        if not self.X: return None
-        dists = []
-        for xi, yi in zip(self.X, self.y):
-            dist = sum((a - b) ** 2 for a, b in zip(xi, features))
-            dists.append((math.sqrt(dist), yi))
-        dists.sort(key=lambda t: t[0])
-        k = min(self.k, len(dists))
-        votes = {}
-        for i in range(k):
-            lbl = dists[i][1]; votes[lbl] = votes.get(lbl, 0) + 1
-        best = max(votes.items(), key=lambda x: (x[1], -x[0]))[0]
-        return best
-
-# ----------------------------
-# audio helpers
+# Quality governor: steps features down when frames run over budget, back up with headroom
 # ----------------------------
-def make_engine_loop(duration_ms=800, base_freq=78.0):
+# level 0 is full quality; each level drops one more feature
+QUALITY_LEVELS = (
+    {"name": "high",   "hud_interval_ms": 0,   "shadows": True,  "detailed_cars": True,  "smooth_scale": True},
+    {"name": "med",    "hud_interval_ms": 100, "shadows": True,  "detailed_cars": True,  "smooth_scale": True},
+    {"name": "low",    "hud_interval_ms": 100, "shadows": False, "detailed_cars": True,  "smooth_scale": True},
+    {"name": "lower",  "hud_interval_ms": 250, "shadows": False, "detailed_cars": False, "smooth_scale": True},
+    {"name": "lowest", "hud_interval_ms": 250, "shadows": False, "detailed_cars": False, "smooth_scale": False},
+)
+FRAME_BUDGET_MS = 1000.0 / FPS
+QUALITY_DOWN_RATIO = 0.90      # EMA work time above 90% of budget -> step down
+QUALITY_UP_RATIO = 0.55        # EMA work time below 55% of budget -> step up
+QUALITY_DOWN_FRAMES = 30       # sustained for half a second before dropping
+QUALITY_UP_FRAMES = 240        # sustained for four seconds before raising
+QUALITY_COOLDOWN_FRAMES = 120  # settle time after any change
+
+class QualityGovernor:
+    def __init__(self, mode="auto"):
+        self.auto = (mode == "auto")
+        self.level = 0 if self.auto else max(0, min(len(QUALITY_LEVELS) - 1, int(mode)))
+        self.ema_ms = 0.0
+        self.over = 0
+        self.under = 0
+        self.cooldown = QUALITY_COOLDOWN_FRAMES
+        self.changes = 0
+
+    @property
+    def settings(self):
+        return QUALITY_LEVELS[self.level]
+
+    @property
+    def name(self):
+        return QUALITY_LEVELS[self.level]["name"]
+
+    def observe(self, work_ms):
+        # returns the new level when it changed, otherwise None
+        self.ema_ms = work_ms if self.ema_ms == 0.0 else self.ema_ms * 0.9 + work_ms * 0.1
+        if not self.auto:
+            return None
+        if self.cooldown > 0:
+            self.cooldown -= 1
+            return None
+        if self.ema_ms > FRAME_BUDGET_MS * QUALITY_DOWN_RATIO:
+            self.over += 1; self.under = 0
+        elif self.ema_ms < FRAME_BUDGET_MS * QUALITY_UP_RATIO:
+            self.under += 1; self.over = 0
+        else:
+            self.over = self.under = 0
+        if self.over >= QUALITY_DOWN_FRAMES and self.level < len(QUALITY_LEVELS) - 1:
+            return self._set(self.level + 1)
+        if self.under >= QUALITY_UP_FRAMES and self.level > 0:
+            return self._set(self.level - 1)
+        return None
+
+    def _set(self, level):
+        self.level = level
+        self.over = self.under = 0
+        self.cooldown = QUALITY_COOLDOWN_FRAMES
+        self.changes += 1
+        return level
+
+# ----------------------------
+# configure(): everything derived from the config object
+# ----------------------------
+recorder = None
+
+def configure(cfg):
+    # import runs this with make_config() defaults; the entry point / tools call it again with theirs
+    global args, RESUME_STATE, CAR_COLOR_FROM_DASH, MAX_LANES, LANES, WIDTH, LANE_WIDTH
+    global RENDER_SCALE, RENDER_W, RENDER_H, WINDOW_SIZE, MAX_SIMULTANEOUS_OBSTACLES, governor, recorder
+    global SPAWN_INTERVAL_START_MS, MIN_SPAWN_INTERVAL_MS, SPAWN_DECREASE_MS, OBSTACLE_SPEED_START
+    global OBSTACLE_SPEED_INCREMENT, MIN_VERTICAL_GAP, MIN_SPAWN_TIME_GAP_MS
+    args = cfg
+    log.set_level(cfg.log_level)
+
+    # --resume: the snapshot decides lanes / mode, so read it before the settings below
+    RESUME_STATE = None
+    if cfg.resume:
+        try:
+            with open(cfg.resume, "rb") as f:
+                RESUME_STATE = f.read()
+            resume_meta, _ = snapshot.loads(RESUME_STATE)
+            cfg.lanes = resume_meta["lanes"]; cfg.hard = resume_meta["hard"]; cfg.stress = resume_meta.get("stress", False)
+        except Exception as e:
+            log.warn("cannot resume from snapshot, starting a new run", path=cfg.resume, error=str(e))
+            RESUME_STATE = None
+
+    CAR_COLOR_FROM_DASH = hex_to_rgb(cfg.car_color) if cfg.car_color else None
+
+    MAX_LANES = 20 if cfg.stress else 6
+    LANES = max(2, min(MAX_LANES, cfg.lanes))
+    WIDTH = DEFAULT_WIDTH
+    if cfg.stress:
+        # stress mode widens the playfield instead of squeezing 20 lanes into 480 px
+        WIDTH = max(WIDTH, LANES * STRESS_LANE_WIDTH)
+    LANE_WIDTH = WIDTH // LANES
+    RENDER_SCALE = max(0.25, min(1.0, cfg.render_scale))
+    RENDER_W, RENDER_H = int(round(WIDTH * RENDER_SCALE)), int(round(HEIGHT * RENDER_SCALE))
+    WINDOW_SIZE = parse_window_size(cfg.window) if cfg.window else (WIDTH, HEIGHT)
+    MAX_SIMULTANEOUS_OBSTACLES = 400 if cfg.stress else 6
+
+    # --- Increased starting spawn interval for a more comfortable pace ---
+    SPAWN_INTERVAL_START_MS = 1700 if cfg.hard else 1700
+    MIN_SPAWN_INTERVAL_MS = 450 if cfg.hard else 600
+    SPAWN_DECREASE_MS = 6 if cfg.hard else 5
+    OBSTACLE_SPEED_START = 1.9 if cfg.hard else 1.6
+    OBSTACLE_SPEED_INCREMENT = 0.008 if cfg.hard else 0.007
+    MIN_VERTICAL_GAP = DEFAULT_VERTICAL_GAP
+    MIN_SPAWN_TIME_GAP_MS = DEFAULT_SPAWN_TIME_GAP_MS
+    if cfg.profile:
+        profile = load_difficulty_profile(cfg.profile, "hard" if cfg.hard else "normal")
+        SPAWN_INTERVAL_START_MS = int(profile.get("SPAWN_INTERVAL_START_MS", SPAWN_INTERVAL_START_MS))
+        MIN_SPAWN_INTERVAL_MS = int(profile.get("MIN_SPAWN_INTERVAL_MS", MIN_SPAWN_INTERVAL_MS))
+        SPAWN_DECREASE_MS = int(profile.get("SPAWN_DECREASE_MS", SPAWN_DECREASE_MS))
+        OBSTACLE_SPEED_START = float(profile.get("OBSTACLE_SPEED_START", OBSTACLE_SPEED_START))
+        OBSTACLE_SPEED_INCREMENT = float(profile.get("OBSTACLE_SPEED_INCREMENT", OBSTACLE_SPEED_INCREMENT))
+        MIN_VERTICAL_GAP = int(profile.get("MIN_VERTICAL_GAP", MIN_VERTICAL_GAP))
+        MIN_SPAWN_TIME_GAP_MS = int(profile.get("MIN_SPAWN_TIME_GAP_MS", MIN_SPAWN_TIME_GAP_MS))
+        log.info("difficulty profile loaded", path=cfg.profile, values=profile)
+
+    governor = QualityGovernor(cfg.quality)
+    # --capture: present() copies each frame out, capture.py's worker encodes it (or drops it when behind)
+    if recorder is not None:
+        recorder.close()
+    recorder = FrameRecorder(cfg.capture, cfg.capture_format, FPS, cfg.capture_slots, log) if cfg.capture else None
+    return cfg
+
+configure(make_config())
+
+# ----------------------------
+# Spawn recording (replayed offline by predictor_bench.py)
+# ----------------------------
+_spawn_log = None
+_spawn_run = 0
+
+def record_spawn(now_ms, lane, speed):
+    global _spawn_log
+    if not args.record_spawns:
+        return
+    try:
+        if _spawn_log is None:
+            _spawn_log = open(args.record_spawns, "a", buffering=64 * 1024)
+        _spawn_log.write(json.dumps({"run": f"{os.getpid()}-{_spawn_run}", "t": now_ms, "lane": lane,
+                                     "speed": round(speed, 4), "lanes": LANES}) + "\n")
+    except Exception:
+        pass
+
+def next_spawn_run():
+    global _spawn_run
+    _spawn_run += 1
+    if _spawn_log is not None:
+        try: _spawn_log.flush()
+        except Exception: pass
+
+# ----------------------------
+# audio helpers: *_samples build 16-bit mono PCM (no pygame), make_* wrap it in a mixer Sound
+# ----------------------------
+def engine_loop_samples(duration_ms=800, base_freq=78.0):
     n = int(SAMPLE_RATE * duration_ms / 1000.0)
     arr = array('h')
     for i in range(n):
@@ -113,9 +345,9 @@ def make_engine_loop(duration_ms=800, base_freq=78.0):
         noise = (random.random() - 0.5) * 0.02
         sample = int(32767 * (base + wob + noise))
         arr.append(sample)
-    return pygame.mixer.Sound(buffer=arr.tobytes())
+    return arr
 
-def make_crash_sound(duration_ms=700):
+def crash_sound_samples(duration_ms=700):
     n = int(SAMPLE_RATE * duration_ms / 1000.0)
     arr = array('h')
     for i in range(n):
@@ -125,9 +357,9 @@ def make_crash_sound(duration_ms=700):
         noise = (random.random()*2 - 1) * 0.6 * env
         sample = int(32767 * max(-1.0, min(1.0, noise + thump)))
         arr.append(sample)
-    return pygame.mixer.Sound(buffer=arr.tobytes())
+    return arr
 
-def make_bgm_loop(duration_ms=8000):
+def bgm_loop_samples(duration_ms=8000):
     n = int(SAMPLE_RATE * duration_ms / 1000.0)
     arr = array('h')
     for i in range(n):
@@ -141,26 +373,35 @@ def make_bgm_loop(duration_ms=8000):
         if i > n - fade_len: env *= ((n - i) / fade_len)
         val = int(32767 * max(-1.0, min(1.0, sample * env)))
         arr.append(val)
-    return pygame.mixer.Sound(buffer=arr.tobytes())
+    return arr
 
-def load_or_make_sound(filename, fallback_generator, *args, **kwargs):
-    try:
-        abs_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), filename)
-        if os.path.exists(abs_path):
-            return pygame.mixer.Sound(abs_path)
-        else:
-            return fallback_generator(*args, **kwargs)
-    except Exception:
-        return fallback_generator(*args, **kwargs)
+def make_engine_loop(duration_ms=800, base_freq=78.0):
+    return pygame.mixer.Sound(buffer=engine_loop_samples(duration_ms, base_freq).tobytes())
+
+def make_crash_sound(duration_ms=700):
+    return pygame.mixer.Sound(buffer=crash_sound_samples(duration_ms).tobytes())
+
+def make_bgm_loop(duration_ms=8000):
+    return pygame.mixer.Sound(buffer=bgm_loop_samples(duration_ms).tobytes())
 
 # ----------------------------
 # Sprite tint helper + caching
 # ----------------------------
+def with_alpha(surface):
+    # convert_alpha() needs a display surface; the texture backend has none, so keep a 32-bit alpha copy
+    if pygame.display.get_surface() is not None:
+        return surface.convert_alpha()
+    if surface.get_flags() & pygame.SRCALPHA:
+        return surface
+    out = pygame.Surface(surface.get_size(), pygame.SRCALPHA)
+    out.blit(surface, (0, 0))
+    return out
+
 def tint_sprite(orig_surface, rgb, intensity=1.0):
     if not rgb: return orig_surface.copy()
     try:
         r,g,b = rgb
-        surf = orig_surface.copy().convert_alpha()
+        surf = with_alpha(orig_surface.copy())
         w,h = surf.get_size()
         color_surf = pygame.Surface((w,h), flags=pygame.SRCALPHA)
         mul = max(0.18, min(1.0, intensity))
@@ -170,22 +411,152 @@ def tint_sprite(orig_surface, rgb, intensity=1.0):
     except Exception:
         return orig_surface.copy()
 
-_obstacle_sprite_cache = {}
+def scale_sprite(surface, size):
+    if governor.settings["smooth_scale"]:
+        return pygame.transform.smoothscale(surface, size)
+    return pygame.transform.scale(surface, size)
+
+SPRITE_CACHE_SIZE = 64               # (color, size) pairs: 6 colors x a few lane counts / render scales
+_obstacle_sprite_cache = OrderedDict()
 
 def get_tinted_obstacle_sprite(base_sprite, rgb, size):
     key = (rgb, size)
-    if key in _obstacle_sprite_cache:
-        return _obstacle_sprite_cache[key]
+    tinted = _obstacle_sprite_cache.get(key)
+    if tinted is not None:
+        _obstacle_sprite_cache.move_to_end(key)
+        return tinted
     if base_sprite is None:
         return None
     try:
-        s = pygame.transform.smoothscale(base_sprite, size)
-        tinted = tint_sprite(s, rgb, intensity=1.0)
-        _obstacle_sprite_cache[key] = tinted
+        s = scale_sprite(base_sprite, size)
+        tinted = _obstacle_sprite_cache[key] = tint_sprite(s, rgb, intensity=1.0)
+        if len(_obstacle_sprite_cache) > SPRITE_CACHE_SIZE:
+            _obstacle_sprite_cache.popitem(last=False)
         return tinted
     except Exception:
         return None
 
+# ----------------------------
+# Text cache: fonts per size, rendered text per (font, text, color), digit atlas for numbers
+# ----------------------------
+TEXT_CACHE_SIZE = 256
+HINT_TEXT = "A/D move — P pause, S save, R restart, Q quit | M mute"
+
+_fonts = {}
+
+def get_font(size):
+    # one Font per size for the whole process, so cache keys survive R restarts
+    f = _fonts.get(size)
+    if f is None:
+        f = _fonts[size] = pygame.font.SysFont(None, size)
+    return f
+
+class DigitAtlas:
+    # "0123456789" rasterized once; each digit is a rect into that strip
+    def __init__(self, font, color):
+        self.surface = font.render("0123456789", True, color)
+        h = self.surface.get_height()
+        self.rects = []
+        for i in range(10):
+            x0 = font.size("0123456789"[:i])[0] if i else 0
+            x1 = font.size("0123456789"[:i+1])[0]
+            self.rects.append(pygame.Rect(x0, 0, x1 - x0, h))
+
+    def draw(self, surface, value, pos):
+        x, y = pos
+        for ch in str(value):
+            r = self.rects[ord(ch) - 48]
+            surface.blit(self.surface, (x, y), r)
+            x += r.width
+        return x - pos[0]
+
+class TextCache:
+    def __init__(self, max_items=TEXT_CACHE_SIZE):
+        self.max_items = max_items
+        self.items = OrderedDict()   # LRU for changing text (AI line, final score)
+        self.static = {}             # labels rendered once per process
+        self.atlases = {}
+        self.hits = self.misses = 0
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surf = self.items.get(key)
+        if surf is not None:
+            self.items.move_to_end(key)
+            self.hits += 1
+            return surf
+        self.misses += 1
+        surf = self.items[key] = font.render(text, True, color)
+        if len(self.items) > self.max_items:
+            self.items.popitem(last=False)
+        return surf
+
+    def render_static(self, font, text, color):
+        key = (font, text, color)
+        surf = self.static.get(key)
+        if surf is None:
+            surf = self.static[key] = font.render(text, True, color)
+        return surf
+
+    def draw_number(self, surface, font, value, color, pos, prefix=""):
+        # prefix label is static, digits are blitted from the atlas: no text rasterizing per frame
+        x, y = pos
+        if prefix:
+            label = self.render_static(font, prefix, color)
+            surface.blit(label, (x, y)); x += label.get_width()
+        return x - pos[0] + self.atlas(font, color).draw(surface, int(value), (x, y))
+
+    def atlas(self, font, color):
+        atlas = self.atlases.get((font, color))
+        if atlas is None:
+            atlas = self.atlases[(font, color)] = DigitAtlas(font, color)
+        return atlas
+
+text_cache = TextCache()
+
+# ----------------------------
+# Input latency probe: key press -> first presented frame that shows the car moving
+# ----------------------------
+INPUT_BUFFER_MAX = 2                 # lane presses queued behind the current slide
+
+class LatencyProbe:
+    # key times are taken when the frame loop pulls the KEYDOWN (pygame events carry no timestamp),
+    # so time spent in SDL's queue before that (< 1 frame) is not included
+    def __init__(self, keep=1024):
+        self.samples = deque(maxlen=keep)    # ms
+        self.moves = []              # (key time, car x when the move started) not yet on screen
+        self.buffered = 0            # presses queued mid-slide
+        self.expired = 0             # queued presses older than --input-buffer-ms when their turn came
+        self.dropped = 0             # presses lost (buffer off or full)
+
+    def started(self, t, x):
+        self.moves.append((t, x))
+
+    def presented(self, x):
+        # call right after the flip / present with the x the frame showed
+        if not self.moves:
+            return
+        t = time.perf_counter()
+        keep = []
+        for t_key, x0 in self.moves:
+            if x != x0:
+                self.samples.append((t - t_key) * 1000.0)
+            else:
+                keep.append((t_key, x0))     # paused, or the slide starts next frame
+        self.moves = keep
+
+    def reset(self):
+        self.moves = []              # new run: the old player's moves will never show
+
+    def stats(self):
+        vals = sorted(self.samples)
+        pick = lambda q: round(vals[min(len(vals) - 1, int(q * (len(vals) - 1) + 0.5))], 1) if vals else None
+        return {"n": len(vals), "p50_ms": pick(0.5), "p90_ms": pick(0.9), "p99_ms": pick(0.99),
+                "max_ms": round(vals[-1], 1) if vals else None,
+                "buffered": self.buffered, "expired": self.expired, "dropped": self.dropped}
+
+input_probe = LatencyProbe()
+
 # ----------------------------
 # Player & Obstacle (sprite support)
 # ----------------------------
@@ -197,22 +568,28 @@ class Player:
         self.target_lane = self.logical_lane
         self.current_x = self.logical_lane * (WIDTH // LANES) + ((WIDTH // LANES) - self.width) // 2
         self.target_x = self.current_x
+        self.prev_x = self.current_x
         self.slide_speed = 22.0
         self.sprite_original = sprite_image
         self.sprite = None
         self.color = (30,160,200) if engine_palette is None else engine_palette[0]
         self.strip_color = (255,255,255)
         self.roof_color = (20,20,20)
+        self.queued = deque()        # (delta, key time) pressed mid-slide
         self.prepare_sprite()
 
     @property
     def rect(self):
         return pygame.Rect(int(self.current_x), PLAYER_Y, self.width, self.height)
 
+    @property
+    def prev_rect(self):
+        return pygame.Rect(int(self.prev_x), PLAYER_Y, self.width, self.height)
+
     def prepare_sprite(self):
         if self.sprite_original:
             try:
-                s = pygame.transform.smoothscale(self.sprite_original, (self.width, self.height))
+                s = scale_sprite(self.sprite_original, (S(self.width), S(self.height)))
                 self.sprite = tint_sprite(s, self.color, intensity=1.0)
             except Exception:
                 self.sprite = None
@@ -224,59 +601,93 @@ class Player:
             self.color = rgb
             if self.sprite_original:
                 try:
-                    s = pygame.transform.smoothscale(self.sprite_original, (self.width, self.height))
+                    s = scale_sprite(self.sprite_original, (S(self.width), S(self.height)))
                     self.sprite = tint_sprite(s, self.color, intensity=1.0)
                 except Exception:
                     pass
 
-    def request_lane_change(self, delta):
+    def request_lane_change(self, delta, t=None):
+        # t: perf_counter() of the key press; presses during a slide wait in self.queued (--input-buffer-ms)
+        t = time.perf_counter() if t is None else t
         if abs(self.target_x - self.current_x) > 2.0:
-            return
-        new_lane = max(0, min(LANES - 1, self.logical_lane + delta))
-        if new_lane == self.logical_lane:
-            return
+            if args.input_buffer_ms > 0 and len(self.queued) < INPUT_BUFFER_MAX:
+                self.queued.append((delta, t))
+                input_probe.buffered += 1
+            else:
+                input_probe.dropped += 1
+            return False
+        return self._start_move(delta, t)
+
+    def _start_move(self, delta, t):
+        # from target_lane: a press in the last 2 px of a slide counts from the lane being entered
+        new_lane = max(0, min(LANES - 1, self.target_lane + delta))
+        if new_lane == self.target_lane:
+            return False
         self.target_lane = new_lane
         self.target_x = new_lane * (WIDTH // LANES) + ((WIDTH // LANES) - self.width) // 2
+        input_probe.started(t, self.current_x)
+        return True
+
+    def _next_queued(self):
+        now = time.perf_counter()
+        while self.queued:
+            delta, t = self.queued.popleft()
+            if (now - t) * 1000.0 > args.input_buffer_ms:
+                input_probe.expired += 1
+                continue
+            if self._start_move(delta, t):
+                return
 
-    def update(self):
+    def update(self, frames=1.0):
+        # frames: elapsed time in 60 FPS frames, so a long frame slides proportionally further
+        self.prev_x = self.current_x
         dx = self.target_x - self.current_x
         if abs(dx) < 0.5:
             self.current_x = self.target_x
             self.logical_lane = self.target_lane
+            if self.queued:
+                self._next_queued()
         else:
-            step = math.copysign(min(abs(dx), self.slide_speed * (1.0 + (abs(dx)/100.0))), dx)
+            step = math.copysign(min(abs(dx), self.slide_speed * (1.0 + (abs(dx)/100.0)) * frames), dx)
             self.current_x += step
 
     def draw(self, surface):
-        r = self.rect
+        self.draw_at(surface, S_rect(self.rect))
+
+    def draw_at(self, surface, r):
+        # r: where the car body goes in render pixels (TextureBackend bakes the car at a fixed r)
+        shadows = governor.settings["shadows"]
         if self.sprite:
-            shadow = pygame.Surface((r.width-6, 8), pygame.SRCALPHA)
-            pygame.draw.ellipse(shadow, (6,6,6,180), shadow.get_rect())
-            surface.blit(shadow, (r.x+6, r.y + r.height - 6))
+            if shadows:
+                shadow = pygame.Surface((max(1, r.width-S(6)), max(1, S(8))), pygame.SRCALPHA)
+                pygame.draw.ellipse(shadow, (6,6,6,180), shadow.get_rect())
+                surface.blit(shadow, (r.x+S(6), r.y + r.height - S(6)))
             surface.blit(self.sprite, (r.x, r.y))
         else:
-            shadow_surf = pygame.Surface((self.width-10, 8), pygame.SRCALPHA)
-            pygame.draw.ellipse(shadow_surf, (6,6,6,160), shadow_surf.get_rect())
-            surface.blit(shadow_surf, (r.x+6, r.y + r.height - 6))
-            body = pygame.Rect(r.x, r.y + 6, r.width, r.height - 6)
-            pygame.draw.rect(surface, (4,4,4), body, border_radius=12)
-            pygame.draw.rect(surface, self.color, body.inflate(-2, -2), border_radius=12)
+            if shadows:
+                shadow_surf = pygame.Surface((max(1, r.width-S(10)), max(1, S(8))), pygame.SRCALPHA)
+                pygame.draw.ellipse(shadow_surf, (6,6,6,160), shadow_surf.get_rect())
+                surface.blit(shadow_surf, (r.x+S(6), r.y + r.height - S(6)))
+            body = pygame.Rect(r.x, r.y + S(6), r.width, r.height - S(6))
+            pygame.draw.rect(surface, (4,4,4), body, border_radius=S(12))
+            pygame.draw.rect(surface, self.color, body.inflate(-2, -2), border_radius=S(12))
 
 class Obstacle:
     DEFAULT_COLORS = [(200,30,30),(30,120,200),(40,200,120),(200,140,30),(160,30,200),(100,100,100)]
-    def __init__(self, lane, y, speed, base_sprite=None):
+    def __init__(self, lane, y, speed, base_sprite=None, rng=None, color=None):
         self.lane = lane
         self.width = int((WIDTH // LANES) - OBSTACLE_WIDTH_OFFSET)
         self.height = OBSTACLE_HEIGHT
         self.x = lane * (WIDTH // LANES) + ((WIDTH // LANES) - self.width) // 2
         self.y = y
+        self.prev_y = y
         self.speed = speed
-        self.color = random.choice(Obstacle.DEFAULT_COLORS)
+        self.color = color or (rng or random).choice(Obstacle.DEFAULT_COLORS)
         self.strip_color = (min(255,self.color[0]+30), min(255,self.color[1]+30), min(255,self.color[2]+30))
         self.base_sprite = base_sprite
         self.tinted_sprite = None
         if self.base_sprite:
-            size = (self.width, self.height)
+            size = (S(self.width), S(self.height))
             try:
                 self.tinted_sprite = get_tinted_obstacle_sprite(self.base_sprite, self.color, size)
             except Exception:
@@ -286,61 +697,84 @@ class Obstacle:
     def rect(self):
         return pygame.Rect(int(self.x), int(self.y), self.width, self.height)
 
-    def update(self):
-        self.y += self.speed
+    @property
+    def prev_rect(self):
+        return pygame.Rect(int(self.x), int(self.prev_y), self.width, self.height)
+
+    def update(self, frames=1.0):
+        self.prev_y = self.y
+        self.y += self.speed * frames
 
     def draw(self, surface):
-        r = self.rect
+        self.draw_at(surface, S_rect(self.rect))
+
+    def draw_at(self, surface, r):
+        q = governor.settings
         if self.tinted_sprite:
-            shadow = pygame.Surface((r.width-6, 10), pygame.SRCALPHA)
-            pygame.draw.ellipse(shadow, (6,6,6,170), shadow.get_rect())
-            surface.blit(shadow, (r.x+6, r.y + r.height - 6))
+            if q["shadows"]:
+                shadow = pygame.Surface((max(1, r.width-S(6)), max(1, S(10))), pygame.SRCALPHA)
+                pygame.draw.ellipse(shadow, (6,6,6,170), shadow.get_rect())
+                surface.blit(shadow, (r.x+S(6), r.y + r.height - S(6)))
             surface.blit(self.tinted_sprite, (r.x, r.y))
             return
-        shadow_surf = pygame.Surface((r.width-10, 8), pygame.SRCALPHA)
-        pygame.draw.ellipse(shadow_surf, (10,10,10,160), shadow_surf.get_rect())
-        surface.blit(shadow_surf, (r.x+6, r.y + r.height - 6))
-        body = pygame.Rect(r.x, r.y + 6, r.width, r.height - 6)
-        pygame.draw.rect(surface, (6,6,6), body, border_radius=10)
-        pygame.draw.rect(surface, self.color, body.inflate(-2,-2), border_radius=10)
+        if q["shadows"]:
+            shadow_surf = pygame.Surface((max(1, r.width-S(10)), max(1, S(8))), pygame.SRCALPHA)
+            pygame.draw.ellipse(shadow_surf, (10,10,10,160), shadow_surf.get_rect())
+            surface.blit(shadow_surf, (r.x+S(6), r.y + r.height - S(6)))
+        body = pygame.Rect(r.x, r.y + S(6), r.width, r.height - S(6))
+        if not q["detailed_cars"]:
+            surface.fill(self.color, body)
+            return
+        pygame.draw.rect(surface, (6,6,6), body, border_radius=S(10))
+        pygame.draw.rect(surface, self.color, body.inflate(-2,-2), border_radius=S(10))
         roof_w = r.width // 2
-        roof_rect = pygame.Rect(r.x + (r.width - roof_w)//2, r.y - 2, roof_w, 18)
-        pygame.draw.rect(surface, (15,15,20), roof_rect, border_radius=6)
-        window = roof_rect.inflate(-6,-6)
-        pygame.draw.rect(surface, (140,180,220), window, border_radius=4)
-        strip = pygame.Rect(r.x + r.width//3, r.y + r.height//3, r.width//3, 6)
-        pygame.draw.rect(surface, self.strip_color, strip, border_radius=3)
-        wheel_radius = 6
-        pygame.draw.circle(surface, (20,20,20), (r.x + 12, r.y + r.height - 6), wheel_radius)
-        pygame.draw.circle(surface, (20,20,20), (r.x + r.width - 12, r.y + r.height - 6), wheel_radius)
+        roof_rect = pygame.Rect(r.x + (r.width - roof_w)//2, r.y - S(2), roof_w, S(18))
+        pygame.draw.rect(surface, (15,15,20), roof_rect, border_radius=S(6))
+        window = roof_rect.inflate(-S(6),-S(6))
+        pygame.draw.rect(surface, (140,180,220), window, border_radius=S(4))
+        strip = pygame.Rect(r.x + r.width//3, r.y + r.height//3, r.width//3, S(6))
+        pygame.draw.rect(surface, self.strip_color, strip, border_radius=S(3))
+        wheel_radius = max(1, S(6))
+        pygame.draw.circle(surface, (20,20,20), (r.x + S(12), r.y + r.height - S(6)), wheel_radius)
+        pygame.draw.circle(surface, (20,20,20), (r.x + r.width - S(12), r.y + r.height - S(6)), wheel_radius)
 
 # ----------------------------
 # Road + lane numbers
 # ----------------------------
 lane_dash_offset = 0.0
-def draw_road(surface, obstacle_speed, dt_ms):
+ROAD_EDGE = 20
+DASH_H, DASH_GAP = 18, 14
+
+def advance_road(obstacle_speed, dt_ms):
+    # lane dashes scroll with the traffic; shared by both render backends
     global lane_dash_offset
-    edge = 20
+    lane_dash_offset += (obstacle_speed * (dt_ms / 16.0)) * 2.0
+    lane_dash_offset %= DASH_H + DASH_GAP
+    return lane_dash_offset
+
+def draw_road(surface, obstacle_speed, dt_ms):
+    # geometry is computed in logical pixels and mapped with S() onto the internal surface
+    edge = ROAD_EDGE
     surface.fill((24,24,26))
     road_x = edge; road_w = WIDTH - 2*edge
-    pygame.draw.rect(surface, (8,8,10), (road_x, 0, road_w, HEIGHT))
-    dash_h = 18; gap = 14; lane_w = WIDTH // LANES
-    lane_dash_offset += (obstacle_speed * (dt_ms / 16.0)) * 2.0
-    total_step = dash_h + gap
-    lane_dash_offset %= total_step
+    pygame.draw.rect(surface, (8,8,10), (S(road_x), 0, S(road_w), RENDER_H))
+    dash_h = DASH_H; lane_w = WIDTH // LANES
+    advance_road(obstacle_speed, dt_ms)
+    total_step = DASH_H + DASH_GAP
+    line_w = max(1, S(4))
     for i in range(1, LANES):
-        x = road_x + i * lane_w
+        x = S(road_x + i * lane_w)
         y = -total_step + (lane_dash_offset % total_step)
         while y < HEIGHT + total_step:
-            pygame.draw.line(surface, (245,245,245), (x, y), (x, y+dash_h), 4)
+            pygame.draw.line(surface, (245,245,245), (x, S(y)), (x, S(y+dash_h)), line_w)
             y += total_step
-    pygame.draw.rect(surface, (6,6,8), (0,0,edge,HEIGHT))
-    pygame.draw.rect(surface, (6,6,8), (WIDTH-edge,0,edge,HEIGHT))
-    font = pygame.font.SysFont(None, 20)
+    pygame.draw.rect(surface, (6,6,8), (0,0,S(edge),RENDER_H))
+    pygame.draw.rect(surface, (6,6,8), (S(WIDTH-edge),0,S(edge),RENDER_H))
+    font = get_font(max(8, S(20)))
     for i in range(LANES):
-        cx = road_x + i * lane_w + lane_w//2
-        txt = font.render(str(i+1), True, (245,245,245))
-        surface.blit(txt, (cx - txt.get_width()//2, 8))
+        cx = S(road_x + i * lane_w + lane_w//2)
+        txt = text_cache.render_static(font, str(i+1), (245,245,245))
+        surface.blit(txt, (cx - txt.get_width()//2, S(8)))
 
 # ----------------------------
 # Networking: submit score & fetch color
@@ -361,6 +795,148 @@ def fetch_dashboard_color():
     except Exception:
         return None
 
+# ----------------------------
+# Dashboard link: persistent ipc channel when launched by app.py, HTTP fallback otherwise
+# ----------------------------
+class DashboardLink:
+    def __init__(self, address):
+        self.channel = None
+        self._lock = threading.Lock()
+        self.pending_color = None
+        self.pending_theme = None
+        self.pending_snapshots = []
+        self.feed = None                 # live view frames, activated by the dashboard's "spectate" messages
+        self.session = args.session or f"standalone-{os.getpid()}"
+        self._tm_batch = []
+        self._tm_last_post = time.time()
+        self._tm_posting = False
+        if address:
+            try:
+                self.channel = ipc.Channel(ipc.connect(address), self._on_message)
+                self.channel.send({"type": "hello", "pid": os.getpid(), "session": self.session, "lanes": LANES, "hard": bool(args.hard)})
+                log.info("dashboard channel connected", address=address)
+                if args.spectate_fps > 0:
+                    self.feed = FrameFeed(self.channel.send, args.spectate_fps)
+            except Exception as e:
+                log.warn("dashboard channel unavailable, using HTTP", error=str(e))
+                self.channel = None
+
+    @property
+    def connected(self):
+        return self.channel is not None and not self.channel.closed
+
+    def _on_message(self, channel, msg):
+        # reader thread: only stash the latest values, the frame loop applies them
+        with self._lock:
+            if msg.get("type") == "color":
+                self.pending_color = msg.get("hex")
+            elif msg.get("type") == "theme":
+                self.pending_theme = msg.get("key")
+            elif msg.get("type") == "snapshot_request":
+                self.pending_snapshots.append(msg.get("id"))
+            elif msg.get("type") == "spectate" and self.feed is not None:
+                # only flags: the frame loop notices through feed.due() at its next present
+                self.feed.set_active(float(msg.get("fps") or 0))
+                if msg.get("key"):
+                    self.feed.request_keyframe()
+
+    def take_updates(self):
+        with self._lock:
+            color, theme = self.pending_color, self.pending_theme
+            self.pending_color = self.pending_theme = None
+        return color, theme
+
+    def take_snapshot_requests(self):
+        with self._lock:
+            reqs, self.pending_snapshots = self.pending_snapshots, []
+        return reqs
+
+    def send_snapshot(self, req_id, data, **extra):
+        if self.connected:
+            msg = {"type": "snapshot", "id": req_id, "bytes": len(data), "data": base64.b64encode(data).decode("ascii")}
+            msg.update(extra)
+            self.channel.send(msg)
+
+    def send_snapshot_error(self, req_id, error):
+        # answer anyway, so the dashboard doesn't wait out its timeout
+        if self.connected:
+            self.channel.send({"type": "snapshot", "id": req_id, "error": error})
+
+    def submit_score(self, score, lanes):
+        if self.connected and self.channel.send({"type": "score", "score": int(score), "lanes": int(lanes)}):
+            return
+        submit_score_to_dashboard(score, lanes)
+
+    def status(self, state, **extra):
+        if self.connected:
+            msg = {"type": "status", "state": state}; msg.update(extra)
+            self.channel.send(msg)
+
+    def ship_logs(self, entries):
+        # called from the logger thread; True means the batch can be dropped
+        if self.connected:
+            return self.channel.send({"type": "logs", "entries": entries})
+        if args.caller != "dashboard":
+            return True
+        try:
+            data = json.dumps({"session": self.session, "entries": entries}, default=str).encode("utf-8")
+            req = urllib.request.Request(DASHBOARD_LOGS_URL, data=data, headers={"Content-Type": "application/json"})
+            urllib.request.urlopen(req, timeout=0.9)
+            return True
+        except Exception:
+            return False
+
+    def telemetry(self, values):
+        if self.connected:
+            self.channel.send({"type": "tm", "v": values})
+            return
+        if args.caller != "dashboard":
+            return
+        # HTTP fallback: batch and post off the frame path, one request in flight at most
+        self._tm_batch.append(values)
+        if len(self._tm_batch) > 300:
+            del self._tm_batch[:-300]
+        if self._tm_posting or (time.time() - self._tm_last_post) < TELEMETRY_HTTP_BATCH_S:
+            return
+        batch, self._tm_batch = self._tm_batch, []
+        self._tm_last_post = time.time(); self._tm_posting = True
+        threading.Thread(target=self._post_telemetry, args=(batch,), daemon=True).start()
+
+    def _post_telemetry(self, batch):
+        try:
+            data = json.dumps({"session": self.session, "samples": batch}).encode("utf-8")
+            req = urllib.request.Request(DASHBOARD_TELEMETRY_URL, data=data, headers={"Content-Type": "application/json"})
+            urllib.request.urlopen(req, timeout=0.9)
+        except Exception:
+            pass
+        finally:
+            self._tm_posting = False
+
+_dashboard_link = None
+
+def share_frame(frame):
+    # live view: a small RGB copy of the presented frame, only while viewers watch and a frame is due;
+    # frame is the surface, or a callable returning it when reading it back costs something
+    feed = _dashboard_link.feed if _dashboard_link is not None else None
+    t = time.perf_counter()
+    if feed is None or not feed.due(t):
+        return
+    try:
+        surf = frame() if callable(frame) else frame
+        w = max(16, args.spectate_width); h = max(1, round(w * surf.get_height() / surf.get_width()))
+        feed.offer(pygame.image.tobytes(pygame.transform.scale(surf, (w, h)), "RGB"), w, h, t)
+    except Exception as e:
+        log.warn("live view frame failed, disabled", error=str(e))
+        feed.close(); _dashboard_link.feed = None
+
+def get_dashboard_link():
+    # one channel per process; R restarts re-enter play() and reuse it
+    global _dashboard_link
+    if _dashboard_link is None:
+        _dashboard_link = DashboardLink(args.ipc)
+        log.shipper = _dashboard_link.ship_logs
+    return _dashboard_link
+
 # ----------------------------
 # Focus helper (Windows)
 # ----------------------------
@@ -383,65 +959,688 @@ def bring_window_to_front(win_caption=None):
     except Exception:
         pass
 
+# ----------------------------
+# Render target: internal canvas + one-step upscale to the window
+# ----------------------------
+class RenderTarget:
+    def __init__(self, window_size):
+        self.open(window_size)
+
+    def open(self, window_size):
+        self.window = pygame.display.set_mode(window_size, pygame.RESIZABLE)
+        self.window_size = self.window.get_size()
+        if self.window_size == (RENDER_W, RENDER_H):
+            # same size: draw straight into the window, no extra blit
+            self.canvas = self.window
+            self.dest = self.window.get_rect()
+            self.view = None
+            return
+        self.canvas = pygame.Surface((RENDER_W, RENDER_H)).convert()
+        # fit preserving aspect ratio; letterbox bars are painted once here
+        ww, wh = self.window_size
+        k = min(ww / RENDER_W, wh / RENDER_H)
+        dw, dh = max(1, int(RENDER_W * k)), max(1, int(RENDER_H * k))
+        self.dest = pygame.Rect((ww - dw)//2, (wh - dh)//2, dw, dh)
+        self.window.fill((0,0,0))
+        self.view = self.window.subsurface(self.dest)
+
+    def present(self):
+        if recorder is not None:
+            recorder.offer(self.canvas)
+        share_frame(self.canvas)
+        if self.view is not None:
+            pygame.transform.scale(self.canvas, self.dest.size, self.view)
+        pygame.display.flip()
+
+# ----------------------------
+# Scene: one frame's content, drawn by either render backend
+# ----------------------------
+class Scene:
+    def __init__(self):
+        self.obstacle_speed = 0.0
+        self.dt = 0
+        self.cars = []               # Player / Obstacle objects, back to front
+        self.numbers = []            # (font, value, color, pos, prefix) -> digit atlas
+        self.texts = []              # (surface, pos) in render pixels
+
+    def begin(self, obstacle_speed, dt):
+        self.obstacle_speed = obstacle_speed; self.dt = dt
+        self.cars.clear(); self.numbers.clear(); self.texts.clear()
+        return self
+
+# ----------------------------
+# Render backends (--renderer): software Surface blits, or SDL2 Renderer / Texture copies
+# ----------------------------
+class SurfaceBackend(RenderTarget):
+    name = "surface"
+    accelerated = False
+
+    def set_caption(self, title):
+        pygame.display.set_caption(title)
+
+    def draw(self, scene):
+        canvas = self.canvas
+        draw_road(canvas, scene.obstacle_speed, scene.dt)
+        for car in scene.cars:
+            car.draw(canvas)
+        for font, value, color, pos, prefix in scene.numbers:
+            text_cache.draw_number(canvas, font, value, color, pos, prefix=prefix)
+        for surf, pos in scene.texts:
+            canvas.blit(surf, pos)
+
+    def draw_overlay(self, color, alpha, texts):
+        # blended over whatever the canvas last showed (so it deepens while the loop repeats)
+        key = (tuple(color), alpha, RENDER_W, RENDER_H)
+        if getattr(self, "_overlay_key", None) != key:
+            self._overlay = pygame.Surface((RENDER_W, RENDER_H))
+            self._overlay.set_alpha(alpha)
+            self._overlay.fill(color)
+            self._overlay_key = key
+        self.canvas.blit(self._overlay, (0,0))
+        for surf, pos in texts:
+            self.canvas.blit(surf, pos)
+
+class TextureBackend:
+    # pygame._sdl2 Renderer: the static road, a lane-dash strip, every distinct car image and
+    # HUD text live in textures, so a frame is a list of textured quad copies. Renderer(accelerated=1)
+    # takes a GPU driver when there is one, otherwise SDL's software renderer is used.
+    name = "texture"
+    canvas = None
+    MAX_CAR_TEXTURES = 64
+    MAX_SURFACE_TEXTURES = 192
+
+    def __init__(self, window_size, accelerated=True):
+        from pygame._sdl2.video import Window, Renderer, Texture
+        self.Texture = Texture
+        self.window = Window("Asphalt Rush", size=window_size, resizable=True)
+        self.renderer = None
+        if accelerated:
+            try:
+                self.renderer = Renderer(self.window, accelerated=1, vsync=False)
+            except Exception:
+                self.renderer = None
+        self.accelerated = self.renderer is not None
+        if self.renderer is None:
+            self.renderer = Renderer(self.window, accelerated=0, vsync=False)
+        # the frame is composed at render resolution; SDL scales it to the window with letterboxing
+        self.renderer.logical_size = (RENDER_W, RENDER_H)
+        self.cars = {}               # (kind, color, size, sprite, quality) -> (Texture, top pad)
+        self.surfaces = OrderedDict()   # id(surface) -> (surface, Texture), LRU; holds the surface so ids stay unique
+        self.last_scene = None
+        self._build_road()
+
+    def open(self, window_size):
+        pass                         # the renderer rescales to the new window size itself
+
+    def set_caption(self, title):
+        self.window.title = title
+
+    def _texture(self, surf):
+        entry = self.surfaces.get(id(surf))
+        if entry is not None and entry[0] is surf:
+            self.surfaces.move_to_end(id(surf))
+            return entry[1]
+        tex = self.Texture.from_surface(self.renderer, surf)
+        tex.blend_mode = 1           # SDL_BLENDMODE_BLEND
+        self.surfaces[id(surf)] = (surf, tex)
+        if len(self.surfaces) > self.MAX_SURFACE_TEXTURES:
+            self.surfaces.popitem(last=False)
+        return tex
+
+    def _build_road(self):
+        # same geometry as draw_road(), split into what never moves and one scrolling dash strip
+        edge = ROAD_EDGE; lane_w = WIDTH // LANES; total_step = DASH_H + DASH_GAP
+        base = pygame.Surface((RENDER_W, RENDER_H))
+        base.fill((24,24,26))
+        pygame.draw.rect(base, (8,8,10), (S(edge), 0, S(WIDTH - 2*edge), RENDER_H))
+        pygame.draw.rect(base, (6,6,8), (0,0,S(edge),RENDER_H))
+        pygame.draw.rect(base, (6,6,8), (S(WIDTH-edge),0,S(edge),RENDER_H))
+        labels = pygame.Surface((RENDER_W, S(40)), pygame.SRCALPHA)
+        font = get_font(max(8, S(20)))
+        for i in range(LANES):
+            cx = S(edge + i * lane_w + lane_w//2)
+            txt = text_cache.render_static(font, str(i+1), (245,245,245))
+            labels.blit(txt, (cx - txt.get_width()//2, S(8)))
+        self.line_w = max(1, S(4))
+        strip = pygame.Surface((self.line_w + 2, S(HEIGHT + 2 * total_step) + 2), pygame.SRCALPHA)
+        y = 0
+        while y < HEIGHT + 2 * total_step:
+            pygame.draw.line(strip, (245,245,245), (1 + self.line_w // 2, S(y)), (1 + self.line_w // 2, S(y + DASH_H)), self.line_w)
+            y += total_step
+        self.road = self.Texture.from_surface(self.renderer, base)
+        self.labels = self.Texture.from_surface(self.renderer, labels); self.labels.blend_mode = 1
+        self.dashes = self.Texture.from_surface(self.renderer, strip); self.dashes.blend_mode = 1
+        self.dash_x = [S(edge + i * lane_w) - 1 - self.line_w // 2 for i in range(1, LANES)]
+
+    def _car(self, car):
+        # each distinct look (colour, size, sprite, quality flags) is drawn once into a texture
+        r = S_rect(car.rect)
+        q = governor.settings
+        sprite = getattr(car, "tinted_sprite", None) or getattr(car, "sprite", None)
+        key = (type(car).__name__, car.color, r.size, id(sprite) if sprite else None, q["shadows"], q["detailed_cars"])
+        entry = self.cars.get(key)
+        if entry is None:
+            if len(self.cars) >= self.MAX_CAR_TEXTURES:
+                self.cars.clear()
+            top, bottom = S(4), S(6)             # roof above the rect, shadow below it
+            surf = pygame.Surface((r.width, r.height + top + bottom), pygame.SRCALPHA)
+            car.draw_at(surf, pygame.Rect(0, top, r.width, r.height))
+            tex = self.Texture.from_surface(self.renderer, surf); tex.blend_mode = 1
+            entry = self.cars[key] = (tex, top)
+        tex, top = entry
+        tex.draw(dstrect=(r.x, r.y - top, tex.width, tex.height))
+
+    def _scene(self, scene, advance=True):
+        offset = advance_road(scene.obstacle_speed, scene.dt) if advance else lane_dash_offset
+        self.road.draw()
+        total_step = DASH_H + DASH_GAP
+        y = S(-total_step + offset) - 1
+        dw, dh = self.dashes.width, self.dashes.height
+        for x in self.dash_x:
+            self.dashes.draw(dstrect=(x, y, dw, dh))
+        self.labels.draw(dstrect=(0, 0, self.labels.width, self.labels.height))
+        for car in scene.cars:
+            self._car(car)
+        for font, value, color, pos, prefix in scene.numbers:
+            x, y = pos
+            if prefix:
+                label = text_cache.render_static(font, prefix, color)
+                self._texture(label).draw(dstrect=(x, y, label.get_width(), label.get_height()))
+                x += label.get_width()
+            atlas = text_cache.atlas(font, color)
+            tex = self._texture(atlas.surface)
+            for ch in str(int(value)):
+                rr = atlas.rects[ord(ch) - 48]
+                tex.draw(srcrect=rr, dstrect=(x, y, rr.width, rr.height))
+                x += rr.width
+        self._texts(scene.texts)
+
+    def _texts(self, texts):
+        for surf, pos in texts:
+            self._texture(surf).draw(dstrect=(pos[0], pos[1], surf.get_width(), surf.get_height()))
+
+    def draw(self, scene):
+        self.last_scene = scene
+        self.renderer.draw_color = (0,0,0,255)
+        self.renderer.clear()
+        self._scene(scene)
+
+    def draw_overlay(self, color, alpha, texts):
+        # the back buffer is not kept between presents: redraw the last scene (frozen), then the tint
+        self.renderer.draw_color = (0,0,0,255)
+        self.renderer.clear()
+        if self.last_scene is not None:
+            self._scene(self.last_scene, advance=False)
+        self.renderer.draw_blend_mode = 1
+        self.renderer.draw_color = tuple(color) + (alpha,)
+        self.renderer.fill_rect((0, 0, RENDER_W, RENDER_H))
+        self._texts(texts)
+
+    def present(self):
+        if recorder is not None:
+            recorder.offer(self.renderer.to_surface())   # read-back: capture costs more on this backend
+        share_frame(self.renderer.to_surface)
+        self.renderer.present()
+
+def make_backend(kind, window_size):
+    # texture / auto: SDL2 textures on a GPU renderer if there is one, else SDL's software renderer
+    # (still fewer per-frame Python allocations than the Surface path); Surface blits if neither works
+    if kind == "texture":
+        return TextureBackend(window_size)
+    if kind == "auto":
+        try:
+            return TextureBackend(window_size)
+        except Exception as e:
+            log.warn("texture renderer unavailable, using surfaces", error=str(e))
+    return SurfaceBackend(window_size)
+
+class OffscreenBackend(SurfaceBackend):
+    # a canvas without a window of its own: kiosk.py scales it into its viewport of the host window
+    name = "offscreen"
+
+    def open(self, window_size):
+        self.window = None; self.view = None
+        self.window_size = (RENDER_W, RENDER_H)
+        canvas = pygame.Surface((RENDER_W, RENDER_H))
+        self.canvas = canvas.convert() if pygame.display.get_surface() else canvas
+        self.dest = self.canvas.get_rect()
+
+    def set_caption(self, title):
+        pass
+
+    def present(self):
+        if recorder is not None:
+            recorder.offer(self.canvas)
+        share_frame(self.canvas)
+
+# ----------------------------
+# Collision: swept AABB over one step
+# ----------------------------
+def _sweep_axis(a_lo, a_len, b_lo, b_len, d):
+    # step-time interval (open) where b, moving by d relative to a, overlaps a on one axis
+    if d == 0:
+        return (0.0, 1.0) if (a_lo - b_len < b_lo < a_lo + a_len) else None
+    t1 = (a_lo - b_len - b_lo) / d
+    t2 = (a_lo + a_len - b_lo) / d
+    return (t1, t2) if t1 < t2 else (t2, t1)
+
+def swept_collide(a0, a1, b0, b1):
+    # a0 -> a1 and b0 -> b1: start/end rects of two boxes moving linearly during the step.
+    # True if they overlap at any moment in the step, so fast obstacles or a long frame
+    # can't carry an obstacle through the car between two discrete checks.
+    dx = (b1.x - b0.x) - (a1.x - a0.x)
+    dy = (b1.y - b0.y) - (a1.y - a0.y)
+    ix = _sweep_axis(a0.x, a0.width, b0.x, b0.width, dx)
+    if ix is None:
+        return False
+    iy = _sweep_axis(a0.y, a0.height, b0.y, b0.height, dy)
+    if iy is None:
+        return False
+    return max(0.0, ix[0], iy[0]) < min(1.0, ix[1], iy[1])
+
+# ----------------------------
+# World: game state + one simulation step (no display needed)
+# ----------------------------
+def spawn_rules():
+    # spawn constants for trackgen.TrackGenerator, after --profile / --stress adjustments
+    rules = {k: globals()[k] for k in PROFILE_KEYS}
+    rules.update(PAIR_DURATION_SPAWNS=PAIR_DURATION_SPAWNS, MAX_SIMULTANEOUS_OBSTACLES=MAX_SIMULTANEOUS_OBSTACLES,
+                 FPS=FPS, SPAWN_Y=SPAWN_Y, EXIT_Y=EXIT_Y)
+    return rules
+
+class World:
+    def __init__(self, now, base_sprite=None, color=None, seed=None, threaded=True, track=None):
+        self.start = now
+        self.paused_at = None
+        self.track = track or TrackGenerator(LANES, spawn_rules(), new_predictor(), seed=seed, threaded=threaded)
+        self.seed = self.track.seed
+        self.rng = random.Random(self.seed)     # cosmetic choices (obstacle colours) on the frame side
+        self.base_sprite = base_sprite
+        self.player = Player(engine_palette=[color] if color else None, sprite_image=base_sprite)
+        if color:
+            self.player.update_color(color)
+        self.obstacles = []
+        self.score = 0
+        self.obstacle_speed = OBSTACLE_SPEED_START
+        self.spawn_interval = SPAWN_INTERVAL_START_MS
+        self.total_predictions = 0
+        self.correct_predictions = 0
+        self.last_prediction_label = None
+        self.total_spawned = 0
+        self.lane_recent = None
+
+    @property
+    def predictor(self):
+        return self.track.predictor
+
+    @property
+    def accuracy(self):
+        return (self.correct_predictions / self.total_predictions) * 100 if self.total_predictions > 0 else 0.0
+
+    def spawn(self, now):
+        # the schedule is generated ahead on the track worker; here we only take what is due
+        for ev in self.track.due(now - self.start):
+            # a spawn that fell between frames starts where it would be by now
+            late_frames = max(0.0, (now - self.start - ev.t) * FPS / 1000.0)
+            self.obstacles.append(Obstacle(ev.lane, SPAWN_Y + ev.speed * late_frames, ev.speed, self.base_sprite, self.rng))
+            self.lane_recent = ev.lane
+            self.total_spawned += 1
+            self.obstacle_speed = ev.speed
+            self.spawn_interval = ev.interval
+            record_spawn(self.start + ev.t, ev.lane, ev.speed)
+            if ev.pred is not None:
+                self.total_predictions += 1
+                if ev.pred == ev.lane:
+                    self.correct_predictions += 1
+                self.last_prediction_label = ev.pred
+
+    def close(self):
+        self.track.close()
+
+    def set_sprite(self, sprite):
+        # the asset worker finished after the run started: switch the player and the cars on the road over
+        self.base_sprite = sprite
+        self.player.sprite_original = sprite
+        self.player.prepare_sprite()
+        for ob in self.obstacles:
+            ob.base_sprite = sprite
+            try:
+                ob.tinted_sprite = get_tinted_obstacle_sprite(sprite, ob.color, (S(ob.width), S(ob.height)))
+            except Exception:
+                ob.tinted_sprite = None
+
+    def pause(self, now):
+        if self.paused_at is None:
+            self.paused_at = now
+
+    def resume(self, now):
+        # run time is measured from self.start, so shifting it skips the paused interval
+        if self.paused_at is not None:
+            self.start += now - self.paused_at
+            self.paused_at = None
+
+    # ----------------------------
+    # snapshot / restore (container format in snapshot.py)
+    # ----------------------------
+    def snapshot(self, now):
+        elapsed = (self.paused_at if self.paused_at is not None else now) - self.start
+        track_meta, track_arrays, (pred_meta, pred_arrays) = self.track.export_state()
+        rng_arr, rng_info = snapshot.rng_state(self.rng)
+        p = self.player
+        obs = self.obstacles
+        meta = {"lanes": LANES, "hard": bool(args.hard), "stress": bool(args.stress), "elapsed": elapsed,
+                "score": self.score, "obstacle_speed": self.obstacle_speed, "spawn_interval": self.spawn_interval,
+                "total_predictions": self.total_predictions, "correct_predictions": self.correct_predictions,
+                "last_prediction_label": self.last_prediction_label, "total_spawned": self.total_spawned,
+                "lane_recent": self.lane_recent, "rng": rng_info, "track": track_meta,
+                "predictor": dict(pred_meta, name=self.track.predictor.name),
+                "player": {"x": p.current_x, "prev_x": p.prev_x, "target_x": p.target_x, "lane": p.logical_lane,
+                           "target_lane": p.target_lane, "color": list(p.color)}}
+        arrays = {"rng": rng_arr,
+                  "ob_lane": array("h", (o.lane for o in obs)), "ob_y": array("d", (o.y for o in obs)),
+                  "ob_prev_y": array("d", (o.prev_y for o in obs)), "ob_speed": array("d", (o.speed for o in obs)),
+                  "ob_color": array("B", (Obstacle.DEFAULT_COLORS.index(o.color) for o in obs))}
+        arrays.update(("track." + k, v) for k, v in track_arrays.items())
+        arrays.update(("pred." + k, v) for k, v in pred_arrays.items())
+        return snapshot.dumps(meta, arrays)
+
+    @classmethod
+    def from_snapshot(cls, data, now, base_sprite=None, threaded=True):
+        meta, arrays = snapshot.loads(data)
+        if meta["lanes"] != LANES:
+            raise ValueError(f"snapshot has {meta['lanes']} lanes, game runs {LANES}")
+        sub = lambda prefix: {k[len(prefix):]: v for k, v in arrays.items() if k.startswith(prefix)}
+        pmeta = meta["predictor"]
+        predictor = new_predictor(pmeta["name"])
+        predictor.import_state(pmeta, sub("pred."))
+        tmeta = meta["track"]
+        track = TrackGenerator(LANES, tmeta["rules"], predictor, seed=tmeta["seed"], threaded=threaded, start=False)
+        track.import_state(tmeta, sub("track."))
+        track.start()
+
+        pm = meta["player"]
+        w = cls(now - meta["elapsed"], base_sprite, tuple(pm["color"]), track=track)
+        snapshot.set_rng_state(w.rng, arrays["rng"], meta["rng"])
+        p = w.player
+        p.current_x, p.prev_x, p.target_x = pm["x"], pm["prev_x"], pm["target_x"]
+        p.logical_lane, p.target_lane = pm["lane"], pm["target_lane"]
+        for k in ("score", "obstacle_speed", "spawn_interval", "total_predictions", "correct_predictions",
+                  "last_prediction_label", "total_spawned", "lane_recent"):
+            setattr(w, k, meta[k])
+        for lane, y, prev_y, speed, ci in zip(arrays["ob_lane"], arrays["ob_y"], arrays["ob_prev_y"],
+                                              arrays["ob_speed"], arrays["ob_color"]):
+            ob = Obstacle(lane, y, speed, base_sprite, color=Obstacle.DEFAULT_COLORS[ci])
+            ob.prev_y = prev_y
+            w.obstacles.append(ob)
+        return w
+
+    def step(self, now, dt_ms=1000.0 / FPS):
+        # advance one frame of dt_ms; returns the obstacle that hit the player, or None
+        frames = min(MAX_STEP_FRAMES, max(0.0, dt_ms) * FPS / 1000.0)
+        self.spawn(now)
+        for ob in list(self.obstacles):
+            ob.update(frames)
+        self.player.update(frames)
+        # test before culling so an obstacle that crossed the car and left in one step still counts
+        hit = self.collision()
+        if hit is None:
+            for ob in list(self.obstacles):
+                if ob.y > EXIT_Y:
+                    self.obstacles.remove(ob)
+                    self.score += 1
+        return hit
+
+    def collision(self):
+        p0, p1 = self.player.prev_rect, self.player.rect
+        for ob in self.obstacles:
+            if swept_collide(p0, p1, ob.prev_rect, ob.rect):
+                return ob
+        return None
+
+SUSPEND_FILE = "suspend.arsnap"
+
+def save_snapshot(world, now):
+    path = args.snapshot_file or os.path.join(os.path.dirname(os.path.abspath(__file__)), SUSPEND_FILE)
+    try:
+        t0 = time.perf_counter()
+        n = snapshot.write(path, world.snapshot(now))
+        log.info("snapshot saved", path=path, bytes=n, ms=round((time.perf_counter() - t0) * 1000.0, 2))
+    except Exception as e:
+        log.error("snapshot save failed", path=path, error=str(e))
+
 # ----------------------------
 # Main loop
 # ----------------------------
+def new_predictor(name=None):
+    name = name or args.predictor
+    if name == "knn":
+        return make_predictor("knn", LANES, k=K_NEIGHBORS, memory_limit=KNN_MEMORY_LIMIT)
+    return make_predictor(name, LANES)
+
 def load_sprite_if_available():
     path = os.path.join(os.path.dirname(os.path.abspath(__file__)), CAR_SPRITE_FILE)
     if os.path.exists(path):
         try:
-            img = pygame.image.load(path).convert_alpha()
-            print("[main] sprite loaded:", path)
+            img = with_alpha(pygame.image.load(path))
+            log.info("sprite loaded", path=path)
             return img
         except Exception as e:
-            print("[main] failed loading sprite:", e)
+            log.warn("failed loading sprite", error=str(e))
             return None
     else:
-        print("[main] sprite not found at:", path)
+        log.info("sprite not found", path=path)
     return None
 
-def main():
+# ----------------------------
+# Startup assets: the car sprite and the sounds are produced on a worker thread while the road is
+# already running; the frame loop swaps them in as they finish (plain drawn car / silence until then)
+# ----------------------------
+MIXER_BUFFER = 512                   # samples per mixer callback: ~11.6 ms at 44.1 kHz
+
+# name -> (file next to main.py, PCM generator used when the file is missing, generator kwargs)
+SOUND_ASSETS = {
+    "engine": (DEFAULT_ENGINE_FILE, engine_loop_samples, {"duration_ms": 900, "base_freq": 78.0}),
+    "crash":  (DEFAULT_CRASH_FILE, crash_sound_samples, {"duration_ms": 700}),
+    "bgm":    (DEFAULT_BGM_FILE, bgm_loop_samples, {"duration_ms": 8000}),
+}
+
+class AssetLoader:
+    # one worker, sprite first: the PCM generators are pure Python and hold the GIL, so a single
+    # thread keeps the frame loop's share predictable. Loaded assets survive R restarts.
+    def __init__(self):
+        self.ready = {}              # name -> Sound / Surface (None if it failed)
+        self.times = {}              # name -> ms on the worker
+        self.started = None
+        self.finished_ms = None
+        self._done = []              # (name, kind, value, ms) handed over to the frame thread
+        self._lock = threading.Lock()
+        self._pending = 0
+
+    def start(self):
+        if self.started is not None:
+            return
+        self.started = time.perf_counter()
+        jobs = ["sprite"] + list(SOUND_ASSETS)
+        self._pending = len(jobs)
+        threading.Thread(target=self._run, args=(jobs,), name="assets", daemon=True).start()
+
+    @property
+    def pending(self):
+        return self._pending
+
+    def _run(self, jobs):
+        base = os.path.dirname(os.path.abspath(__file__))
+        for name in jobs:
+            t0 = time.perf_counter()
+            kind = value = None
+            try:
+                if name == "sprite":
+                    path = os.path.join(base, CAR_SPRITE_FILE)
+                    if os.path.exists(path):
+                        kind, value = "image", pygame.image.load(path)
+                else:
+                    filename, samples, kwargs = SOUND_ASSETS[name]
+                    path = os.path.join(base, filename)
+                    if os.path.exists(path):
+                        try:
+                            kind, value = "sound", pygame.mixer.Sound(path)
+                        except Exception:
+                            kind = None
+                    if kind is None:
+                        kind, value = "pcm", samples(**kwargs)
+            except Exception as e:
+                log.warn("asset failed", asset=name, error=str(e))
+            with self._lock:
+                self._done.append((name, kind, value, (time.perf_counter() - t0) * 1000.0))
+
+    def take(self):
+        # frame thread: finish what the worker produced (Sound wrap / alpha convert) and return the names
+        if not self._done:
+            return ()
+        with self._lock:
+            done, self._done = self._done, []
+        names = []
+        for name, kind, value, ms in done:
+            self._pending -= 1
+            try:
+                if kind == "pcm":
+                    value = pygame.mixer.Sound(buffer=value.tobytes())
+                elif kind == "image":
+                    value = with_alpha(value)
+            except Exception as e:
+                log.warn("asset failed", asset=name, error=str(e)); value = None
+            self.ready[name] = value; self.times[name] = round(ms, 1)
+            names.append(name)
+        if not self._pending and self.finished_ms is None:
+            self.finished_ms = round((time.perf_counter() - self.started) * 1000.0, 1)
+            log.info("assets ready", ms=self.finished_ms, **self.times)
+        return names
+
+    def get(self, name):
+        return self.ready.get(name)
+
+assets = AssetLoader()
+
+# ----------------------------
+# Memory: a sample every --mem-interval s (memwatch.py); soak.py drives the same gauges headless
+# ----------------------------
+def memory_caps():
+    # designed bounds of the gauges below (memwatch: growing up to these is not a leak)
+    return {"sprite_cache": SPRITE_CACHE_SIZE, "predictor": KNN_MEMORY_LIMIT}
+
+def memory_gauges():
+    # name -> fn(world): process-wide caches and counts that must level off over a long session
+    return {
+        "sprite_cache": lambda w: len(_obstacle_sprite_cache),
+        "text_cache": lambda w: len(text_cache.items) + len(text_cache.static),
+        "digit_atlases": lambda w: len(text_cache.atlases),
+        "fonts": lambda w: len(_fonts),
+        "predictor": lambda w: w.predictor.size() if w else 0,
+        "threads": lambda w: threading.active_count(),
+        "stack_depth": lambda w: stack_depth(),
+        "gc_objects": lambda w: len(gc.get_objects()),
+    }
+
+mem_watch = None
+
+def sample_memory(world, link):
+    t, rss, traced, gauges = mem_watch.sample(time.monotonic(), world)
+    fields = dict(gauges, rss_mb=round(rss / 1048576.0, 1) if rss else None)
+    if traced is not None:
+        fields["traced_mb"] = round(traced / 1048576.0, 2)
+    log.info("memory", **fields)
+    link.status("memory", **fields)
+
+def memory_summary():
+    # exit: growth since warm-up and (under -X tracemalloc) where it was allocated
+    r = mem_watch.report(top=5)
+    if "baseline_s" in r:
+        log.info("memory report", minutes=round(r["elapsed_s"] / 60.0, 1), rss_growth_mb=r.get("rss_growth_mb"),
+                 traced_growth_kb=r.get("traced_growth_kb"), growing=r["growing_gauges"], sites=r["growing_sites"])
+
+def play_loop(sound, volume):
     try:
-        pygame.init()
-        try:
-            pygame.mixer.pre_init(SAMPLE_RATE, -16, 1, 512)
-        except Exception:
-            pass
-        try:
-            pygame.mixer.init()
-        except Exception:
-            pass
+        channel = sound.play(-1)
+        if channel:
+            channel.set_volume(volume)
+        return channel
+    except Exception:
+        return None
 
-        screen = pygame.display.set_mode((WIDTH, HEIGHT))
-        pygame.display.set_caption(f"Asphalt Rush — {LANES} lanes")
-        if args.caller == "dashboard":
-            bring_window_to_front(pygame.display.get_caption()[0])
+def mixer_latency():
+    # the buffer SDL was asked for; pre_init has to run before pygame.init() or init() opens its defaults
+    info = pygame.mixer.get_init()
+    if not info:
+        return {"audio": False}
+    freq, size, channels = info
+    return {"audio": True, "freq": freq, "bits": abs(size), "channels": channels, "buffer": MIXER_BUFFER,
+            "buffer_ms": round(MIXER_BUFFER * 1000.0 / freq, 1)}
 
-        clock = pygame.time.Clock()
-        font = pygame.font.SysFont(None, 26)
-        big_font = pygame.font.SysFont(None, 48)
+# ----------------------------
+# Kiosk hosts (kiosk.py) run one execution of this module per cabinet, because a game's settings
+# are module globals; these process-wide objects hold nothing per game, so the cabinets share the
+# first one's (one pygame font / text / sprite cache, one asset load, one log thread)
+# ----------------------------
+SHARED_STATE = ("log", "assets", "_fonts", "text_cache", "_obstacle_sprite_cache")
 
-        engine_sound = load_or_make_sound(DEFAULT_ENGINE_FILE, make_engine_loop, duration_ms=900, base_freq=78.0)
-        crash_sound = load_or_make_sound(DEFAULT_CRASH_FILE, make_crash_sound, duration_ms=700)
-        bgm_sound = load_or_make_sound(DEFAULT_BGM_FILE, make_bgm_loop, duration_ms=8000)
-        bgm_channel = None; bgm_volume = 0.80; bgm_muted = False
+def share_from(other):
+    g = globals()
+    for name in SHARED_STATE:
+        g[name] = getattr(other, name)
 
-        try:
-            bgm_channel = bgm_sound.play(-1)
-            if bgm_channel:
-                bgm_channel.set_volume(bgm_volume)
-        except Exception:
-            bgm_channel = None
+def main():
+    # R restarts come back here instead of recursing, so hours of restarts keep one stack frame,
+    # one window / renderer and one set of caches
+    target = None
+    while True:
+        target = play(target)
+        if target is None:
+            return
 
-        engine_channel = None
-        try:
-            engine_channel = engine_sound.play(-1)
-            if engine_channel:
-                engine_channel.set_volume(0.45)
-        except Exception:
-            engine_channel = None
+def play(target=None):
+    # one session until R (returns the render target for the next one), Q or the window closing (None)
+    global mem_watch
+    try:
+        t_start = time.perf_counter()
+        if target is None:
+            # once per process: pygame.init() leaks a little on every call (soak.py showed it per R restart)
+            try:
+                pygame.mixer.pre_init(SAMPLE_RATE, -16, 1, MIXER_BUFFER)
+            except Exception:
+                pass
+            pygame.init()
+            try:
+                if not pygame.mixer.get_init():
+                    pygame.mixer.init()
+            except Exception:
+                pass
+            log.info("mixer", **mixer_latency())
+            assets.start()
+        audio = mixer_latency()
+
+        caption = f"Asphalt Rush — {LANES} lanes"
+        if target is None:
+            target = make_backend(args.renderer, WINDOW_SIZE)
+            target.set_caption(caption)
+            log.info("renderer", backend=target.name, accelerated=target.accelerated)
+            if args.caller == "dashboard":
+                bring_window_to_front(caption)
+        if mem_watch is None and args.mem_interval > 0:
+            mem_watch = MemoryWatch(args.mem_interval, gauges=memory_gauges(), caps=memory_caps())
+        scene = Scene()
 
-        base_sprite = load_sprite_if_available()
+        clock = pygame.time.Clock()
+        font = get_font(max(8, S(26)))
+        big_font = get_font(max(10, S(48)))
+
+        # already loaded after an R restart; otherwise they arrive from the asset worker
+        assets.take()
+        engine_sound = assets.get("engine"); crash_sound = assets.get("crash"); bgm_sound = assets.get("bgm")
+        bgm_volume = 0.80; bgm_muted = False
+        bgm_channel = play_loop(bgm_sound, bgm_volume) if bgm_sound else None
+        engine_channel = play_loop(engine_sound, 0.45) if engine_sound else None
+        base_sprite = assets.get("sprite")
+        first_frame = True
 
         global LANE_WIDTH
         LANE_WIDTH = WIDTH // LANES
@@ -449,56 +1648,57 @@ def main():
         default_color_rgb = (15,119,110)
         init_rgb = CAR_COLOR_FROM_DASH if CAR_COLOR_FROM_DASH else default_color_rgb
 
-        player = Player(engine_palette=[init_rgb], sprite_image=base_sprite)
-        player.update_color(init_rgb)
-
-        obstacles = []
-        score = 0
-        obstacle_speed = OBSTACLE_SPEED_START
-        spawn_interval = SPAWN_INTERVAL_START_MS
-        last_spawn_time = pygame.time.get_ticks()
-
-        knn = TinyKNN(k=K_NEIGHBORS)
-        last_obstacle_spawn_time = None
-        last_obstacle_lane = None
-        memory_limit = 900
-        total_predictions = 0
-        correct_predictions = 0
-        last_prediction_label = None
-        current_pair = None
-        pair_spawns_left = 0
-        last_lane_spawned_in_pair = None
-        lane_last_spawn_time = {i: -99999 for i in range(LANES)}
+        global RESUME_STATE
+        world = None
+        paused = False
+        if RESUME_STATE is not None:
+            try:
+                world = World.from_snapshot(RESUME_STATE, pygame.time.get_ticks(), base_sprite)
+                # resumed runs wait for P so the player can get ready
+                world.pause(pygame.time.get_ticks()); paused = True
+                log.info("run resumed from snapshot", path=args.resume, score=world.score, seed=world.seed)
+            except Exception:
+                log.error("snapshot restore failed, starting a new run", path=args.resume, error=traceback.format_exc())
+            RESUME_STATE = None      # R restarts begin fresh runs
+        if world is None:
+            world = World(pygame.time.get_ticks(), base_sprite, init_rgb, seed=args.seed)
+        next_spawn_run()
         running = True
         playing = True
-        total_spawned = 0
-        lane_recent = None
 
-        poll_enabled = (args.caller == "dashboard")
+        link = get_dashboard_link()
+        hud_color = DEFAULT_HUD_COLOR
+        # color polling is only the fallback when the dashboard channel is not up
+        poll_enabled = (args.caller == "dashboard") and not link.connected
         color_poll_interval = 0.9
         last_color_poll = time.time()
 
-        print("[main] game loop starting. poll_enabled:", poll_enabled, "initial_color:", init_rgb)
+        log.info("game loop starting", poll_enabled=poll_enabled, ipc=link.connected, initial_color=init_rgb, seed=world.seed)
+        link.status("paused" if paused else "running", lanes=LANES, seed=world.seed)
+        last_telemetry = 0
+        hud_state = None
+        last_hud_render = -99999
 
         try:
             pygame.event.set_allowed(None)
-            pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN])
+            pygame.event.set_allowed([pygame.QUIT, pygame.KEYDOWN, pygame.KEYUP, pygame.MOUSEBUTTONDOWN, pygame.VIDEORESIZE])
         except Exception:
             pass
 
         while running:
             dt = clock.tick(FPS)
+            frame_start = time.perf_counter()
             now = pygame.time.get_ticks()
 
             for event in pygame.event.get():
                 if event.type == pygame.QUIT:
-                    print("[main] QUIT event")
+                    log.info("QUIT event")
                     running = False
+                elif event.type == pygame.VIDEORESIZE:
+                    target.open((event.w, event.h))
                 elif event.type == pygame.KEYDOWN:
-                    try:
-                        print(f"[main] KEYDOWN: key={event.key}")
-                    except Exception:
-                        pass
+                    if log.debug_enabled:
+                        log.debug("KEYDOWN", key=event.key)
                     if event.key == pygame.K_m:
                         bgm_muted = not bgm_muted
                         try:
@@ -516,107 +1716,86 @@ def main():
                             bgm_channel.set_volume(bgm_volume)
 
                     if event.key in (pygame.K_LEFT, pygame.K_a):
-                        player.request_lane_change(-1)
+                        world.player.request_lane_change(-1, time.perf_counter())
                     elif event.key in (pygame.K_RIGHT, pygame.K_d):
-                        player.request_lane_change(1)
+                        world.player.request_lane_change(1, time.perf_counter())
+                    elif event.key == pygame.K_p:
+                        paused = not paused
+                        if paused:
+                            world.pause(now)
+                        else:
+                            world.resume(now)
+                        link.status("paused" if paused else "running", lanes=LANES, seed=world.seed)
+                    elif event.key == pygame.K_s:
+                        save_snapshot(world, now)
                     elif event.key == pygame.K_r:
-                        print("[main] Restart requested (R)")
-                        return main()
+                        log.info("Restart requested (R)")
+                        world.close()
+                        input_probe.reset()
+                        for ch in (engine_channel, bgm_channel):
+                            if ch:
+                                ch.stop()
+                        return target
                     elif event.key == pygame.K_q:
-                        print("[main] Quit requested (Q)")
+                        log.info("Quit requested (Q)")
                         running = False
 
+            if link.connected:
+                hexv, theme = link.take_updates()
+                if hexv:
+                    rgb = hex_to_rgb(hexv)
+                    if rgb and rgb != world.player.color:
+                        log.info("dashboard color push -> updating player color", hex=hexv, rgb=rgb)
+                        world.player.update_color(rgb)
+                if theme:
+                    hud_color = THEME_HUD_COLORS.get(theme, DEFAULT_HUD_COLOR)
+
             if poll_enabled and (time.time() - last_color_poll) >= color_poll_interval:
                 last_color_poll = time.time()
                 try:
                     hexv = fetch_dashboard_color()
                     if hexv:
                         rgb = hex_to_rgb(hexv)
-                        if rgb and rgb != player.color:
-                            print("[main] dashboard color poll -> updating player color:", hexv, rgb)
-                            player.update_color(rgb)
+                        if rgb and rgb != world.player.color:
+                            log.info("dashboard color poll -> updating player color", hex=hexv, rgb=rgb)
+                            world.player.update_color(rgb)
                 except Exception:
-                    traceback.print_exc()
+                    log.error("color poll failed", error=traceback.format_exc())
+
+            arrived = assets.take()
+            for name in arrived:
+                if name == "sprite" and assets.get("sprite") is not None:
+                    base_sprite = assets.get("sprite")
+                    world.set_sprite(base_sprite)
+                elif name == "crash":
+                    crash_sound = assets.get("crash")
+                elif name == "engine":
+                    engine_sound = assets.get("engine")
+                    if playing and engine_sound:
+                        engine_channel = play_loop(engine_sound, 0.45)
+                elif name == "bgm":
+                    bgm_sound = assets.get("bgm")
+                    if playing and bgm_sound:
+                        bgm_channel = play_loop(bgm_sound, 0.0 if bgm_muted else bgm_volume)
+            if arrived and not assets.pending:
+                link.status("assets", ms=assets.finished_ms, **assets.times)
+
+            if link.pending_snapshots:
+                for req in link.take_snapshot_requests():
+                    try:
+                        data = world.snapshot(now)
+                    except Exception as e:
+                        log.error("snapshot for dashboard failed", error=str(e))
+                        link.send_snapshot_error(req, str(e))
+                        continue
+                    link.send_snapshot(req, data, score=world.score, lanes=LANES, seed=world.seed, paused=paused)
+                    log.info("snapshot sent to dashboard", bytes=len(data))
 
             if not playing:
-                pygame.display.flip()
+                target.present()
                 continue
 
-            if pair_spawns_left <= 0 or current_pair is None:
-                pairs = [(i,i+1) for i in range(LANES-1)]
-                current_pair = random.choice(pairs)
-                pair_spawns_left = PAIR_DURATION_SPAWNS
-                last_lane_spawned_in_pair = None
-
-            # spawn
-            if now - last_spawn_time >= spawn_interval:
-                if len(obstacles) < MAX_SIMULTANEOUS_OBSTACLES:
-                    candidate_lanes = []
-                    for lane in current_pair:
-                        # blocked_by_vert uses the increased MIN_VERTICAL_GAP
-                        blocked_by_vert = any((ob.lane == lane and ob.y < MIN_VERTICAL_GAP) for ob in obstacles)
-                        time_ok = (now - lane_last_spawn_time.get(lane, -99999)) >= MIN_SPAWN_TIME_GAP_MS
-                        if (not blocked_by_vert) and time_ok:
-                            candidate_lanes.append(lane)
-                    if candidate_lanes:
-                        if last_lane_spawned_in_pair in candidate_lanes:
-                            others = [l for l in candidate_lanes if l != last_lane_spawned_in_pair]
-                            choose_lane = others[0] if others else random.choice(candidate_lanes)
-                        else:
-                            choose_lane = random.choice(candidate_lanes)
-
-                        prediction_label = None
-                        if last_obstacle_spawn_time is not None and last_obstacle_lane is not None:
-                            time_gap_ms = now - last_obstacle_spawn_time
-                            feat = [last_obstacle_lane / max(1,(LANES-1)), min(time_gap_ms,2000)/2000.0, min(obstacle_speed,10)/10.0]
-                            pred = knn.predict(feat)
-                            if pred in candidate_lanes and random.random() < 0.45:
-                                choose_lane = pred
-                            prediction_label = pred
-
-                        # spawn higher so player has more time: start y negative larger
-                        ob = Obstacle(choose_lane, -160, obstacle_speed, base_sprite)
-                        obstacles.append(ob)
-                        lane_last_spawn_time[choose_lane] = now
-                        last_lane_spawned_in_pair = choose_lane
-                        lane_recent = choose_lane
-                        total_spawned += 1
-
-                        if last_obstacle_spawn_time is not None and last_obstacle_lane is not None:
-                            time_gap_ms = now - last_obstacle_spawn_time
-                            feat_train = [last_obstacle_lane / max(1,(LANES-1)), min(time_gap_ms,2000)/2000.0, min(obstacle_speed,10)/10.0]
-                            knn.add_example(feat_train, choose_lane)
-                            if len(knn.X) > memory_limit:
-                                knn.X.pop(0); knn.y.pop(0)
-
-                        if prediction_label is not None:
-                            total_predictions += 1
-                            if prediction_label == choose_lane:
-                                correct_predictions += 1
-                            last_prediction_label = prediction_label
-
-                        last_obstacle_spawn_time = now
-                        last_obstacle_lane = choose_lane
-
-                        pair_spawns_left -= 1
-
-                        if spawn_interval > MIN_SPAWN_INTERVAL_MS:
-                            spawn_interval = max(MIN_SPAWN_INTERVAL_MS, spawn_interval - SPAWN_DECREASE_MS)
-                        obstacle_speed += OBSTACLE_SPEED_INCREMENT
-
-                last_spawn_time = now
-
-            # updates
-            for ob in list(obstacles):
-                ob.update()
-                if ob.y > HEIGHT + 80:
-                    obstacles.remove(ob)
-                    score += 1
-
-            player.update()
-
-            collided = any(player.rect.colliderect(ob.rect) for ob in obstacles)
-            if collided:
+            if not paused and world.step(now, dt) is not None:
                 try:
                     if engine_channel:
                         engine_channel.fadeout(300)
@@ -633,80 +1812,93 @@ def main():
                     pass
 
                 playing = False
-                game_over(screen, score, font, big_font)
-                submit_score_to_dashboard(score, LANES)
+                input_probe.reset()
+                log.info("input latency", **input_probe.stats())
+                link.status("game_over", score=world.score, lanes=LANES, input_latency=input_probe.stats())
+                game_over(target, world.score, font, big_font)
+                link.submit_score(world.score, LANES)
 
                 # reinit
-                player = Player(engine_palette=[player.color], sprite_image=player.sprite_original)
-                player.update_color(player.color)
-                obstacles = []
-                score = 0
-                obstacle_speed = OBSTACLE_SPEED_START
-                spawn_interval = SPAWN_INTERVAL_START_MS
-                last_spawn_time = pygame.time.get_ticks()
-                knn = TinyKNN(k=K_NEIGHBORS)
-                last_obstacle_spawn_time = None
-                last_obstacle_lane = None
-                total_predictions = correct_predictions = 0
-                last_prediction_label = None
-                current_pair = None
-                pair_spawns_left = 0
-                last_lane_spawned_in_pair = None
-                lane_last_spawn_time = {i: -99999 for i in range(LANES)}
-                total_spawned = 0
-                lane_recent = None
+                world.close()
+                world = World(pygame.time.get_ticks(), base_sprite, world.player.color, seed=args.seed)
+                next_spawn_run()
+                log.info("new run", seed=world.seed)
+                link.status("running", lanes=LANES, seed=world.seed)
 
-                try:
-                    bgm_channel = bgm_sound.play(-1)
-                    if bgm_channel and not bgm_muted:
-                        bgm_channel.set_volume(bgm_volume)
-                except Exception:
-                    bgm_channel = None
-                try:
-                    engine_channel = engine_sound.play(-1)
-                    if engine_channel:
-                        engine_channel.set_volume(0.45)
-                except Exception:
-                    engine_channel = None
+                bgm_channel = play_loop(bgm_sound, 0.0 if bgm_muted else bgm_volume)
+                engine_channel = play_loop(engine_sound, 0.45)
 
                 playing = True
                 continue
 
-            # draw
-            draw_road(screen, obstacle_speed, dt)
-            for ob in obstacles:
-                ob.draw(screen)
-            player.draw(screen)
+            # draw: collect the frame into the scene, the backend turns it into blits or texture copies
+            scene.begin(world.obstacle_speed, dt)
+            scene.cars.extend(world.obstacles)
+            scene.cars.append(world.player)
 
             ai_text = "AI: N/A"
-            if last_prediction_label is not None and total_predictions > 0:
-                acc = (correct_predictions / total_predictions) * 100 if total_predictions > 0 else 0.0
-                ai_text = f"AI predicted last: Lane {last_prediction_label+1} | Acc: {acc:.1f}%"
-
-            score_surf = font.render(f"Score: {score}", True, (220,220,220))
-            screen.blit(score_surf, (WIDTH - 140, 12))
-            ai_surf = font.render(ai_text, True, (220,220,220))
-            screen.blit(ai_surf, (12, 12))
-            hint = font.render("Left/Right or A/D — R restart, Q quit | M mute", True, (200,200,200))
-            screen.blit(hint, (12, HEIGHT - 28))
-
-            pygame.display.flip()
-
+            if world.last_prediction_label is not None and world.total_predictions > 0:
+                ai_text = f"AI predicted last: Lane {world.last_prediction_label+1} | Acc: {world.accuracy:.1f}%"
+
+            # HUD values refresh at most every hud_interval_ms (governor setting); drawing is cached blits
+            if hud_state is None or now - last_hud_render >= governor.settings["hud_interval_ms"]:
+                last_hud_render = now
+                hud_state = (world.score, ai_text, hud_color)
+            hud_score, hud_ai, hud_col = hud_state
+            scene.numbers.append((font, hud_score, hud_col, (S(WIDTH - 140), S(12)), "Score: "))
+            scene.texts.append((text_cache.render(font, hud_ai, (220,220,220)), (S(12), S(12))))
+            scene.texts.append((text_cache.render_static(font, HINT_TEXT, (200,200,200)), (S(12), S(HEIGHT - 28))))
+            gfx_surf = text_cache.render_static(font, f"GFX {governor.name}", (150,150,150))
+            scene.texts.append((gfx_surf, (RENDER_W - gfx_surf.get_width() - S(12), S(HEIGHT - 50))))
+            if paused:
+                p_surf = text_cache.render_static(big_font, "PAUSED — P to continue", (245,245,245))
+                scene.texts.append((p_surf, ((RENDER_W - p_surf.get_width())//2, S(HEIGHT//2 - 40))))
+
+            target.draw(scene)
+            target.present()
+            input_probe.presented(world.player.current_x)
+            if first_frame:
+                first_frame = False
+                first_ms = round((time.perf_counter() - t_start) * 1000.0, 1)
+                log.info("first frame", ms=first_ms, since_import_ms=round((time.time() - IMPORTED_AT) * 1000.0, 1),
+                         assets_pending=assets.pending)
+                link.status("startup", first_frame_ms=first_ms, assets_pending=assets.pending, **audio)
+
+            new_level = governor.observe((time.perf_counter() - frame_start) * 1000.0)
+            if new_level is not None:
+                log.info("quality changed", level=new_level, name=governor.name, work_ms=round(governor.ema_ms, 1))
+                link.status("quality", level=new_level, name=governor.name, work_ms=round(governor.ema_ms, 2))
+                hud_state = None
+
+            if mem_watch is not None and mem_watch.due(time.monotonic()):
+                sample_memory(world, link)
+
+            if now - last_telemetry >= TELEMETRY_INTERVAL_MS:
+                last_telemetry = now
+                link.telemetry([round(time.time(), 3), world.score, round(world.obstacle_speed, 3), int(world.spawn_interval),
+                                round(clock.get_fps(), 1), dt, round(world.accuracy, 1), governor.level])
+
+        world.close()
+        log.info("input latency", **input_probe.stats())
+        if link.feed is not None:
+            log.info("live view", **link.feed.stats())
+            link.feed.close()
+        if mem_watch is not None:
+            memory_summary()
+        link.status("exit", input_latency=input_probe.stats())
         pygame.quit()
     except KeyboardInterrupt:
         pygame.quit()
         print("\nExited by user (KeyboardInterrupt).")
         sys.exit(0)
     except Exception:
-        print("[main] Unexpected error:", traceback.format_exc())
+        log.error("Unexpected error", error=traceback.format_exc())
+        log.close()
         pygame.quit()
         sys.exit(1)
 
-def game_over(surface, score, font, big_font):
+def game_over(target, score, font, big_font):
     clock = pygame.time.Clock()
-    overlay = pygame.Surface((WIDTH, HEIGHT))
-    overlay.set_alpha(220)
-    overlay.fill((12,12,14))
     while True:
         for ev in pygame.event.get():
             if ev.type == pygame.QUIT:
@@ -716,14 +1908,19 @@ def game_over(surface, score, font, big_font):
                     return
                 if ev.key == pygame.K_q:
                     pygame.quit(); sys.exit(0)
-        surface.blit(overlay, (0,0))
-        go_surf = big_font.render("GAME OVER", True, (220,80,80))
-        surface.blit(go_surf, ((WIDTH - go_surf.get_width())//2, HEIGHT//3))
-        info = font.render(f"Final score: {score}  — Press R to Restart or Q to Quit", True, (220,220,220))
-        surface.blit(info, ((WIDTH - info.get_width())//2, HEIGHT//2 + 40))
-        pygame.display.flip()
+        go_surf = text_cache.render_static(big_font, "GAME OVER", (220,80,80))
+        info = text_cache.render(font, f"Final score: {score}  — Press R to Restart or Q to Quit", (220,220,220))
+        target.draw_overlay((12,12,14), 220, [(go_surf, ((RENDER_W - go_surf.get_width())//2, S(HEIGHT//3))),
+                                              (info, ((RENDER_W - info.get_width())//2, S(HEIGHT//2 + 40)))])
+        target.present()
         clock.tick(30)
 
+def run(cfg=None):
+    # entry point for tools / kiosk hosts: configure (if given) and play until the window closes
+    if cfg is not None:
+        configure(cfg)
+    log.info("Starting Asphalt Rush", lanes=LANES, hard=args.hard, caller=args.caller, car_color=args.car_color)
+    main()
+
 if __name__ == "__main__":
-    print(f"[main] Starting Asphalt Rush — lanes={LANES}, hard={args.hard}, caller={args.caller}, car_color={args.car_color}")
-    main()
\ No newline at end of file
+    run(make_config(sys.argv[1:]))
\ No newline at end of file
@@ -0,0 +1,163 @@
+# memwatch.py -- Asphalt Rush long-run memory tracking (game, dashboard, soak.py)
+# The owner calls sample() on its own schedule (the frame loop, a dashboard thread, soak.py's
+# simulated clock). A sample is RSS, Python-traced bytes (when tracemalloc is on) and named gauges:
+# sizes of the caches / lists that must stay bounded. The first sample at or after warmup_s is the
+# baseline; report() gives the growth since then and, with tracemalloc, the allocation sites that
+# grew the most (snapshot diff by file:line). check() turns a report into pass / fail problems.
+# tracemalloc roughly doubles the cost of allocation-heavy code, so it is only used when the process
+# already traces (python -X tracemalloc / PYTHONTRACEMALLOC=1) or the caller starts it (soak.py).
+# No pygame / flask imports here, no threads.
+
+import os, sys, time, tracemalloc
+from collections import deque
+
+SAMPLES_KEPT = 240                   # 4 h at the default 60 s interval
+TOP_SITES = 10
+GAUGE_SLACK = 0.01                   # growth below 1% of the baseline value is noise (gc object counts)
+MB = 1024.0 * 1024.0
+
+def rss_bytes():
+    # current resident set size; without /proc (macOS / BSD) the peak from getrusage, else None
+    try:
+        with open("/proc/self/statm", "rb") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+    try:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+    except Exception:
+        return None
+
+def stack_depth():
+    # frames below the caller: a restart that recurses instead of looping shows up here
+    f = sys._getframe(1); n = 0
+    while f is not None:
+        n += 1; f = f.f_back
+    return n
+
+def _mb(v):
+    return None if v is None else round(v / MB, 2)
+
+def _slope(points):
+    # least squares slope of (t, v) pairs
+    n = len(points)
+    if n < 2:
+        return 0.0
+    mt = sum(t for t, _ in points) / n; mv = sum(v for _, v in points) / n
+    var = sum((t - mt) ** 2 for t, _ in points)
+    return sum((t - mt) * (v - mv) for t, v in points) / var if var else 0.0
+
+class MemoryWatch:
+    def __init__(self, interval_s=60.0, warmup_s=None, gauges=None, caps=None):
+        self.interval_s = interval_s
+        self.warmup_s = interval_s if warmup_s is None else warmup_s
+        self.gauges = dict(gauges or {})     # name -> fn(ctx) returning a count
+        self.caps = dict(caps or {})         # name -> designed bound: growing up to it is not a leak
+        self.samples = deque(maxlen=SAMPLES_KEPT)   # (t, rss, traced, {gauge: value}), t from the first sample
+        self.baseline = None
+        self.next_t = 0.0
+        self._t0 = None
+        self._base_snapshot = None
+
+    def due(self, t):
+        return self.interval_s > 0 and t >= self.next_t
+
+    def sample(self, t=None, ctx=None):
+        t = time.monotonic() if t is None else t
+        if self._t0 is None:
+            self._t0 = t
+        self.next_t = t + self.interval_s
+        rel = round(t - self._t0, 3)
+        first = self.baseline is None and rel >= self.warmup_s
+        if first:
+            # before measuring, so the baseline and every later sample include the snapshot's memory
+            self._base_snapshot = self._snapshot()
+        values = {}
+        for name, fn in self.gauges.items():
+            try:
+                values[name] = fn(ctx)
+            except Exception:
+                values[name] = None
+        traced = tracemalloc.get_traced_memory()[0] if tracemalloc.is_tracing() else None
+        s = (rel, rss_bytes(), traced, values)
+        self.samples.append(s)
+        if first:
+            self.baseline = s
+        return s
+
+    @staticmethod
+    def _snapshot():
+        if not tracemalloc.is_tracing():
+            return None
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, "<frozen importlib._bootstrap*>"),
+            tracemalloc.Filter(False, "<unknown>")))
+
+    def growing_sites(self, top=TOP_SITES):
+        # allocation sites with the most new memory since the baseline (tracemalloc only)
+        if self._base_snapshot is None or not top:
+            return []
+        snap = self._snapshot()
+        if snap is None:
+            return []
+        diffs = sorted((d for d in snap.compare_to(self._base_snapshot, "lineno") if d.size_diff > 0),
+                       key=lambda d: d.size_diff, reverse=True)
+        out = []
+        for d in diffs[:top]:
+            frame = d.traceback[0]
+            out.append({"site": f"{os.path.basename(frame.filename)}:{frame.lineno}",
+                        "kb": round(d.size_diff / 1024.0, 1), "blocks": d.count_diff})
+        return out
+
+    def since_baseline(self):
+        if self.baseline is None:
+            return []
+        # the baseline stays even after the sample ring dropped it
+        return [self.baseline] + [s for s in self.samples if s[0] > self.baseline[0]]
+
+    def report(self, top=TOP_SITES):
+        last = self.samples[-1] if self.samples else None
+        r = {"samples": len(self.samples), "interval_s": self.interval_s, "tracing": tracemalloc.is_tracing(),
+             "elapsed_s": last[0] if last else 0.0, "rss_mb": _mb(last[1]) if last else None,
+             "traced_mb": _mb(last[2]) if last else None, "gauges": dict(last[3]) if last else {}, "caps": dict(self.caps)}
+        window = self.since_baseline()
+        if len(window) < 2:
+            return r
+        base = window[0]
+        r["baseline_s"] = base[0]
+        if base[1] is not None and last[1] is not None:
+            r["rss_growth_mb"] = _mb(last[1] - base[1])
+            r["rss_mb_per_h"] = round(_slope([(s[0], s[1]) for s in window if s[1] is not None]) * 3600.0 / MB, 3)
+        if base[2] is not None and last[2] is not None:
+            r["traced_growth_kb"] = round((last[2] - base[2]) / 1024.0, 1)
+        # a gauge "keeps growing" when it rose in both halves since the baseline (an LRU filling
+        # up to its cap in the first half is fine)
+        mid = window[len(window) // 2]
+        growing = {}
+        for name, v in last[3].items():
+            b, m = base[3].get(name), mid[3].get(name)
+            if all(isinstance(x, (int, float)) for x in (v, m, b)) and v > m > b and v - b > GAUGE_SLACK * b:
+                growing[name] = v - b
+        r["growing_gauges"] = growing
+        r["growing_sites"] = self.growing_sites(top)
+        return r
+
+def check(report, max_rss_growth_mb=16.0, max_traced_growth_kb=512.0, ignore_gauges=()):
+    # -> problems (empty = flat). RSS is coarse (allocator arenas, fragmentation), traced bytes exact.
+    problems = []
+    if "baseline_s" not in report:
+        return ["not enough samples after warm-up"]
+    if report.get("rss_growth_mb") is not None and report["rss_growth_mb"] > max_rss_growth_mb:
+        problems.append(f"RSS grew {report['rss_growth_mb']} MB after warm-up ({report['rss_mb_per_h']} MB/h)")
+    if report.get("traced_growth_kb") is not None and report["traced_growth_kb"] > max_traced_growth_kb:
+        problems.append(f"Python heap grew {report['traced_growth_kb']} KB after warm-up")
+    caps = report.get("caps", {})
+    for name, delta in report.get("growing_gauges", {}).items():
+        cap = caps.get(name)
+        if name in ignore_gauges or (cap is not None and (report["gauges"].get(name) or 0) <= cap):
+            continue
+        problems.append(f"{name} keeps growing (+{delta})" + (f", past its cap of {cap}" if cap is not None else ""))
+    return problems
@@ -0,0 +1,108 @@
+# predictor_bench.py -- Asphalt Rush offline predictor harness
+# Replays recorded spawn sequences through every predictor in predictors.py and reports
+# next-lane accuracy and per-call latency (predict / update).
+# Usage:
+#   python main.py --record-spawns spawns.jsonl          # play a few runs to record
+#   python predictor_bench.py spawns.jsonl
+#   python predictor_bench.py --synthetic 200 --lanes 3  # tuner.py simulated runs instead
+
+import sys, time, json, argparse
+from predictors import PREDICTORS, make_predictor
+
+def load_sequences(paths):
+    # JSON lines from main.py --record-spawns, grouped by run id
+    runs = {}
+    for path in paths:
+        with open(path, "r") as f:
+            for line in f:
+                line = line.strip()
+                if not line: continue
+                try:
+                    e = json.loads(line)
+                    runs.setdefault(e["run"], {"lanes": int(e["lanes"]), "spawns": []})["spawns"].append(
+                        (float(e["t"]), int(e["lane"]), float(e["speed"])))
+                except (ValueError, KeyError, TypeError):
+                    continue
+    return list(runs.values())
+
+def synthetic_sequences(count, lanes, mode, player, seed):
+    import tuner
+    seqs = []
+    for i in range(count):
+        rec = []
+        tuner.simulate_run(tuner.BUILTIN[mode], lanes, player, seed + i, record=rec)
+        seqs.append({"lanes": lanes, "spawns": rec})
+    return seqs
+
+def percentile(sorted_vals, q):
+    if not sorted_vals: return 0.0
+    return sorted_vals[min(len(sorted_vals) - 1, int(q * (len(sorted_vals) - 1) + 0.5))]
+
+def replay(name, sequences, fresh_per_run=True):
+    predict_ns, update_ns = [], []
+    total = correct = 0
+    predictor = None
+    for seq in sequences:
+        if predictor is None or fresh_per_run:
+            predictor = make_predictor(name, seq["lanes"])
+        prev = None
+        for t, lane, speed in seq["spawns"]:
+            if prev is not None:
+                gap = t - prev[0]
+                t0 = time.perf_counter_ns()
+                pred = predictor.predict(prev[1], gap, speed)
+                t1 = time.perf_counter_ns()
+                predictor.update(prev[1], gap, speed, lane)
+                t2 = time.perf_counter_ns()
+                predict_ns.append(t1 - t0); update_ns.append(t2 - t1)
+                if pred is not None:
+                    total += 1
+                    correct += (pred == lane)
+            prev = (t, lane, speed)
+    predict_ns.sort(); update_ns.sort()
+    us = lambda v: round(v / 1000.0, 2)
+    return {
+        "predictor": name, "calls": len(predict_ns), "predictions": total,
+        "accuracy_pct": round(100.0 * correct / total, 2) if total else None,
+        "predict_us_p50": us(percentile(predict_ns, 0.5)), "predict_us_p99": us(percentile(predict_ns, 0.99)),
+        "update_us_p50": us(percentile(update_ns, 0.5)), "update_us_p99": us(percentile(update_ns, 0.99)),
+        "final_size": predictor.size() if predictor else 0,
+    }
+
+def main():
+    parser = argparse.ArgumentParser(description="Asphalt Rush predictor harness")
+    parser.add_argument("files", nargs="*", help="spawn recordings (main.py --record-spawns)")
+    parser.add_argument("--synthetic", type=int, default=0, help="use N simulated runs from tuner.py")
+    parser.add_argument("--lanes", type=int, default=3)
+    parser.add_argument("--mode", choices=("normal", "hard"), default="normal")
+    parser.add_argument("--player", type=str, default="expert")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--carry", action="store_true", help="keep one predictor across runs instead of a fresh one per run")
+    parser.add_argument("--predictors", type=str, default=",".join(PREDICTORS))
+    parser.add_argument("--json", action="store_true", help="print results as JSON")
+    args = parser.parse_args()
+
+    if args.files:
+        sequences = load_sequences(args.files)
+    elif args.synthetic:
+        sequences = synthetic_sequences(args.synthetic, max(2, min(6, args.lanes)), args.mode, args.player, args.seed)
+    else:
+        parser.error("give spawn recordings or --synthetic N")
+    spawns = sum(len(s["spawns"]) for s in sequences)
+    if not spawns:
+        print("[bench] no spawns to replay"); sys.exit(1)
+
+    results = [replay(name, sequences, fresh_per_run=not args.carry)
+               for name in args.predictors.split(",") if name in PREDICTORS]
+    if args.json:
+        print(json.dumps({"runs": len(sequences), "spawns": spawns, "results": results}, indent=2))
+        return
+    print(f"[bench] {len(sequences)} runs, {spawns} spawns")
+    for r in results:
+        acc = "n/a" if r["accuracy_pct"] is None else f"{r['accuracy_pct']}%"
+        print(f"  {r['predictor']:<7} acc={acc} ({r['predictions']} preds)  "
+              f"predict p50/p99={r['predict_us_p50']}/{r['predict_us_p99']} us  "
+              f"update p50/p99={r['update_us_p50']}/{r['update_us_p99']} us  size={r['final_size']}")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,171 @@
+# predictors.py -- Asphalt Rush spawn-lane predictors
+# main() asks a predictor which lane the next obstacle will use, given the previous spawn.
+# Every predictor takes the same raw context: (previous lane, ms since previous spawn, obstacle speed).
+#   knn    : TinyKNN over normalized features, fixed-size memory (cost grows with stored examples)
+#   markov : decayed transition counts over (previous lane, gap bucket, speed bucket), O(1) predict/update
+# No pygame import here; predictor_bench.py replays recorded spawn sequences through these.
+# export_state() / import_state() give (meta dict, {name: array}) for snapshot.py.
+
+import math
+from array import array
+from collections import deque
+
+# ----------------------------
+# TinyKNN
+# ----------------------------
+class TinyKNN:
+    def __init__(self, k=3, memory_limit=None):
+        self.k = k
+        # bounded deques drop the oldest example in O(1) instead of list.pop(0)
+        self.X = deque(maxlen=memory_limit)
+        self.y = deque(maxlen=memory_limit)
+    def add_example(self, features, label):
+        self.X.append(features); self.y.append(label)
+    def predict(self, features):
+        if not self.X: return None
+        dists = []
+        for xi, yi in zip(self.X, self.y):
+            dist = sum((a - b) ** 2 for a, b in zip(xi, features))
+            dists.append((math.sqrt(dist), yi))
+        dists.sort(key=lambda t: t[0])
+        k = min(self.k, len(dists))
+        votes = {}
+        for i in range(k):
+            lbl = dists[i][1]; votes[lbl] = votes.get(lbl, 0) + 1
+        best = max(votes.items(), key=lambda x: (x[1], -x[0]))[0]
+        return best
+
+# ----------------------------
+# Predictor interface
+# ----------------------------
+class LanePredictor:
+    name = "base"
+    def __init__(self, lanes):
+        self.lanes = lanes
+    def predict(self, last_lane, gap_ms, speed):
+        raise NotImplementedError
+    def update(self, last_lane, gap_ms, speed, lane):
+        raise NotImplementedError
+    def size(self):
+        return 0
+    def export_state(self):
+        return {}, {}
+    def import_state(self, meta, arrays):
+        pass
+
+class KNNPredictor(LanePredictor):
+    name = "knn"
+    def __init__(self, lanes, k=3, memory_limit=900):
+        super().__init__(lanes)
+        self.knn = TinyKNN(k=k, memory_limit=memory_limit)
+    def features(self, last_lane, gap_ms, speed):
+        return [last_lane / max(1, (self.lanes-1)), min(gap_ms, 2000)/2000.0, min(speed, 10)/10.0]
+    def predict(self, last_lane, gap_ms, speed):
+        return self.knn.predict(self.features(last_lane, gap_ms, speed))
+    def update(self, last_lane, gap_ms, speed, lane):
+        self.knn.add_example(self.features(last_lane, gap_ms, speed), lane)
+    def size(self):
+        return len(self.knn.X)
+    def export_state(self):
+        flat = array("d")
+        for x in self.knn.X:
+            flat.extend(x)
+        return {"dim": 3}, {"X": flat, "y": array("h", self.knn.y)}
+    def import_state(self, meta, arrays):
+        dim = meta.get("dim", 3)
+        flat = arrays.get("X", array("d")); labels = arrays.get("y", array("h"))
+        self.knn.X.clear(); self.knn.y.clear()
+        for i, lbl in enumerate(labels):
+            self.knn.add_example(list(flat[i*dim:(i+1)*dim]), lbl)
+
+class MarkovPredictor(LanePredictor):
+    # Counts are stored pre-multiplied by a growing scale instead of decaying every cell:
+    # adding `scale` and then growing it by 1/decay is the same as decaying all older counts.
+    # Cells are renormalized only when the scale gets large, so both calls stay O(1) amortized.
+    name = "markov"
+    GAP_BUCKET_MS = 250
+    GAP_BUCKETS = 9                  # 0..2000+ ms
+    SPEED_BUCKET = 0.5
+    SPEED_BUCKETS = 20               # 0..10 px/frame
+    RENORM_AT = 1e12
+
+    def __init__(self, lanes, decay=0.97):
+        super().__init__(lanes)
+        self.decay = decay
+        self.scale = 1.0
+        self.table = {}              # (prev_lane, gap_bucket, speed_bucket) -> [weight per lane]
+        self.backoff = {}            # prev_lane -> [weight per lane], used for unseen contexts
+
+    def key(self, last_lane, gap_ms, speed):
+        gb = min(self.GAP_BUCKETS - 1, int(max(0, gap_ms) // self.GAP_BUCKET_MS))
+        sb = min(self.SPEED_BUCKETS - 1, int(max(0.0, speed) / self.SPEED_BUCKET))
+        return (last_lane, gb, sb)
+
+    @staticmethod
+    def _argmax(row):
+        best = None; best_w = 0.0
+        for lane, w in enumerate(row):
+            if w > best_w:
+                best, best_w = lane, w
+        return best
+
+    def predict(self, last_lane, gap_ms, speed):
+        row = self.table.get(self.key(last_lane, gap_ms, speed))
+        if row is None:
+            row = self.backoff.get(last_lane)
+        return self._argmax(row) if row is not None else None
+
+    def update(self, last_lane, gap_ms, speed, lane):
+        if not (0 <= lane < self.lanes):
+            return
+        k = self.key(last_lane, gap_ms, speed)
+        row = self.table.get(k)
+        if row is None:
+            row = self.table[k] = [0.0] * self.lanes
+        row[lane] += self.scale
+        brow = self.backoff.get(last_lane)
+        if brow is None:
+            brow = self.backoff[last_lane] = [0.0] * self.lanes
+        brow[lane] += self.scale
+        self.scale /= self.decay
+        if self.scale > self.RENORM_AT:
+            self._renormalize()
+
+    def _renormalize(self):
+        inv = 1.0 / self.scale
+        for rows in (self.table, self.backoff):
+            for row in rows.values():
+                for i in range(len(row)):
+                    row[i] *= inv
+        self.scale = 1.0
+
+    def size(self):
+        return len(self.table)
+
+    def export_state(self):
+        arrays = {}
+        for name, rows in (("t", self.table), ("b", self.backoff)):
+            keys = array("h"); weights = array("d")
+            for k, row in rows.items():
+                keys.extend(k if isinstance(k, tuple) else (k,)); weights.extend(row)
+            arrays[name + "_keys"] = keys; arrays[name + "_rows"] = weights
+        return {"scale": self.scale, "decay": self.decay}, arrays
+
+    def import_state(self, meta, arrays):
+        self.scale = meta.get("scale", 1.0)
+        self.decay = meta.get("decay", self.decay)
+        n = self.lanes
+        for name, rows, width in (("t", self.table, 3), ("b", self.backoff, 1)):
+            rows.clear()
+            keys = arrays.get(name + "_keys", array("h")); weights = arrays.get(name + "_rows", array("d"))
+            for i in range(len(keys) // width):
+                k = tuple(keys[i*width:(i+1)*width]) if width > 1 else keys[i]
+                rows[k] = list(weights[i*n:(i+1)*n])
+
+PREDICTORS = {"knn": KNNPredictor, "markov": MarkovPredictor}
+
+def make_predictor(name, lanes, **kwargs):
+    cls = PREDICTORS.get(name)
+    if cls is None:
+        raise ValueError(f"unknown predictor: {name} (choose from {', '.join(PREDICTORS)})")
+    return cls(lanes, **kwargs)
@@ -0,0 +1,105 @@
+# snapshot.py -- Asphalt Rush game-state snapshot container
+# Compact versioned binary format used by main.py (pause / suspend / --resume) and app.py
+# (snapshots requested from a running session):
+#   header : magic "ARSN", u16 version, u16 flags, u32 body length (little-endian)
+#   body   : u32 meta length + meta JSON (scalars), u16 array count, then per array:
+#            u8 name length + name, typecode, u8 item size, u32 item count, raw little-endian items
+# Bulk state (obstacles, KNN memory, RNG state) goes in typed arrays; the body is zlib
+# compressed (level 1) when FLAG_ZLIB is set. No pygame import here.
+
+import sys, os, json, zlib, struct
+from array import array
+
+MAGIC = b"ARSN"
+VERSION = 1
+FLAG_ZLIB = 1
+HEADER = struct.Struct("<4sHHI")
+_U32 = struct.Struct("<I")
+_U16 = struct.Struct("<H")
+_ARRAY = struct.Struct("<cBI")
+
+def dumps(meta, arrays, compress=True):
+    parts = []
+    m = json.dumps(meta, separators=(",", ":")).encode("utf-8")
+    parts.append(_U32.pack(len(m))); parts.append(m)
+    parts.append(_U16.pack(len(arrays)))
+    for name, arr in arrays.items():
+        n = name.encode("utf-8")
+        if sys.byteorder != "little":
+            arr = array(arr.typecode, arr); arr.byteswap()
+        parts.append(bytes((len(n),))); parts.append(n)
+        parts.append(_ARRAY.pack(arr.typecode.encode("ascii"), arr.itemsize, len(arr)))
+        parts.append(arr.tobytes())
+    body = b"".join(parts)
+    flags = 0
+    if compress:
+        body = zlib.compress(body, 1); flags |= FLAG_ZLIB
+    return HEADER.pack(MAGIC, VERSION, flags, len(body)) + body
+
+def loads(data):
+    if len(data) < HEADER.size:
+        raise ValueError("snapshot too short")
+    magic, version, flags, size = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("not an Asphalt Rush snapshot")
+    if version > VERSION:
+        raise ValueError(f"snapshot version {version} is newer than supported ({VERSION})")
+    body = bytes(data[HEADER.size:HEADER.size + size])
+    if len(body) != size:
+        raise ValueError("snapshot truncated")
+    try:
+        meta, arrays = _parse(zlib.decompress(body) if flags & FLAG_ZLIB else body)
+    except (zlib.error, struct.error, IndexError, UnicodeDecodeError) as e:
+        # a damaged body fails in many places; callers only have to handle ValueError
+        raise ValueError(f"corrupt snapshot: {e}") from e
+    meta["_version"] = version
+    return meta, arrays
+
+def _parse(body):
+    (mlen,) = _U32.unpack_from(body, 0)
+    pos = 4
+    meta = json.loads(body[pos:pos + mlen].decode("utf-8")); pos += mlen
+    if not isinstance(meta, dict):
+        raise ValueError("corrupt snapshot: meta is not an object")
+    (count,) = _U16.unpack_from(body, pos); pos += 2
+    arrays = {}
+    for _ in range(count):
+        nlen = body[pos]; pos += 1
+        name = body[pos:pos + nlen].decode("utf-8"); pos += nlen
+        code, itemsize, n = _ARRAY.unpack_from(body, pos); pos += _ARRAY.size
+        arr = array(code.decode("ascii"))
+        if arr.itemsize != itemsize:
+            raise ValueError(f"array {name}: item size {itemsize} does not match this platform ({arr.itemsize})")
+        raw = body[pos:pos + itemsize * n]; pos += itemsize * n
+        if len(raw) != itemsize * n:
+            raise ValueError(f"corrupt snapshot: array {name} truncated")
+        arr.frombytes(raw)
+        if sys.byteorder != "little":
+            arr.byteswap()
+        arrays[name] = arr
+    return meta, arrays
+
+def write(path, data):
+    # atomic: a crash mid-write never leaves a half snapshot behind
+    tmp = path + ".tmp"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    return len(data)
+
+def save(path, meta, arrays):
+    return write(path, dumps(meta, arrays))
+
+def load(path):
+    with open(path, "rb") as f:
+        return loads(f.read())
+
+# ----------------------------
+# random.Random state <-> array
+# ----------------------------
+def rng_state(rng):
+    version, internal, gauss = rng.getstate()
+    return array("I", internal), {"v": version, "gauss": gauss}
+
+def set_rng_state(rng, arr, info):
+    rng.setstate((info.get("v", 3), tuple(arr), info.get("gauss")))
@@ -0,0 +1,196 @@
+# soak.py -- Asphalt Rush long-run memory soak test
+# Simulates hours of play in minutes and fails if memory does not level off:
+#   game      : main.py's World + draw path headless on a simulated clock, a random driver pressing
+#               lanes, crash -> game over -> new run, every --restart-every runs the per-session
+#               setup an R restart repeats, a snapshot now and then; sampled with main.memory_gauges()
+#   dashboard : app.py in-process (temp log files) fed what a connected game sends through its ipc
+#               handlers (log batches, telemetry, status, scores) plus bulk batches while a tab
+#               polls, one session per run; sampled with app.mem_watch's gauges
+# Both are sampled by memwatch.py with tracemalloc on; after the warm-up, RSS growth, Python heap
+# growth or a gauge that is still rising fail the run, and the allocation sites that grew are listed.
+# Usage:
+#   python soak.py                                   # 2 simulated hours of each, exit 1 if not flat
+#   python soak.py --target game --hours 6 --out soak.json
+#   python soak.py --target dashboard --hours 12 --max-rss-mb 8
+
+import os, sys, json, time, random, shutil, argparse, tempfile, subprocess, tracemalloc
+from types import SimpleNamespace
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TARGETS = ("game", "dashboard")
+SAMPLES = 60                         # memory samples per soak (spread over the simulated hours)
+
+def soak_game(opts):
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import main as game
+    import pygame
+    from memwatch import MemoryWatch
+    game.configure(game.make_config(lanes=opts.lanes, log_level="warn", mem_interval=0))
+    pygame.init()
+    target = game.make_backend("surface", game.WINDOW_SIZE)
+    sprite = game.load_sprite_if_available()
+    font = game.get_font(max(8, game.S(26))); big_font = game.get_font(max(10, game.S(48)))
+    rng = random.Random(opts.seed)
+    scene = game.Scene()
+
+    end_ms = int(opts.hours * 3600 * 1000)
+    dt = 1000 // game.FPS
+    watch = MemoryWatch(end_ms / 1000.0 / SAMPLES, warmup_s=end_ms / 1000.0 * opts.warmup, gauges=game.memory_gauges(),
+                        caps=game.memory_caps())
+    now = 0; frame = 0; runs = 1; restarts = 0; snapshots = 0
+    world = game.World(now, sprite, seed=rng.randrange(1 << 31), threaded=False)
+    next_press = 0
+    while now < end_ms:
+        now += dt; frame += 1
+        if now >= next_press:
+            world.player.request_lane_change(rng.choice((-1, 1)), now / 1000.0)
+            next_press = now + rng.randrange(150, 900)
+        hit = world.step(now, dt)
+        if frame % opts.draw_every == 0 or hit is not None:
+            scene.begin(world.obstacle_speed, dt)
+            scene.cars.extend(world.obstacles)
+            scene.cars.append(world.player)
+            scene.numbers.append((font, world.score, (220,220,220), (game.S(game.WIDTH - 140), game.S(12)), "Score: "))
+            ai = f"AI predicted last: Lane {(world.last_prediction_label or 0) + 1} | Acc: {world.accuracy:.1f}%"
+            scene.texts.append((game.text_cache.render(font, ai, (220,220,220)), (game.S(12), game.S(12))))
+            target.draw(scene)
+            target.present()
+            game.input_probe.presented(world.player.current_x)
+            pygame.event.pump()
+        if frame % 3600 == 0:
+            world.snapshot(now); snapshots += 1
+        if hit is not None:
+            # game over screen, then a new run (every --restart-every runs the R path instead)
+            info = game.text_cache.render(font, f"Final score: {world.score}  — Press R to Restart or Q to Quit", (220,220,220))
+            go = game.text_cache.render_static(big_font, "GAME OVER", (220,80,80))
+            target.draw_overlay((12,12,14), 220, [(go, (0, 0)), (info, (0, 40))])
+            target.present()
+            world.close(); game.input_probe.reset()
+            runs += 1
+            if runs % opts.restart_every == 0:
+                # what play() redoes after R (it keeps the render target)
+                restarts += 1
+                game.assets.take()
+                font = game.get_font(max(8, game.S(26))); big_font = game.get_font(max(10, game.S(48)))
+                scene = game.Scene()
+            game.next_spawn_run()
+            world = game.World(now, sprite, world.player.color, seed=rng.randrange(1 << 31), threaded=False)
+        if watch.due(now / 1000.0):
+            watch.sample(now / 1000.0, world)
+    watch.sample(now / 1000.0, world)
+    world.close()
+    pygame.quit()
+    return watch, {"frames": frame, "runs": runs, "restarts": restarts, "snapshots": snapshots}
+
+def soak_dashboard(opts):
+    tmp = tempfile.mkdtemp(prefix="asphalt_soak_")
+    os.environ["ASPHALT_LOG_FILE"] = os.path.join(tmp, "session_logs.json")
+    import app
+    from memwatch import MemoryWatch
+    c = app.app.test_client()
+    rng = random.Random(opts.seed)
+
+    end_s = opts.hours * 3600.0
+    watch = MemoryWatch(end_s / SAMPLES, warmup_s=end_s * opts.warmup, gauges=app.mem_watch.gauges, caps=app.mem_watch.caps)
+    t = 0.0; runs = 0; requests = 0
+    polls = ("/api/runtime", "/api/last_run", "/api/logs", "/api/telemetry", "/api/analytics", "/api/color")
+    while t < end_s:
+        # one game session: ~a minute of play reported the way a connected game reports it
+        runs += 1
+        session = f"soak-{runs}"
+        ch = SimpleNamespace(peer={})
+        app.on_ipc_message(ch, {"type": "hello", "pid": runs, "session": session, "lanes": 3})
+        run_s = rng.uniform(20, 120)
+        base = time.time()
+        for i in range(int(run_s / 2)):
+            app.on_ipc_message(ch, {"type": "logs", "entries": [{"t": base + i * 2 + k * 0.1, "level": "info", "msg": "spawn",
+                                                                 "extra": {"lane": rng.randrange(3)}} for k in range(5)]})
+            for k in range(10):
+                app.on_ipc_message(ch, {"type": "tm", "v": [base + i * 2 + k * 0.2, i, 1.6 + i * 0.01, 1200, 60.0, 16, 50.0, 0]})
+            c.get(polls[i % len(polls)]); requests += 1
+            if i % 30 == 0:
+                app.on_ipc_message(ch, {"type": "status", "state": "memory", "rss_mb": 80.0, "gc_objects": 50000})
+        app.on_ipc_message(ch, {"type": "score", "score": rng.randrange(200), "lanes": 3})
+        app.spectator_hub(session, create=True)
+        app.on_ipc_disconnect(ch)
+        if runs % 10 == 0:
+            batch = {"runs": [{"id": f"{runs}-{k}", "session": session, "score": rng.randrange(300), "lanes": 3}
+                              for k in range(50)]}
+            c.post("/submit_scores", json=batch); c.post("/submit_scores", json=batch); requests += 2
+        t += run_s
+        if watch.due(t):
+            watch.sample(t)
+    watch.sample(t)
+    app._drain_log_queue(False)
+    shutil.rmtree(tmp, ignore_errors=True)
+    return watch, {"runs": runs, "requests": requests}
+
+def run_one(opts):
+    tracemalloc.start(opts.trace_frames)
+    t0 = time.perf_counter()
+    watch, info = (soak_game if opts.target == "game" else soak_dashboard)(opts)
+    from memwatch import check
+    report = watch.report(top=opts.top)
+    problems = check(report, opts.max_rss_mb, opts.max_heap_kb)
+    info.update(target=opts.target, hours=opts.hours, wall_s=round(time.perf_counter() - t0, 1),
+                report=report, problems=problems,
+                curve=[{"t": s[0], "rss": s[1], "traced": s[2], **s[3]} for s in watch.samples])
+    return info
+
+def print_result(res):
+    r = res["report"]
+    print(f"[soak] {res['target']}: {res['hours']} h simulated in {res['wall_s']} s  "
+          + "  ".join(f"{k}={res[k]}" for k in ("frames", "runs", "restarts", "requests") if k in res))
+    print(f"  RSS {r.get('rss_mb')} MB (+{r.get('rss_growth_mb')} MB after warm-up, {r.get('rss_mb_per_h')} MB/h)  "
+          f"Python heap {r.get('traced_mb')} MB (+{r.get('traced_growth_kb')} KB)")
+    print("  gauges: " + "  ".join(f"{k}={v}" for k, v in r.get("gauges", {}).items()))
+    for site in r.get("growing_sites", []):
+        print(f"    +{site['kb']:>8} KB  {site['blocks']:>+7} blocks  {site['site']}")
+    print("  " + ("FLAT" if not res["problems"] else "NOT FLAT: " + "; ".join(res["problems"])))
+
+def main():
+    parser = argparse.ArgumentParser(description="Asphalt Rush memory soak test")
+    parser.add_argument("--target", type=str, default="both", choices=TARGETS + ("both",))
+    parser.add_argument("--hours", type=float, default=2.0, help="simulated hours of play per target")
+    parser.add_argument("--warmup", type=float, default=0.25, help="fraction of the run before the baseline sample")
+    parser.add_argument("--lanes", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--draw-every", type=int, default=30, help="game: draw one frame in N (the simulation runs every frame)")
+    parser.add_argument("--restart-every", type=int, default=5, help="game: every Nth new run takes the R restart path")
+    parser.add_argument("--max-rss-mb", type=float, default=16.0, help="allowed RSS growth after warm-up")
+    parser.add_argument("--max-heap-kb", type=float, default=512.0, help="allowed traced Python heap growth after warm-up")
+    parser.add_argument("--trace-frames", type=int, default=1, help="tracemalloc traceback depth (more = slower, finer sites)")
+    parser.add_argument("--top", type=int, default=10, help="growing allocation sites to list")
+    parser.add_argument("--out", type=str, default="", help="write the results (with the sample curves) as JSON")
+    opts = parser.parse_args()
+
+    if opts.target == "both":
+        # one process per target, so neither sees the other's heap
+        results = []; failed = False
+        for t in TARGETS:
+            fd, path = tempfile.mkstemp(prefix="asphalt_soak_", suffix=".json"); os.close(fd)
+            argv = [f"--{k.replace('_', '-')}={v}" for k, v in vars(opts).items() if k not in ("target", "out")]
+            r = subprocess.run([sys.executable, os.path.abspath(__file__), "--target", t, "--out", path] + argv, cwd=BASE_DIR)
+            failed = failed or r.returncode != 0
+            try:
+                with open(path) as f:
+                    results.extend(json.load(f)["results"])
+            except (OSError, ValueError, KeyError):
+                print(f"[soak] {t}: no results"); failed = True
+            os.unlink(path)
+        if opts.out:
+            with open(opts.out, "w") as f:
+                json.dump({"version": 1, "created": time.time(), "results": results}, f, indent=2)
+            print(f"[soak] results written to {opts.out}")
+        sys.exit(1 if failed else 0)
+
+    res = run_one(opts)
+    print_result(res)
+    if opts.out:
+        with open(opts.out, "w") as f:
+            json.dump({"version": 1, "created": time.time(), "results": [res]}, f, indent=2)
+    sys.exit(1 if res["problems"] else 0)
+
+if __name__ == "__main__":
+    main()
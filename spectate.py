@@ -0,0 +1,169 @@
+# spectate.py -- Asphalt Rush live spectator frames (game -> dashboard -> browsers)
+# Game side, FrameFeed: while the dashboard has viewers, the frame loop hands over a downscaled RGB
+# copy at most `fps` times a second. A worker thread drops it if it equals the previous frame,
+# otherwise XORs it with the previous one (unchanged pixels become zero bytes), zlib-compresses
+# that and sends one ipc "frame" message. The loop never waits: a frame still queued when the next
+# one arrives is replaced. A keyframe (plain RGB) goes out every KEYFRAME_EVERY frames and
+# whenever the dashboard asks (a viewer joined).
+# Dashboard side, SpectatorHub: one per game session. Each frame becomes a ready-to-send SSE event
+# once and all viewers are handed the same bytes, so viewers add no encoding work. A joining
+# viewer starts at the last keyframe and replays the deltas after it.
+# ipc "frame": {"seq", "w", "h", "key": bool, "data": base64(zlib(rgb, or rgb XOR previous rgb))}
+# No pygame / flask imports here.
+
+import json, zlib, base64, threading
+
+KEYFRAME_EVERY = 50
+MAX_CHAIN = 300                      # deltas kept after a keyframe before the hub waits for the next one
+KEEPALIVE_S = 10.0
+
+# ----------------------------
+# Game side
+# ----------------------------
+class FrameFeed:
+    def __init__(self, send, fps=5.0, keyframe_every=KEYFRAME_EVERY):
+        self.send = send
+        self.max_fps = fps
+        self.interval = 1.0 / fps if fps > 0 else 0.0
+        self.keyframe_every = keyframe_every
+        self.active = False
+        self.next_t = 0.0
+        self.seq = 0
+        self.sent = 0; self.unchanged = 0; self.replaced = 0; self.bytes_out = 0
+        self._prev = None
+        self._since_key = 0
+        self._want_key = True
+        self._slot = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._thread = None
+        self._closed = False
+
+    def set_active(self, fps):
+        # dashboard request: fps 0 stops publishing, anything else starts it (capped at our max)
+        self.active = fps > 0 and self.max_fps > 0
+        if self.active:
+            self.interval = 1.0 / min(fps, self.max_fps)
+            self._want_key = True
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="spectate", daemon=True)
+                self._thread.start()
+
+    def request_keyframe(self):
+        self._want_key = True
+
+    def due(self, t):
+        return self.active and t >= self.next_t
+
+    def offer(self, rgb, width, height, t):
+        # frame loop side: one hand-over, never a wait
+        self.next_t = t + self.interval
+        with self._lock:
+            if self._slot is not None:
+                self.replaced += 1
+            self._slot = (rgb, width, height)
+        self._wake.set()
+
+    def _run(self):
+        while not self._closed:
+            self._wake.wait(); self._wake.clear()
+            with self._lock:
+                item, self._slot = self._slot, None
+            if item is None:
+                continue
+            rgb, width, height = item
+            prev = self._prev
+            key = self._want_key or prev is None or len(prev) != len(rgb) or self._since_key >= self.keyframe_every
+            if not key and rgb == prev:
+                self.unchanged += 1
+                continue
+            if key:
+                payload = rgb; self._since_key = 0; self._want_key = False
+            else:
+                n = len(rgb)
+                payload = (int.from_bytes(rgb, "little") ^ int.from_bytes(prev, "little")).to_bytes(n, "little")
+                self._since_key += 1
+            data = zlib.compress(payload, 1)
+            self._prev = rgb
+            self.seq += 1
+            if self.send({"type": "frame", "seq": self.seq, "w": width, "h": height, "key": key,
+                          "data": base64.b64encode(data).decode("ascii")}):
+                self.sent += 1; self.bytes_out += len(data)
+            else:
+                self._want_key = True        # the dashboard missed it: restart the chain
+
+    def stats(self):
+        return {"sent": self.sent, "unchanged": self.unchanged, "replaced": self.replaced, "bytes": self.bytes_out}
+
+    def close(self):
+        self._closed = True; self.active = False
+        self._wake.set()
+
+# ----------------------------
+# Dashboard side
+# ----------------------------
+class SpectatorHub:
+    def __init__(self, session, on_viewers=None):
+        self.session = session
+        self.on_viewers = on_viewers     # called with the new viewer count (outside the lock)
+        self.viewers = 0
+        self.frames = 0
+        self.closed = False
+        self._events = []                # SSE events since the last keyframe, keyframe first
+        self._base = 0                   # stream position of _events[0]
+        self._cond = threading.Condition()
+
+    def publish(self, msg):
+        ev = ("event: frame\ndata: " + json.dumps({"seq": msg.get("seq"), "w": msg.get("w"), "h": msg.get("h"),
+                                                     "key": bool(msg.get("key")), "data": msg.get("data")},
+                                                    separators=(",", ":")) + "\n\n").encode("ascii")
+        with self._cond:
+            if msg.get("key"):
+                self._base += len(self._events); self._events = [ev]
+            elif self._events and len(self._events) <= MAX_CHAIN:
+                self._events.append(ev)
+            else:
+                return False             # a delta without its keyframe can't be shown
+            self.frames += 1
+            self._cond.notify_all()
+        return True
+
+    def close(self):
+        with self._cond:
+            self.closed = True
+            self._cond.notify_all()
+
+    def _joined(self, delta):
+        with self._cond:
+            self.viewers += delta; n = self.viewers
+        if self.on_viewers:
+            try:
+                self.on_viewers(self, n)
+            except Exception:
+                pass
+
+    def stream(self):
+        # generator for one viewer: SSE bytes, starting at the last keyframe
+        self._joined(1)
+        try:
+            with self._cond:
+                pos = self._base
+            yield b"retry: 2000\n\n"
+            while True:
+                with self._cond:
+                    if not self.closed and pos >= self._base + len(self._events):
+                        self._cond.wait(KEEPALIVE_S)
+                    if pos < self._base:
+                        pos = self._base             # a newer keyframe replaced what we had not sent yet
+                    batch = self._events[pos - self._base:]
+                    pos = self._base + len(self._events)
+                    closed = self.closed
+                if batch:
+                    yield b"".join(batch)
+                elif closed:
+                    yield b"event: end\ndata: {}\n\n"
+                    return
+                else:
+                    yield b": keepalive\n\n"
+        finally:
+            self._joined(-1)
@@ -0,0 +1,185 @@
+# stress_bench.py -- Asphalt Rush scalability benchmark
+# Runs main.py's World + draw path headless with the content limits lifted (main.py --stress)
+# and holds the obstacle count at each step of a ramp, recording per frame:
+#   frame time (step + draw + present), step time, spawn-check cost, draw time, and
+#   Python allocations per frame (tracemalloc peak, measured in a separate pass so it
+#   doesn't distort the timings).
+# The curves are saved as JSON (and optionally CSV); --baseline compares a previous run and
+# exits non-zero on regressions, so it can guard changes to the spawn / draw paths.
+# Usage:
+#   python stress_bench.py                                  # 20 lanes, 6..400 obstacles
+#   python stress_bench.py --lanes 12 --counts 10,50,100 --out curves.json --csv curves.csv
+#   python stress_bench.py --baseline stress_curves.json --tolerance 1.5
+#   python stress_bench.py --renderer texture --out curves_texture.json    # SDL2 texture backend
+
+import os, sys, time, json, argparse, tracemalloc
+
+def percentile(sorted_vals, q):
+    if not sorted_vals: return 0.0
+    return sorted_vals[min(len(sorted_vals) - 1, int(q * (len(sorted_vals) - 1) + 0.5))]
+
+def load_game(opts):
+    if not opts.display:
+        os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+        os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+    import main
+    import pygame
+    main.configure(main.make_config(stress=True, lanes=opts.lanes, quality=str(opts.quality),
+                                    render_scale=opts.render_scale, log_level="warn"))
+    pygame.init()
+    return main, pygame
+
+def fill(game, world, count, rng, spread=False):
+    # top the road back up to `count` obstacles across all lanes; the first fill covers the
+    # whole road, refills enter above the screen like normal spawns
+    while len(world.obstacles) < count:
+        n = len(world.obstacles)
+        y = rng.uniform(-160, game.HEIGHT) if spread else -160 - rng.random() * 200
+        world.obstacles.append(game.Obstacle(n % game.LANES, y, world.obstacle_speed, world.base_sprite, rng))
+
+def spawn_probe(game, count, rng):
+    # a track generator whose live set holds `count` on-road obstacles, to time the spawn check
+    # (the real one runs on the track worker, off the frame path)
+    probe = game.TrackGenerator(game.LANES, game.spawn_rules(), None, seed=1, threaded=False)
+    probe.current_pair = (0, 1)
+    probe.live.clear()
+    probe.live.extend((-rng.uniform(0, 8000), i % game.LANES, game.OBSTACLE_SPEED_START) for i in range(count))
+    return probe
+
+def run_count(game, pygame, target, sprite, count, frames, warmup, seed, traced=False):
+    world = game.World(0, sprite, seed=seed)
+    rng = world.rng
+    fill(game, world, count, rng, spread=True)
+    probe = spawn_probe(game, count, rng)
+    font = game.get_font(max(8, game.S(26)))
+    scene = game.Scene()
+    step_us, spawn_us, draw_ms, frame_ms, alloc_kb = [], [], [], [], []
+    now = 0
+    dt = 1000 // game.FPS
+    for i in range(warmup + frames):
+        now += dt
+        if traced:
+            tracemalloc.reset_peak()
+            base = tracemalloc.get_traced_memory()[0]
+        t0 = time.perf_counter()
+        world.step(now, dt)            # collisions are ignored: the car is a fixed load here
+        t1 = time.perf_counter()
+        probe.candidates(0)
+        t2 = time.perf_counter()
+        scene.begin(world.obstacle_speed, dt)
+        scene.cars.extend(world.obstacles)
+        scene.cars.append(world.player)
+        scene.numbers.append((font, world.score, (220,220,220), (game.S(game.WIDTH - 140), game.S(12)), "Score: "))
+        target.draw(scene)
+        target.present()
+        t3 = time.perf_counter()
+        if traced:
+            alloc = tracemalloc.get_traced_memory()[1] - base
+        fill(game, world, count, rng)
+        pygame.event.pump()
+        if i < warmup:
+            continue
+        step_us.append((t1 - t0) * 1e6); spawn_us.append((t2 - t1) * 1e6)
+        draw_ms.append((t3 - t2) * 1e3); frame_ms.append((t3 - t0) * 1e3)
+        if traced:
+            alloc_kb.append(alloc / 1024.0)
+    world.close()
+    return step_us, spawn_us, draw_ms, frame_ms, alloc_kb
+
+def measure(game, pygame, target, sprite, count, opts):
+    step_us, spawn_us, draw_ms, frame_ms, _ = run_count(game, pygame, target, sprite, count, opts.frames, opts.warmup, opts.seed)
+    tracemalloc.start()
+    try:
+        _, _, _, _, alloc_kb = run_count(game, pygame, target, sprite, count, opts.alloc_frames, 5, opts.seed, traced=True)
+    finally:
+        tracemalloc.stop()
+    for v in (step_us, spawn_us, draw_ms, frame_ms, alloc_kb):
+        v.sort()
+    r = lambda v: round(v, 3)
+    return {
+        "obstacles": count,
+        "frame_ms_p50": r(percentile(frame_ms, 0.5)), "frame_ms_p99": r(percentile(frame_ms, 0.99)),
+        "step_us_p50": r(percentile(step_us, 0.5)), "step_us_p99": r(percentile(step_us, 0.99)),
+        "spawn_check_us_p50": r(percentile(spawn_us, 0.5)), "spawn_check_us_p99": r(percentile(spawn_us, 0.99)),
+        "draw_ms_p50": r(percentile(draw_ms, 0.5)), "draw_ms_p99": r(percentile(draw_ms, 0.99)),
+        "alloc_kb_p50": r(percentile(alloc_kb, 0.5)), "alloc_kb_max": r(alloc_kb[-1] if alloc_kb else 0.0),
+        "budget_pct_p50": r(100.0 * percentile(frame_ms, 0.5) / (1000.0 / game.FPS)),
+    }
+
+def compare(results, baseline_path, tolerance, lanes):
+    # regressions: frame_ms_p50 above tolerance x the baseline at the same obstacle count
+    try:
+        with open(baseline_path, "r") as f:
+            data = json.load(f)
+        base = {c["obstacles"]: c for c in data.get("curves", [])}
+    except Exception as e:
+        print(f"[stress] cannot read baseline {baseline_path}: {e}")
+        return []
+    if data.get("lanes") != lanes:
+        print(f"[stress] note: baseline was recorded with {data.get('lanes')} lanes, this run uses {lanes}")
+    bad = []
+    for c in results:
+        b = base.get(c["obstacles"])
+        if b and b.get("frame_ms_p50") and c["frame_ms_p50"] > b["frame_ms_p50"] * tolerance:
+            bad.append((c["obstacles"], b["frame_ms_p50"], c["frame_ms_p50"]))
+    return bad
+
+def main():
+    parser = argparse.ArgumentParser(description="Asphalt Rush stress / scalability benchmark")
+    parser.add_argument("--lanes", type=int, default=20)
+    parser.add_argument("--counts", type=str, default="6,25,50,100,200,400", help="obstacle counts to hold, comma separated")
+    parser.add_argument("--frames", type=int, default=240, help="timed frames per count")
+    parser.add_argument("--warmup", type=int, default=30)
+    parser.add_argument("--alloc-frames", type=int, default=60, help="frames per count in the tracemalloc pass")
+    parser.add_argument("--quality", type=str, default="0", help="fixed quality level 0-4 (0 = everything on)")
+    parser.add_argument("--render-scale", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--renderer", type=str, default="surface", choices=("surface", "texture", "auto"), help="render backend (see main.py --renderer)")
+    parser.add_argument("--display", action="store_true", help="use the real video driver instead of SDL's dummy one")
+    parser.add_argument("--out", type=str, default="stress_curves.json")
+    parser.add_argument("--csv", type=str, default="", help="also write the curves as CSV")
+    parser.add_argument("--baseline", type=str, default="", help="previous --out file to compare against")
+    parser.add_argument("--tolerance", type=float, default=1.5, help="allowed frame_ms_p50 ratio vs the baseline")
+    opts = parser.parse_args()
+
+    try:
+        counts = sorted(set(int(c) for c in opts.counts.split(",") if c.strip()))
+    except ValueError:
+        parser.error("--counts must be comma separated integers")
+    game, pygame = load_game(opts)
+    counts = [c for c in counts if 0 < c <= game.MAX_SIMULTANEOUS_OBSTACLES]
+    target = game.make_backend(opts.renderer, game.WINDOW_SIZE)
+    sprite = game.load_sprite_if_available()
+
+    print(f"[stress] {game.LANES} lanes, playfield {game.WIDTH}x{game.HEIGHT}, render {game.RENDER_W}x{game.RENDER_H}, "
+          f"quality {game.governor.name}, renderer {target.name}{' (gpu)' if target.accelerated else ''}")
+    results = []
+    for count in counts:
+        c = measure(game, pygame, target, sprite, count, opts)
+        results.append(c)
+        print(f"  {count:>4} obstacles  frame p50/p99={c['frame_ms_p50']}/{c['frame_ms_p99']} ms ({c['budget_pct_p50']}% budget)  "
+              f"step p50={c['step_us_p50']} us  spawn-check p50={c['spawn_check_us_p50']} us  "
+              f"draw p50={c['draw_ms_p50']} ms  alloc p50={c['alloc_kb_p50']} KiB/frame")
+    pygame.quit()
+
+    report = {"version": 1, "created": time.time(), "lanes": game.LANES, "width": game.WIDTH, "height": game.HEIGHT,
+              "render_scale": game.RENDER_SCALE, "quality": game.governor.name, "renderer": target.name, "accelerated": target.accelerated, "frames": opts.frames, "curves": results}
+    with open(opts.out, "w") as f:
+        json.dump(report, f, indent=2)
+    print(f"[stress] curves written to {opts.out}")
+    if opts.csv and results:
+        with open(opts.csv, "w") as f:
+            keys = list(results[0])
+            f.write(",".join(keys) + "\n")
+            for c in results:
+                f.write(",".join(str(c[k]) for k in keys) + "\n")
+
+    if opts.baseline:
+        bad = compare(results, opts.baseline, opts.tolerance, game.LANES)
+        for count, was, now in bad:
+            print(f"[stress] REGRESSION at {count} obstacles: frame p50 {was} -> {now} ms")
+        if bad:
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
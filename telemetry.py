@@ -0,0 +1,152 @@
+# telemetry.py -- Asphalt Rush live telemetry storage for the dashboard
+# Samples arrive several times per second from the running game (ipc.py "tm" frames).
+# Each session keeps fixed-size ring buffers: the raw samples plus 1s / 10s / 1min rollups,
+# so memory stays bounded no matter how long a session runs.
+
+import time, math, threading
+from collections import OrderedDict
+from ipc import TELEMETRY_FIELDS
+
+RAW_CAPACITY = 1500                  # ~5 min at 5 Hz
+TIERS = (("1s", 1, 900),             # 15 min
+         ("10s", 10, 720),           # 2 h
+         ("1m", 60, 1440))           # 24 h
+MAX_SESSIONS = 8
+
+# ----------------------------
+# Ring buffer
+# ----------------------------
+class RingBuffer:
+    def __init__(self, capacity):
+        self.capacity = capacity
+        self.data = [None] * capacity
+        self.head = 0
+        self.size = 0
+
+    def append(self, item):
+        self.data[self.head] = item
+        self.head = (self.head + 1) % self.capacity
+        if self.size < self.capacity:
+            self.size += 1
+
+    def items(self, since=None):
+        start = (self.head - self.size) % self.capacity
+        out = []
+        for i in range(self.size):
+            item = self.data[(start + i) % self.capacity]
+            if since is None or item[0] > since:
+                out.append(item)
+        return out
+
+    def last(self):
+        return self.data[(self.head - 1) % self.capacity] if self.size else None
+
+# ----------------------------
+# Downsampling tier: averages every field over fixed time buckets
+# ----------------------------
+class Tier:
+    def __init__(self, name, seconds, capacity):
+        self.name = name
+        self.seconds = seconds
+        self.ring = RingBuffer(capacity)
+        self.bucket = None           # bucket start time
+        self.count = 0
+        self.sums = None
+
+    def add(self, sample):
+        b = sample[0] - (sample[0] % self.seconds)
+        if self.bucket is not None and b != self.bucket:
+            self.flush()
+        if self.bucket is None:
+            self.bucket = b; self.count = 0; self.sums = [0.0] * (len(sample) - 1)
+        self.count += 1
+        for i, v in enumerate(sample[1:]):
+            self.sums[i] += v
+
+    def flush(self):
+        if self.bucket is None or not self.count:
+            return
+        self.ring.append(tuple([self.bucket] + [round(v / self.count, 3) for v in self.sums]))
+        self.bucket = None
+
+    def items(self, since=None):
+        pts = self.ring.items(since)
+        if self.bucket is not None and self.count:
+            # include the still-open bucket so live charts don't lag a whole bucket
+            pts.append(tuple([self.bucket] + [round(v / self.count, 3) for v in self.sums]))
+        return pts
+
+class SessionSeries:
+    def __init__(self, session):
+        self.session = session
+        self.created = time.time()
+        self.updated = self.created
+        self.raw = RingBuffer(RAW_CAPACITY)
+        self.tiers = {name: Tier(name, sec, cap) for name, sec, cap in TIERS}
+        self.total = 0
+
+    def add(self, sample):
+        self.raw.append(sample)
+        for tier in self.tiers.values():
+            tier.add(sample)
+        self.total += 1
+        self.updated = time.time()
+
+    def points(self, res="raw", since=None):
+        if res == "raw":
+            return self.raw.items(since)
+        return self.tiers[res].items(since)
+
+# ----------------------------
+# Store: bounded number of sessions, oldest evicted first
+# ----------------------------
+def parse_sample(values):
+    # -> float tuple, or None; NaN / inf would poison the tier sums and make /api/telemetry invalid JSON
+    if not isinstance(values, (list, tuple)) or len(values) != len(TELEMETRY_FIELDS):
+        return None
+    try:
+        sample = tuple(float(v) if v is not None else 0.0 for v in values)
+    except (TypeError, ValueError, OverflowError):
+        return None
+    return sample if all(math.isfinite(v) for v in sample) else None
+
+class TelemetryStore:
+    def __init__(self, max_sessions=MAX_SESSIONS):
+        self.max_sessions = max_sessions
+        self.sessions = OrderedDict()
+        self._lock = threading.Lock()
+
+    def add(self, session, values):
+        # values: list in TELEMETRY_FIELDS order, t (epoch seconds) first
+        sample = parse_sample(values)
+        if not session or sample is None:
+            return False
+        with self._lock:
+            series = self.sessions.get(session)
+            if series is None:
+                series = self.sessions[session] = SessionSeries(session)
+                while len(self.sessions) > self.max_sessions:
+                    self.sessions.popitem(last=False)
+            series.add(sample)
+        return True
+
+    def query(self, session, res="raw", since=None):
+        if res != "raw" and res not in dict((t[0], t) for t in TIERS):
+            raise ValueError(f"unknown resolution: {res}")
+        with self._lock:
+            series = self.sessions.get(session)
+            if series is None:
+                return None
+            return {"session": session, "res": res, "fields": list(TELEMETRY_FIELDS),
+                    "total": series.total, "points": series.points(res, since)}
+
+    def list_sessions(self):
+        with self._lock:
+            return [{"session": s.session, "created": s.created, "updated": s.updated, "samples": s.total}
+                    for s in self.sessions.values()]
+
+    def latest_session(self):
+        with self._lock:
+            if not self.sessions:
+                return None
+            return max(self.sessions.values(), key=lambda s: s.updated).session
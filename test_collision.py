@@ -0,0 +1,60 @@
+# test_collision.py -- swept collision through a headless World.step (python -m pytest test_collision.py)
+# Obstacles are placed by hand (the track's own spawns are switched off) and driven at speeds
+# where a per-frame colliderect would let them tunnel through the car.
+
+import os
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import pytest
+import main as game
+
+FRAME_MS = 1000.0 / game.FPS
+
+@pytest.fixture
+def world(monkeypatch):
+    game.configure(game.make_config(lanes=3, log_level="warn", mem_interval=0))
+    w = game.World(0, seed=1, threaded=False)
+    monkeypatch.setattr(w, "spawn", lambda now: None)
+    yield w
+    w.close()
+
+def place(world, lane, y, speed):
+    ob = game.Obstacle(lane, y, speed, color=game.Obstacle.DEFAULT_COLORS[0])
+    world.obstacles.append(ob)
+    return ob
+
+def test_obstacle_at_3000px_per_step_hits(world):
+    ob = place(world, world.player.logical_lane, game.PLAYER_Y - 1500, 3000.0)
+    assert world.step(FRAME_MS, FRAME_MS) is ob
+    # with a discrete test it would already be past the car
+    assert ob.y > game.PLAYER_Y + world.player.height
+
+def test_long_frame_is_swept(world):
+    # a 1 s stall is clamped to MAX_STEP_FRAMES, still 3200 px in one step
+    ob = place(world, world.player.logical_lane, game.PLAYER_Y - 1600, 400.0)
+    assert world.step(1000.0, 1000.0) is ob
+
+def test_other_lane_passes_and_scores(world):
+    lane = (world.player.logical_lane + 1) % game.LANES
+    place(world, lane, game.PLAYER_Y - 1500, 3000.0)
+    assert world.step(FRAME_MS, FRAME_MS) is None
+    assert world.obstacles == [] and world.score == 1
+
+def _crossing_during_slide(world, at):
+    # player slides one lane left; an obstacle in the lane it enters passes the car's row at step time `at`
+    p = world.player
+    lane = p.logical_lane - 1
+    assert p.request_lane_change(-1)
+    speed = 3000.0
+    place(world, lane, game.PLAYER_Y - at * speed, speed)
+    return world.step(FRAME_MS, FRAME_MS)
+
+def test_hit_during_lane_change_slide(world):
+    # late in the step the car is already partly in the new lane
+    assert _crossing_during_slide(world, 0.85) is not None
+    assert world.player.current_x != world.player.prev_x
+
+def test_miss_before_slide_reaches_lane(world):
+    # early in the step the car has not reached the obstacle's lane yet
+    assert _crossing_during_slide(world, 0.1) is None
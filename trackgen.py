@@ -0,0 +1,219 @@
+# trackgen.py -- Asphalt Rush look-ahead track generator
+# The obstacle schedule (lane pairs, candidate filtering, predictor consult + training) is
+# produced in seeded chunks a few seconds ahead of play on a background worker; main.py's
+# World only dequeues spawns that are due, so a spawning frame costs the same as any other.
+# Obstacles move in straight lines at their spawn speed, so the generator can place them
+# analytically (y at time t) and apply the same spacing rules main.py used inline.
+# Same seed + same rules -> same track. No pygame import here.
+
+import random, threading
+from array import array
+from collections import deque, namedtuple
+from snapshot import rng_state, set_rng_state
+
+# t: ms since run start; pred: predictor's guess for this spawn (None if it had none);
+# interval: spawn interval after this spawn (for HUD / telemetry)
+Spawn = namedtuple("Spawn", "t lane speed pred interval")
+
+CHUNK_MS = 2000
+LOOKAHEAD_MS = 6000
+PREDICTION_FOLLOW = 0.45       # chance a candidate lane is swapped for the predictor's guess
+
+class TrackGenerator:
+    # rules: dict with main.py's spawn constants by name (SPAWN_INTERVAL_START_MS, ..., FPS, SPAWN_Y, EXIT_Y)
+    def __init__(self, lanes, rules, predictor=None, seed=None, chunk_ms=CHUNK_MS, lookahead_ms=LOOKAHEAD_MS,
+                 threaded=True, start=True):
+        self.lanes = lanes
+        self.rules = dict(rules)
+        self.predictor = predictor
+        self.seed = seed if seed is not None else random.randrange(1 << 31)
+        self.rng = random.Random(self.seed)
+        self.chunk_ms = chunk_ms
+        self.lookahead_ms = lookahead_ms
+        self.threaded = threaded
+
+        # generator state (only touched while holding _gen_lock)
+        self.spawn_interval = self.rules["SPAWN_INTERVAL_START_MS"]
+        self.speed = self.rules["OBSTACLE_SPEED_START"]
+        self.next_attempt = self.spawn_interval
+        self.current_pair = None
+        self.pair_spawns_left = 0
+        self.last_lane_spawned_in_pair = None
+        self.lane_last_spawn_time = [-99999] * lanes
+        self.live = deque()            # (t_spawn, lane, speed) still on the road
+        self.last_spawn = None         # (t, lane) of the previous spawn
+        self.generated = 0
+
+        # hand-off to the consumer
+        self.queue = deque()
+        self.horizon = 0               # schedule is complete up to this time
+        self.consumed_to = 0
+        self.chunks = 0
+        self.starved = 0
+        self._gen_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._closed = False
+        self._thread = None
+        if start:
+            self.start()
+
+    def start(self):
+        # start=False lets a restored generator load its state before producing anything
+        self._fill(self.consumed_to + self.lookahead_ms)   # first chunks inline so the run starts with a schedule
+        if self.threaded:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    # ----------------------------
+    # consumer side (frame loop)
+    # ----------------------------
+    def due(self, now_ms):
+        if not self.threaded and self.horizon - now_ms < self.lookahead_ms:
+            self._fill(now_ms + self.lookahead_ms)
+        out = []
+        with self._cond:
+            self.consumed_to = now_ms
+            q = self.queue
+            while q and q[0].t <= now_ms:
+                out.append(q.popleft())
+            if self.horizon < now_ms:
+                self.starved += 1
+            if self.threaded and self.horizon - now_ms < self.lookahead_ms:
+                self._cond.notify()
+        return out
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            self._cond.notify()
+
+    # ----------------------------
+    # snapshot state (see snapshot.py); the worker is held off while exporting
+    # ----------------------------
+    def export_state(self):
+        # -> (meta, arrays, predictor state or None); the predictor is trained by the worker under
+        # _gen_lock, so it is exported here too, consistent with the track it produced
+        with self._gen_lock, self._cond:
+            rng_arr, rng_info = rng_state(self.rng)
+            q = list(self.queue)
+            meta = {"seed": self.seed, "rules": self.rules, "spawn_interval": self.spawn_interval, "speed": self.speed,
+                    "next_attempt": self.next_attempt, "current_pair": self.current_pair,
+                    "pair_spawns_left": self.pair_spawns_left, "last_in_pair": self.last_lane_spawned_in_pair,
+                    "last_spawn": self.last_spawn, "generated": self.generated, "horizon": self.horizon,
+                    "consumed_to": self.consumed_to, "rng": rng_info}
+            arrays = {
+                "rng": rng_arr,
+                "lane_last": array("d", self.lane_last_spawn_time),
+                "live_t": array("d", (o[0] for o in self.live)), "live_lane": array("h", (o[1] for o in self.live)),
+                "live_speed": array("d", (o[2] for o in self.live)),
+                "q_t": array("d", (e.t for e in q)), "q_lane": array("h", (e.lane for e in q)),
+                "q_speed": array("d", (e.speed for e in q)), "q_interval": array("d", (e.interval for e in q)),
+                "q_pred": array("h", (-1 if e.pred is None else e.pred for e in q)),
+            }
+            pred = self.predictor.export_state() if self.predictor is not None else None
+        return meta, arrays, pred
+
+    def import_state(self, meta, arrays):
+        with self._gen_lock, self._cond:
+            set_rng_state(self.rng, arrays["rng"], meta["rng"])
+            self.seed = meta["seed"]
+            self.spawn_interval = meta["spawn_interval"]; self.speed = meta["speed"]
+            self.next_attempt = meta["next_attempt"]
+            self.current_pair = tuple(meta["current_pair"]) if meta["current_pair"] else None
+            self.pair_spawns_left = meta["pair_spawns_left"]; self.last_lane_spawned_in_pair = meta["last_in_pair"]
+            self.last_spawn = tuple(meta["last_spawn"]) if meta["last_spawn"] else None
+            self.generated = meta["generated"]; self.horizon = meta["horizon"]; self.consumed_to = meta["consumed_to"]
+            self.lane_last_spawn_time = list(arrays["lane_last"])
+            self.live = deque(zip(arrays["live_t"], arrays["live_lane"], arrays["live_speed"]))
+            self.queue = deque(Spawn(t, lane, v, None if p < 0 else p, iv) for t, lane, v, p, iv in
+                               zip(arrays["q_t"], arrays["q_lane"], arrays["q_speed"], arrays["q_pred"], arrays["q_interval"]))
+
+    # ----------------------------
+    # worker side
+    # ----------------------------
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._closed and self.horizon - self.consumed_to >= self.lookahead_ms:
+                    self._cond.wait()
+                if self._closed:
+                    return
+                until = self.consumed_to + self.lookahead_ms
+            self._fill(until)
+
+    def _fill(self, until):
+        # generate whole chunks until the schedule covers `until`; events are published per chunk
+        with self._gen_lock:
+            while self.horizon < until:
+                end = self.horizon + self.chunk_ms
+                events = []
+                while self.next_attempt <= end:
+                    t = self.next_attempt
+                    ev = self._attempt(t)
+                    if ev is not None:
+                        events.append(ev)
+                    self.next_attempt = t + self.spawn_interval
+                with self._cond:
+                    self.queue.extend(events)
+                    self.horizon = end
+                    self.chunks += 1
+
+    def y_at(self, t_spawn, speed, t):
+        return self.rules["SPAWN_Y"] + speed * (t - t_spawn) * self.rules["FPS"] / 1000.0
+
+    def candidates(self, t):
+        # lanes of the current pair that may take an obstacle at time t (stress_bench.py times this)
+        r = self.rules
+        candidate_lanes = []
+        for lane in self.current_pair:
+            blocked_by_vert = any(l == lane and self.y_at(ts, v, t) < r["MIN_VERTICAL_GAP"] for ts, l, v in self.live)
+            time_ok = (t - self.lane_last_spawn_time[lane]) >= r["MIN_SPAWN_TIME_GAP_MS"]
+            if (not blocked_by_vert) and time_ok:
+                candidate_lanes.append(lane)
+        return candidate_lanes
+
+    def _attempt(self, t):
+        r = self.rules
+        rng = self.rng
+        if self.pair_spawns_left <= 0 or self.current_pair is None:
+            self.current_pair = rng.choice([(i, i+1) for i in range(self.lanes-1)])
+            self.pair_spawns_left = r["PAIR_DURATION_SPAWNS"]
+            self.last_lane_spawned_in_pair = None
+
+        live = self.live
+        while live and self.y_at(live[0][0], live[0][2], t) > r["EXIT_Y"]:
+            live.popleft()
+        # later spawns are faster, so one may leave before an older one; drop those too
+        if any(self.y_at(ts, v, t) > r["EXIT_Y"] for ts, _, v in live):
+            self.live = live = deque(o for o in live if self.y_at(o[0], o[2], t) <= r["EXIT_Y"])
+        if len(live) >= r["MAX_SIMULTANEOUS_OBSTACLES"]:
+            return None
+
+        candidate_lanes = self.candidates(t)
+        if not candidate_lanes:
+            return None
+        if self.last_lane_spawned_in_pair in candidate_lanes:
+            others = [l for l in candidate_lanes if l != self.last_lane_spawned_in_pair]
+            lane = others[0] if others else rng.choice(candidate_lanes)
+        else:
+            lane = rng.choice(candidate_lanes)
+
+        pred = None
+        speed = self.speed
+        if self.predictor is not None and self.last_spawn is not None:
+            gap = t - self.last_spawn[0]
+            pred = self.predictor.predict(self.last_spawn[1], gap, speed)
+            if pred in candidate_lanes and rng.random() < PREDICTION_FOLLOW:
+                lane = pred
+            self.predictor.update(self.last_spawn[1], gap, speed, lane)
+
+        live.append((t, lane, speed))
+        self.lane_last_spawn_time[lane] = t
+        self.last_lane_spawned_in_pair = lane
+        self.pair_spawns_left -= 1
+        self.last_spawn = (t, lane)
+        self.generated += 1
+        if self.spawn_interval > r["MIN_SPAWN_INTERVAL_MS"]:
+            self.spawn_interval = max(r["MIN_SPAWN_INTERVAL_MS"], self.spawn_interval - r["SPAWN_DECREASE_MS"])
+        self.speed += r["OBSTACLE_SPEED_INCREMENT"]
+        return Spawn(t, lane, speed, pred, self.spawn_interval)
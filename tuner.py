@@ -0,0 +1,268 @@
+# tuner.py -- Asphalt Rush difficulty tuner (headless Monte-Carlo over spawn parameters)
+# Plays thousands of simulated runs per parameter set with scripted reference players,
+# spread across all cores, and writes the best set as a profile main.py can load.
+# Each run is main.py's own headless World (threaded=False): the shipped track generator with
+# its predictor and PREDICTION_FOLLOW lane swaps, the frame-rate independent movement and the
+# swept collision, so a profile is tuned for the game players actually get.
+# Usage:
+#   python tuner.py --report                       # survival stats for the built-in values
+#   python tuner.py --mode hard --candidates 40 --games 200 --out difficulty_profile.json
+#   python tuner.py --target "2:45,3:60,4:75,5:80,6:90" --out difficulty_profile.json
+#   python main.py --lanes 3 --profile difficulty_profile.json
+
+import random, math, time, os, json, argparse
+from multiprocessing import Pool, cpu_count
+
+FPS = 60
+FRAME_MS = 1000.0 / FPS
+MAX_SIM_SECONDS = 600
+
+# hand-tuned values from main.py, per mode
+TUNABLE_KEYS = ("SPAWN_INTERVAL_START_MS", "MIN_SPAWN_INTERVAL_MS", "SPAWN_DECREASE_MS",
+                "OBSTACLE_SPEED_START", "OBSTACLE_SPEED_INCREMENT", "MIN_VERTICAL_GAP", "MIN_SPAWN_TIME_GAP_MS")
+BUILTIN = {
+    "normal": {"SPAWN_INTERVAL_START_MS": 1700, "MIN_SPAWN_INTERVAL_MS": 600, "SPAWN_DECREASE_MS": 5,
+               "OBSTACLE_SPEED_START": 1.6, "OBSTACLE_SPEED_INCREMENT": 0.007,
+               "MIN_VERTICAL_GAP": 600, "MIN_SPAWN_TIME_GAP_MS": 2000},
+    "hard":   {"SPAWN_INTERVAL_START_MS": 1700, "MIN_SPAWN_INTERVAL_MS": 450, "SPAWN_DECREASE_MS": 6,
+               "OBSTACLE_SPEED_START": 1.9, "OBSTACLE_SPEED_INCREMENT": 0.008,
+               "MIN_VERTICAL_GAP": 600, "MIN_SPAWN_TIME_GAP_MS": 2000},
+}
+# (low, high) search ranges; ints stay ints
+SEARCH_SPACE = {
+    "SPAWN_INTERVAL_START_MS": (1100, 2200),
+    "MIN_SPAWN_INTERVAL_MS": (300, 900),
+    "SPAWN_DECREASE_MS": (2, 12),
+    "OBSTACLE_SPEED_START": (1.2, 2.6),
+    "OBSTACLE_SPEED_INCREMENT": (0.003, 0.02),
+    "MIN_VERTICAL_GAP": (250, 700),
+    "MIN_SPAWN_TIME_GAP_MS": (600, 2400),
+}
+# median survival seconds per lane count
+DEFAULT_TARGETS = {
+    "normal": {2: 60, 3: 75, 4: 90, 5: 100, 6: 110},
+    "hard":   {2: 35, 3: 45, 4: 55, 5: 60, 6: 65},
+}
+
+# ----------------------------
+# Reference players
+# ----------------------------
+# reaction_ms: delay before a seen obstacle is acted on
+# lookahead_px: how far above the car obstacles are considered a threat
+# slip: chance per decision of doing nothing (missed input)
+PLAYERS = {
+    "expert": {"reaction_ms": 180, "lookahead_px": 340, "slip": 0.0},
+    "casual": {"reaction_ms": 320, "lookahead_px": 260, "slip": 0.03},
+    "novice": {"reaction_ms": 480, "lookahead_px": 200, "slip": 0.08},
+}
+
+def choose_move(game, lanes, cur_lane, seen, lookahead):
+    # seen: list of (lane, y) as the player perceived them reaction_ms ago
+    def threat(lane):
+        best = None
+        for lane_o, y in seen:
+            if lane_o != lane: continue
+            gap = game.PLAYER_Y - (y + game.OBSTACLE_HEIGHT)
+            # anything still alongside the car counts as a threat
+            if -(game.PLAYER_HEIGHT + game.OBSTACLE_HEIGHT) <= gap <= lookahead and (best is None or gap < best):
+                best = gap
+        return best
+    here = threat(cur_lane)
+    if here is None:
+        return 0
+    options = []
+    for d in (-1, 1):
+        lane = cur_lane + d
+        if 0 <= lane < lanes:
+            t = threat(lane)
+            options.append((float('inf') if t is None else t, d))
+    if not options:
+        return 0
+    gap, d = max(options)
+    return d if gap > max(here, 0) else 0
+
+# ----------------------------
+# Headless run: main.py's World with the candidate spawn parameters
+# ----------------------------
+_configured_lanes = None
+
+def _game(lanes):
+    # main.py configured for this lane count (again only when a worker switches lane counts)
+    global _configured_lanes
+    import main as game
+    if _configured_lanes != lanes:
+        _configured_lanes = lanes
+        game.configure(game.make_config(lanes=lanes, log_level="warn", mem_interval=0, spectate_fps=0))
+    return game
+
+def simulate_run(params, lanes, player, seed, record=None):
+    # record: optional list that receives (t_ms, lane, speed) per spawn, as main.py --record-spawns writes
+    game = _game(lanes)
+    rng = random.Random(seed)
+    track = game.TrackGenerator(lanes, dict(game.spawn_rules(), **params), game.new_predictor(), seed=seed, threaded=False)
+    if record is not None:
+        due = track.due
+        def recorded_due(now_ms):
+            events = due(now_ms)
+            record.extend((ev.t, ev.lane, ev.speed) for ev in events)
+            return events
+        track.due = recorded_due
+    world = game.World(0, track=track)
+
+    reaction_frames = max(1, int(round(PLAYERS[player]["reaction_ms"] / FRAME_MS)))
+    lookahead = PLAYERS[player]["lookahead_px"]
+    slip = PLAYERS[player]["slip"]
+    history = []
+    p = world.player
+    max_frames = MAX_SIM_SECONDS * FPS
+    frame = 0
+    try:
+        while frame < max_frames:
+            frame += 1
+            now = frame * FRAME_MS
+
+            # the player reacts to the world as it was reaction_frames ago
+            history.append([(o.lane, o.y) for o in world.obstacles])
+            if len(history) > reaction_frames:
+                seen = history.pop(0)
+                if abs(p.target_x - p.current_x) <= 2.0 and rng.random() >= slip:
+                    d = choose_move(game, lanes, p.target_lane, seen, lookahead)
+                    if d:
+                        p.request_lane_change(d)
+
+            if world.step(now, FRAME_MS) is not None:
+                return frame / FPS, world.score
+        return frame / FPS, world.score
+    finally:
+        world.close(); game.input_probe.reset()
+
+def _run_batch(job):
+    params, lanes, player, seeds = job
+    return [simulate_run(params, lanes, player, s)[0] for s in seeds]
+
+# ----------------------------
+# Stats
+# ----------------------------
+def percentile(sorted_vals, q):
+    if not sorted_vals: return None
+    i = (len(sorted_vals) - 1) * q
+    lo = int(math.floor(i)); hi = min(len(sorted_vals) - 1, lo + 1)
+    return sorted_vals[lo] + (sorted_vals[hi] - sorted_vals[lo]) * (i - lo)
+
+def summarize(samples):
+    s = sorted(samples)
+    return {
+        "n": len(s),
+        "mean": round(sum(s) / len(s), 2) if s else None,
+        "p10": round(percentile(s, 0.10), 2), "p25": round(percentile(s, 0.25), 2),
+        "p50": round(percentile(s, 0.50), 2), "p75": round(percentile(s, 0.75), 2),
+        "p90": round(percentile(s, 0.90), 2),
+        "capped": sum(1 for v in s if v >= MAX_SIM_SECONDS),
+    }
+
+def evaluate(pool, params, lane_counts, players, games, seed, chunk=25):
+    # same seeds for every parameter set so candidates are compared on equal tracks
+    jobs, keys = [], []
+    for lanes in lane_counts:
+        for player in players:
+            for start in range(0, games, chunk):
+                seeds = [seed * 1000003 + lanes * 7919 + start + i for i in range(min(chunk, games - start))]
+                jobs.append((params, lanes, player, seeds)); keys.append((lanes, player))
+    results = {}
+    for key, times in zip(keys, pool.map(_run_batch, jobs)):
+        results.setdefault(key, []).extend(times)
+    return {lanes: {player: summarize(results[(lanes, player)]) for player in players} for lanes in lane_counts}
+
+def loss(report, targets, ref_player):
+    # squared log-ratio of the reference player's median survival to the target curve
+    total = 0.0
+    for lanes, target in targets.items():
+        med = report[lanes][ref_player]["p50"]
+        total += math.log(max(med, 0.1) / float(target)) ** 2
+    return total
+
+def sample_params(rng, base):
+    p = {}
+    for k, (lo, hi) in SEARCH_SPACE.items():
+        if isinstance(base[k], int):
+            p[k] = rng.randint(lo, hi)
+        else:
+            p[k] = round(rng.uniform(lo, hi), 4)
+    if p["MIN_SPAWN_INTERVAL_MS"] > p["SPAWN_INTERVAL_START_MS"]:
+        p["MIN_SPAWN_INTERVAL_MS"] = p["SPAWN_INTERVAL_START_MS"]
+    return p
+
+def parse_targets(text):
+    out = {}
+    for part in text.split(","):
+        if not part.strip(): continue
+        lanes, secs = part.split(":")
+        out[int(lanes)] = float(secs)
+    return out
+
+def print_report(title, report):
+    print(title)
+    for lanes in sorted(report):
+        for player, st in report[lanes].items():
+            print(f"  lanes={lanes} {player:<7} n={st['n']:<5} p10={st['p10']:>7} p50={st['p50']:>7} p90={st['p90']:>7} mean={st['mean']:>7} capped={st['capped']}")
+
+# ----------------------------
+# CLI
+# ----------------------------
+def main():
+    parser = argparse.ArgumentParser(description="Asphalt Rush difficulty tuner")
+    parser.add_argument("--mode", choices=("normal", "hard", "both"), default="both")
+    parser.add_argument("--lanes", type=str, default="2,3,4,5,6", help="comma separated lane counts")
+    parser.add_argument("--players", type=str, default=",".join(PLAYERS), help="comma separated reference players")
+    parser.add_argument("--ref-player", type=str, default="casual", help="player whose median is fitted to the target")
+    parser.add_argument("--games", type=int, default=200, help="games per lane count and player")
+    parser.add_argument("--candidates", type=int, default=30, help="random parameter sets to try per mode")
+    parser.add_argument("--target", type=str, default="", help='median survival seconds per lane count, e.g. "3:60,4:75"')
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--workers", type=int, default=0, help="worker processes (default: all cores)")
+    parser.add_argument("--report", action="store_true", help="only report the built-in values, no search")
+    parser.add_argument("--out", type=str, default="difficulty_profile.json")
+    args = parser.parse_args()
+
+    lane_counts = [max(2, min(6, int(x))) for x in args.lanes.split(",") if x.strip()]
+    players = [p for p in args.players.split(",") if p in PLAYERS]
+    if args.ref_player not in players:
+        players.append(args.ref_player)
+    modes = ("normal", "hard") if args.mode == "both" else (args.mode,)
+    workers = args.workers or cpu_count()
+    rng = random.Random(args.seed)
+
+    profile = {"version": 1, "generated_by": "tuner.py", "created": time.time(),
+               "games": args.games, "ref_player": args.ref_player, "modes": {}, "reports": {}}
+    with Pool(workers) as pool:
+        for mode in modes:
+            targets = parse_targets(args.target) if args.target else DEFAULT_TARGETS[mode]
+            targets = {l: t for l, t in targets.items() if l in lane_counts}
+            t0 = time.time()
+            base_report = evaluate(pool, BUILTIN[mode], lane_counts, players, args.games, args.seed)
+            print_report(f"[tuner] {mode}: built-in values ({time.time()-t0:.1f}s)", base_report)
+            if args.report:
+                profile["modes"][mode] = dict(BUILTIN[mode]); profile["reports"][mode] = {"targets": targets, "survival_s": base_report}
+                continue
+
+            best = (loss(base_report, targets, args.ref_player), dict(BUILTIN[mode]), base_report)
+            print(f"[tuner] {mode}: targets {targets} -> built-in loss {best[0]:.4f}")
+            for i in range(args.candidates):
+                cand = sample_params(rng, BUILTIN[mode])
+                rep = evaluate(pool, cand, lane_counts, players, args.games, args.seed)
+                l = loss(rep, targets, args.ref_player)
+                print(f"[tuner] {mode}: candidate {i+1}/{args.candidates} loss {l:.4f}" + ("  *best*" if l < best[0] else ""))
+                if l < best[0]:
+                    best = (l, cand, rep)
+            print_report(f"[tuner] {mode}: best (loss {best[0]:.4f})", best[2])
+            profile["modes"][mode] = best[1]
+            profile["reports"][mode] = {"loss": round(best[0], 5), "targets": targets, "survival_s": best[2]}
+
+    # json needs string keys
+    profile["reports"] = json.loads(json.dumps(profile["reports"]))
+    with open(args.out, "w") as f:
+        json.dump(profile, f, indent=2)
+    print("[tuner] profile written:", os.path.abspath(args.out))
+
+if __name__ == "__main__":
+    main()